@@ -0,0 +1,61 @@
+"""
+Benchmark of the cost of the board events on the moves of the pieces.
+
+Moves the knights of a board back and forth with `Piece.move()` and reports the moves per second with no receiver, with
+a receiver for one piece only (`connect(receiver, sender=piece)`), and with a receiver for all the pieces. The moves are
+not checked, so the time measured is the one of the move and of its events.
+
+Usage : python benchmarks/events.py [--moves MOVES] [--repeat REPEAT]
+"""
+import argparse
+import time
+from pychess.board import Board
+
+FEN = "4k3/8/8/8/8/8/8/1N2K1N1 w - - 0 1"
+
+# Squares (row, col) the knights go to and come back from
+KNIGHT_MOVES = (((0, 1), (2, 2)), ((0, 6), (2, 5)))
+
+
+def _receiver(sender, **kwargs):
+    pass
+
+
+def run(nb_moves, listeners):
+    """
+    Move the knights of a board.
+    :param nb_moves: The number of moves to play
+    :param listeners: "none", "sender" (a receiver for a piece which does not move) or "all"
+    :return: The number of moves per second
+    """
+    board = Board.from_fen(FEN)
+    knights = [board.get_cell(*start) for start, _ in KNIGHT_MOVES]
+    if listeners == "sender":
+        board.events.piece_move.connect(_receiver, sender=board.white.king)
+    elif listeners == "all":
+        board.events.piece_move.connect(_receiver)
+        board.events.piece_taken.connect(_receiver)
+
+    start_time = time.perf_counter()
+    for i in range(nb_moves // 4):
+        for knight, (start, dest) in zip(knights, KNIGHT_MOVES):
+            knight.move(dest[0], dest[1], check=False)
+            knight.move(start[0], start[1], check=False)
+    elapsed = time.perf_counter() - start_time
+    return nb_moves // 4 * 4 / elapsed
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Measure the cost of the board events on the moves")
+    p.add_argument("--moves", type=int, default=200000, help="Number of moves to play (default : 200000)")
+    p.add_argument("--repeat", type=int, default=3, help="Number of runs, the best one is reported (default : 3)")
+    args = p.parse_args(argv)
+
+    print("{:<12}{:>14}".format("listeners", "moves/s"))
+    for listeners in ("none", "sender", "all"):
+        speed = max(run(args.moves, listeners) for _ in range(args.repeat))
+        print("{:<12}{:>14.0f}".format(listeners, speed))
+
+
+if __name__ == "__main__":
+    main()
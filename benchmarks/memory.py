@@ -0,0 +1,56 @@
+"""
+Memory used by the boards.
+
+Creates boards from a FEN string and reports the memory allocated for each one (measured with `tracemalloc`), and the
+size of a piece.
+
+Usage : python benchmarks/memory.py [--boards BOARDS] [--fen FEN]
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from pychess.board import Board
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def board_size(fen, nb_boards):
+    """
+    Measure the memory used by a board.
+    :return: The number of bytes allocated for each board
+    """
+    # The tables shared by the boards are created before the measure
+    Board.from_fen(fen)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        boards = [Board.from_fen(fen) for _ in range(nb_boards)]
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del boards
+    return size / nb_boards
+
+
+def piece_size(piece):
+    return sys.getsizeof(piece) + (sys.getsizeof(piece.__dict__) if hasattr(piece, "__dict__") else 0)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Measure the memory used by the boards")
+    p.add_argument("--boards", type=int, default=1000, help="Number of boards created (default : 1000)")
+    p.add_argument("--fen", type=str, default=START_FEN, help="Position of the boards (default : the starting position)")
+    args = p.parse_args(argv)
+
+    board = Board.from_fen(args.fen)
+    nb_pieces = len(board.white.pieces) + len(board.black.pieces)
+    print("{:.0f} bytes per board, {} pieces of {} bytes".format(board_size(args.fen, args.boards), nb_pieces,
+                                                                 piece_size(board.white.pieces[0])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Perft benchmark for the move generation.
+
+Counts the leaf nodes of the legal move tree of a suite of reference positions, compares them to the known values and
+reports the node counts, the time taken and the nodes per second for each depth.
+
+Usage : python benchmarks/perft.py [--depth DEPTH] [--position NAME] [--backend {board,bitboard}] [--json FILE]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+
+BACKENDS = {
+    "board": Board,
+    "bitboard": BitBoard
+}
+
+
+# Reference positions and their known node counts for the depths 1, 2, 3...
+POSITIONS = [
+    {
+        "name": "initial",
+        "fen": "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "nodes": [20, 400, 8902, 197281, 4865609]
+    },
+    {
+        "name": "kiwipete",
+        "fen": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "nodes": [48, 2039, 97862, 4085603]
+    },
+    {
+        "name": "endgame",
+        "fen": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "nodes": [14, 191, 2812, 43238, 674624]
+    },
+    {
+        "name": "promotions",
+        "fen": "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        "nodes": [6, 264, 9467, 422333]
+    },
+    {
+        "name": "discovered_checks",
+        "fen": "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        "nodes": [44, 1486, 62379, 2103487]
+    },
+    {
+        "name": "middlegame",
+        "fen": "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        "nodes": [46, 2079, 89890, 3894594]
+    }
+]
+
+
+def run_position(position, max_depth, backend=Board):
+    """
+    Run perft on a position for every depth from 1 to `max_depth`.
+    :param position: A dict from `POSITIONS`
+    :param max_depth: The maximum depth to search. Depths without a known node count are skipped.
+    :param backend: The board class to use
+    :return: A list of dicts with the results for each depth
+    """
+    board = backend.from_fen(position["fen"])
+    results = []
+    for depth in range(1, min(max_depth, len(position["nodes"])) + 1):
+        start = time.perf_counter()
+        nodes = board.perft(depth)
+        elapsed = time.perf_counter() - start
+
+        expected = position["nodes"][depth - 1]
+        results.append({
+            "position": position["name"],
+            "depth": depth,
+            "nodes": nodes,
+            "expected": expected,
+            "ok": nodes == expected,
+            "time": elapsed,
+            "nps": nodes / elapsed if elapsed > 0 else None
+        })
+    return results
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Run the perft benchmark suite")
+    p.add_argument("--depth", type=int, default=3, help="Maximum depth to search (default : 3)")
+    p.add_argument("--position", action="append", help="Only run the position with this name. Can be given several times.")
+    p.add_argument("--backend", choices=sorted(BACKENDS), default="board", help="Board representation to use (default : board)")
+    p.add_argument("--json", type=str, default=None, help="Write the results as JSON to this file ('-' for the standard output)")
+    args = p.parse_args(argv)
+
+    positions = POSITIONS
+    if args.position is not None:
+        positions = [pos for pos in POSITIONS if pos["name"] in args.position]
+        if len(positions) == 0:
+            p.error("Unknown position(s) : " + ", ".join(args.position))
+
+    # When the JSON goes to the standard output, the table goes to the standard error so the output can be piped
+    out = sys.stderr if args.json == "-" else sys.stdout
+
+    results = []
+    print("{:<20}{:>6}{:>12}{:>10}{:>12}".format("position", "depth", "nodes", "time (s)", "nodes/s"), file=out)
+    for position in positions:
+        for result in run_position(position, args.depth, BACKENDS[args.backend]):
+            results.append(result)
+            print("{:<20}{:>6}{:>12}{:>10.3f}{:>12.0f}{}".format(result["position"], result["depth"], result["nodes"], result["time"],
+                                                            result["nps"] or 0, "" if result["ok"] else "  FAILED (expected " + str(result["expected"]) + ")"),
+                  file=out)
+
+    total_nodes = sum(r["nodes"] for r in results)
+    total_time = sum(r["time"] for r in results)
+    report = {
+        "python": platform.python_implementation() + " " + platform.python_version(),
+        "backend": args.backend,
+        "max_depth": args.depth,
+        "total_nodes": total_nodes,
+        "total_time": total_time,
+        "nps": total_nodes / total_time if total_time > 0 else None,
+        "results": results
+    }
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = [r for r in results if not r["ok"]]
+    if len(failed) != 0:
+        sys.exit("Perft FAILED : " + ", ".join("{} depth {} ({} nodes instead of {})".format(r["position"], r["depth"], r["nodes"], r["expected"]) for r in failed))
+
+
+if __name__ == "__main__":
+    main()
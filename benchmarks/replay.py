@@ -0,0 +1,65 @@
+"""
+Benchmark of the replay of PGN files (see `pychess.replay`).
+
+Replays the games of a PGN file on several processes and reports the games and positions replayed, and the games per
+second per core. Without a file, random games are generated first.
+
+Usage : python benchmarks/replay.py [FILE] [--workers N] [--chunk-size BYTES] [--games N]
+"""
+import argparse
+import os
+import random
+import tempfile
+from pychess.bitboard import BitBoard
+from pychess.replay import replay, START_FEN
+import pychess.san as san
+
+RESULTS = ("1-0", "0-1", "1/2-1/2")
+
+
+def generate_pgn(f, nb_games, seed=0, max_moves=120):
+    """
+    Write random legal games in PGN.
+    """
+    rng = random.Random(seed)
+    for i in range(nb_games):
+        board = BitBoard.from_fen(START_FEN)
+        result = rng.choice(RESULTS)
+        f.write('[Event "Random game {}"]\n[White "Random"]\n[Black "Random"]\n[Result "{}"]\n\n'.format(i + 1, result))
+        movetext = []
+        for ply in range(max_moves):
+            moves = board.generate_moves()
+            if len(moves) == 0:
+                break
+            m = rng.choice(moves)
+            if ply % 2 == 0:
+                movetext.append("{}.".format(ply // 2 + 1))
+            movetext.append(san.render(board, m))
+            board.push(m)
+        movetext.append(result)
+        f.write(" ".join(movetext) + "\n\n")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Run the PGN replay benchmark")
+    p.add_argument("file", nargs="?", default=None, help="PGN file to replay (default : random games)")
+    p.add_argument("--workers", type=int, default=None, help="Number of worker processes (default : number of CPUs)")
+    p.add_argument("--chunk-size", type=int, default=256 * 1024, help="Size of the ranges of the file given to the workers, in bytes")
+    p.add_argument("--games", type=int, default=200, help="Number of random games to generate without a file (default : 200)")
+    args = p.parse_args(argv)
+
+    path = args.file
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".pgn")
+        with os.fdopen(fd, "w") as f:
+            generate_pgn(f, args.games)
+    try:
+        stats = replay(path, lambda records: None, workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        if args.file is None:
+            os.remove(path)
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark of the search engine.
+
+Searches the positions of the perft suite to a fixed depth and reports the nodes searched, the time taken, the nodes
+per second and the cutoff rate (the proportion of beta cutoffs caused by the first move searched), to compare
+implementations and size hardware.
+
+Usage : python benchmarks/search.py [--depth DEPTH] [--position NAME] [--backend {board,bitboard}] [--no-ordering] [--workers N] [--json FILE]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from perft import POSITIONS, BACKENDS
+from pychess.engine import Engine, parallel_search
+import pychess.move as move
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Run the search benchmark")
+    p.add_argument("--depth", type=int, default=3, help="Depth to search (default : 3)")
+    p.add_argument("--position", action="append", help="Only run the position with this name. Can be given several times.")
+    p.add_argument("--backend", choices=sorted(BACKENDS), default="board", help="Board representation to use (default : board)")
+    p.add_argument("--no-ordering", action="store_true", help="Only search the hash move first, without the other ordering heuristics")
+    p.add_argument("--workers", type=int, default=1, help="Number of processes searching in parallel (default : 1, without multiprocessing)")
+    p.add_argument("--json", type=str, default=None, help="Write the results as JSON to this file ('-' for the standard output)")
+    args = p.parse_args(argv)
+
+    positions = POSITIONS
+    if args.position is not None:
+        positions = [pos for pos in POSITIONS if pos["name"] in args.position]
+        if len(positions) == 0:
+            p.error("Unknown position(s) : " + ", ".join(args.position))
+
+    out = sys.stderr if args.json == "-" else sys.stdout
+
+    engine = Engine(ordering=not args.no_ordering)
+    results = []
+    print("{:<20}{:>8}{:>8}{:>10}{:>10}{:>10}{:>8}".format("position", "move", "score", "nodes", "time (s)", "nodes/s", "cutoff"), file=out)
+    for position in positions:
+        board = BACKENDS[args.backend].from_fen(position["fen"])
+        start = time.perf_counter()
+        if args.workers > 1:
+            result = parallel_search(board, workers=args.workers, depth=args.depth)
+        else:
+            result = engine.search(board, depth=args.depth)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "position": position["name"],
+            "depth": result.depth,
+            "move": move.to_str(result.move),
+            "score": result.score,
+            "pv": [move.to_str(m) for m in result.pv],
+            "nodes": result.nodes,
+            "time": elapsed,
+            "nps": result.nodes / elapsed if elapsed > 0 else None,
+            "cutoff_rate": result.cutoff_rate
+        })
+        print("{:<20}{:>8}{:>8}{:>10}{:>10.3f}{:>10.0f}{:>8.2f}".format(position["name"], move.to_str(result.move), result.score, result.nodes,
+                                                                     elapsed, results[-1]["nps"] or 0, result.cutoff_rate), file=out)
+
+    total_nodes = sum(r["nodes"] for r in results)
+    total_time = sum(r["time"] for r in results)
+    report = {
+        "python": platform.python_implementation() + " " + platform.python_version(),
+        "backend": args.backend,
+        "depth": args.depth,
+        "ordering": not args.no_ordering,
+        "workers": args.workers,
+        "total_nodes": total_nodes,
+        "total_time": total_time,
+        "nps": total_nodes / total_time if total_time > 0 else None,
+        "results": results
+    }
+    print("Total : {} nodes in {:.3f}s ({:.0f} nodes/s)".format(total_nodes, total_time, report["nps"] or 0), file=out)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json is not None:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
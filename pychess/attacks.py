@@ -0,0 +1,68 @@
+from pychess.player import COLOR_WHITE, COLOR_BLACK
+
+KNIGHT_OFFSETS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+KING_OFFSETS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+ROOK_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (-1, 1), (-1, -1), (1, -1))
+
+
+class AttackTables:
+    """
+    Squares attacked from each square of a board, by piece type.
+
+    The tables are indexed by the index of the square (`row * files + col`), and contain (row, col) tuples.
+    """
+
+    def __init__(self, shape):
+        self.shape = shape
+        nb_ranks, files = shape
+
+        def on_board(row, col):
+            return 0 <= row < nb_ranks and 0 <= col < files
+
+        self.knight = []
+        self.king = []
+        # Squares attacked by a pawn of each color
+        self.pawn = ([], [])
+        # Rays in each direction, ordered from the nearest square to the farthest
+        self.rook_rays = []
+        self.bishop_rays = []
+        self.queen_rays = []
+
+        for row in range(nb_ranks):
+            for col in range(files):
+                self.knight.append(tuple((row + dr, col + dc) for dr, dc in KNIGHT_OFFSETS if on_board(row + dr, col + dc)))
+                self.king.append(tuple((row + dr, col + dc) for dr, dc in KING_OFFSETS if on_board(row + dr, col + dc)))
+
+                for color, direction in ((COLOR_WHITE, 1), (COLOR_BLACK, -1)):
+                    self.pawn[color].append(tuple((row + direction, col + dc) for dc in (-1, 1) if on_board(row + direction, col + dc)))
+
+                for directions, rays in ((ROOK_DIRECTIONS, self.rook_rays), (BISHOP_DIRECTIONS, self.bishop_rays)):
+                    square_rays = []
+                    for dr, dc in directions:
+                        ray = []
+                        r, c = row + dr, col + dc
+                        while on_board(r, c):
+                            ray.append((r, c))
+                            r += dr
+                            c += dc
+                        if len(ray) != 0:
+                            square_rays.append(tuple(ray))
+                    rays.append(tuple(square_rays))
+                self.queen_rays.append(self.rook_rays[-1] + self.bishop_rays[-1])
+
+
+__TABLES = {}
+
+
+def get_tables(shape):
+    """
+    Get the attack tables for a board shape. The tables are computed once for each shape.
+    :param shape: The shape of the board (ranks, files)
+    :return: The `AttackTables` of the shape
+    """
+    tables = __TABLES.get(shape)
+    if tables is None:
+        tables = AttackTables(shape)
+        __TABLES[shape] = tables
+    return tables
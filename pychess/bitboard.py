@@ -0,0 +1,733 @@
+"""
+Bitboard representation of a standard 8x8 position.
+
+Each set of pieces is stored in a 64 bits int, with the bit `row * 8 + col` set when a piece is on the square, so the
+squares and the moves are compatible with the ones of a 8x8 `Board` (see `pychess.move`).
+
+The attacks of the sliding pieces are read from tables indexed by the occupancy of the squares they go through, like
+magic bitboards, with a dict replacing the magic multiplication.
+"""
+from pychess.board import Board, FEN_REGEX, PROMOTION_TYPES, SEE_VALUES, CASTLING_WHITE_KING, CASTLING_WHITE_QUEEN, CASTLING_BLACK_KING, \
+    CASTLING_BLACK_QUEEN, CASTLING_LETTERS
+from pychess.player import COLOR_WHITE, COLOR_BLACK
+from pychess.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, TYPES
+import pychess.move as move
+import pychess.zobrist as zobrist
+import pychess.pst as pst
+import pychess.packed as packed
+
+FULL = (1 << 64) - 1
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+RANK_3 = 0xFF << 16
+RANK_6 = 0xFF << 40
+
+# Castling rights kept when a piece moves from or to each square
+CASTLING_MASKS = [15] * 64
+CASTLING_MASKS[0] = 15 ^ CASTLING_WHITE_QUEEN
+CASTLING_MASKS[4] = 15 ^ (CASTLING_WHITE_KING | CASTLING_WHITE_QUEEN)
+CASTLING_MASKS[7] = 15 ^ CASTLING_WHITE_KING
+CASTLING_MASKS[56] = 15 ^ CASTLING_BLACK_QUEEN
+CASTLING_MASKS[60] = 15 ^ (CASTLING_BLACK_KING | CASTLING_BLACK_QUEEN)
+CASTLING_MASKS[63] = 15 ^ CASTLING_BLACK_KING
+
+# SAN letters of the white pieces, indexed by type
+SAN_LETTERS = " PNBRQK"
+
+# FEN letters of the pieces, indexed by code (type | color << 3), with a dot for the empty squares
+FEN_LETTERS = ["."] * 16
+for _type in range(1, 7):
+    FEN_LETTERS[_type | COLOR_WHITE << 3] = SAN_LETTERS[_type]
+    FEN_LETTERS[_type | COLOR_BLACK << 3] = SAN_LETTERS[_type].lower()
+
+# Values of the pieces, indexed by type
+VALUES = (0,) + tuple(TYPES[piece_type].VALUE for piece_type in range(1, 7))
+
+
+def _on_board(row, col):
+    return 0 <= row < 8 and 0 <= col < 8
+
+
+def _leaper_attacks(offsets):
+    attacks = []
+    for square in range(64):
+        row, col = divmod(square, 8)
+        bb = 0
+        for dr, dc in offsets:
+            if _on_board(row + dr, col + dc):
+                bb |= 1 << ((row + dr) * 8 + col + dc)
+        attacks.append(bb)
+    return attacks
+
+
+def _ray_attacks(square, occupied, directions):
+    row, col = divmod(square, 8)
+    bb = 0
+    for dr, dc in directions:
+        r, c = row + dr, col + dc
+        while _on_board(r, c):
+            bb |= 1 << (r * 8 + c)
+            if occupied >> (r * 8 + c) & 1:
+                break
+            r += dr
+            c += dc
+    return bb
+
+
+def _slider_tables(directions):
+    """
+    Compute the attacks of a sliding piece for every square and every occupancy of the squares it goes through.
+    :return: A tuple (masks, tables), with masks the squares whose occupancy matters for each square (the last square of
+    each ray does not), and tables a list of dicts giving the attacks for each occupancy of the mask
+    """
+    masks = []
+    tables = []
+    for square in range(64):
+        row, col = divmod(square, 8)
+        mask = 0
+        for dr, dc in directions:
+            r, c = row + dr, col + dc
+            while _on_board(r + dr, c + dc):
+                mask |= 1 << (r * 8 + c)
+                r += dr
+                c += dc
+        masks.append(mask)
+
+        # Enumerate all the subsets of the mask
+        table = {}
+        occupied = 0
+        while True:
+            table[occupied] = _ray_attacks(square, occupied, directions)
+            occupied = (occupied - mask) & mask
+            if occupied == 0:
+                break
+        tables.append(table)
+    return masks, tables
+
+
+KNIGHT_ATTACKS = _leaper_attacks(((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)))
+KING_ATTACKS = _leaper_attacks(((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)))
+# Squares attacked by a pawn of each color
+PAWN_ATTACKS = (_leaper_attacks(((1, -1), (1, 1))), _leaper_attacks(((-1, -1), (-1, 1))))
+
+ROOK_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (-1, 1), (-1, -1), (1, -1))
+ROOK_MASKS, ROOK_TABLES = _slider_tables(ROOK_DIRECTIONS)
+BISHOP_MASKS, BISHOP_TABLES = _slider_tables(BISHOP_DIRECTIONS)
+
+# BETWEEN[a][b] : the squares strictly between a and b if they are on the same line, else 0
+# LINE[a][b] : all the squares of the line going through a and b if they are on the same line, else 0
+BETWEEN = [[0] * 64 for _ in range(64)]
+LINE = [[0] * 64 for _ in range(64)]
+for _a in range(64):
+    for _directions in (ROOK_DIRECTIONS, BISHOP_DIRECTIONS):
+        for _dr, _dc in _directions:
+            _row, _col = divmod(_a, 8)
+            _full_line = _ray_attacks(_a, 0, ((_dr, _dc), (-_dr, -_dc))) | 1 << _a
+            _between = 0
+            _r, _c = _row + _dr, _col + _dc
+            while _on_board(_r, _c):
+                _b = _r * 8 + _c
+                BETWEEN[_a][_b] = _between
+                LINE[_a][_b] = _full_line
+                _between |= 1 << _b
+                _r += _dr
+                _c += _dc
+
+
+def rook_attacks(square, occupied):
+    return ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+
+
+def bishop_attacks(square, occupied):
+    return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+class BitBoard:
+    """
+    A standard 8x8 position stored in bitboards. It has the same interface as `Board` for FEN strings, squares and
+    moves, but has no `Piece` or `Player` objects : `get_cell()` returns the SAN letter of the piece.
+    """
+
+    def __init__(self):
+        self.shape = (8, 8)
+        # Bitboards of the pieces, indexed by color then by type
+        self.pieces = ([0] * 7, [0] * 7)
+        # Bitboards of the pieces of each color
+        self.occupancy = [0, 0]
+        # Piece on each square : type | color << 3, or 0 if the square is empty
+        self.squares = [0] * 64
+        self.turn = COLOR_WHITE
+        self.castling = 0
+        self.ep_square = None
+        self.halfmove_clock = 0
+        self.fullmove_nb = 1
+        self._undo_stack = []
+        self.zobrist_keys = zobrist.get_keys(self.shape)
+        # Zobrist key of the position, updated by push() (see `Board.zobrist`)
+        self.zobrist = 0
+        self.pst = pst.get_tables(self.shape)
+        # Piece-square scores and phase of the game, updated by push() (see `Board.midgame_score`)
+        self.midgame_score = 0
+        self.endgame_score = 0
+        self.phase = 0
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Create a position from a FEN string.
+        """
+        g = FEN_REGEX.search(fen)
+        if g is None:
+            raise ValueError("Invalid FEN String")
+
+        board = cls()
+        ranks = g.group(1).split("/")
+        if len(ranks) != 8:
+            raise ValueError("Invalid pieces position")
+
+        for y in range(8):
+            col = 0
+            for char in ranks[y]:
+                if char.isdigit():
+                    col += int(char)
+                    continue
+                if col < 8:
+                    board._put(SAN_LETTERS.index(char.upper()), COLOR_WHITE if char.isupper() else COLOR_BLACK, (7 - y) * 8 + col)
+                col += 1
+            if col != 8:
+                raise ValueError("Invalid number of squares on rank " + str(y + 1) + " ('" + ranks[y] + "'). Got " + str(col) + " squares instead of 8")
+
+        castling = 0
+        for right, letter in CASTLING_LETTERS:
+            if letter in g.group(3):
+                castling |= right
+        en_passant = g.group(4)
+        ep_square = None if en_passant == "-" else (int(en_passant[1]) - 1) * 8 + "abcdefgh".index(en_passant[0])
+        board._set_state(castling, COLOR_WHITE if g.group(2) == "w" else COLOR_BLACK, ep_square, int(g.group(5)), int(g.group(6)))
+        return board
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Create a position from its binary encoding (see `pychess.packed`).
+        """
+        codes, castling, turn, ep_square, halfmove_clock, fullmove_nb = packed.unpack(data)
+        board = cls()
+        for square, code in enumerate(codes):
+            if code:
+                if not 1 <= code & 7 <= 6:
+                    raise ValueError("Invalid piece code " + str(code))
+                board._put(code & 7, code >> 3, square)
+        board._set_state(castling, turn, ep_square, halfmove_clock, fullmove_nb)
+        return board
+
+    def _set_state(self, castling, turn, ep_square, halfmove_clock, fullmove_nb):
+        """
+        Set the state of the position once the pieces are placed, and add it to the Zobrist key.
+        """
+        # The rights are only kept if the king and the rook are on their squares
+        for right, king, rook, color in ((CASTLING_WHITE_KING, 4, 7, COLOR_WHITE), (CASTLING_WHITE_QUEEN, 4, 0, COLOR_WHITE),
+                                         (CASTLING_BLACK_KING, 60, 63, COLOR_BLACK), (CASTLING_BLACK_QUEEN, 60, 56, COLOR_BLACK)):
+            if self.squares[king] != KING | color << 3 or self.squares[rook] != ROOK | color << 3:
+                castling &= ~right
+        self.castling = castling
+        self.turn = turn
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_nb = fullmove_nb
+
+        keys = self.zobrist_keys
+        self.zobrist ^= keys.castling[self.castling] ^ self._en_passant_key()
+        if self.turn == COLOR_BLACK:
+            self.zobrist ^= keys.turn
+
+    def to_bytes(self):
+        """
+        Encode the position in `pychess.packed.RECORD_SIZE` bytes (see `pychess.packed`).
+        """
+        return packed.pack(self.squares, self.castling, self.turn, self.ep_square, self.halfmove_clock, self.fullmove_nb)
+
+    def to_fen(self):
+        # The empty squares are written as dots, then the runs of dots are replaced by their length
+        squares = self.squares
+        position = "/".join("".join([FEN_LETTERS[code] for code in squares[row * 8:row * 8 + 8]]) for row in range(7, -1, -1))
+        for n in range(8, 0, -1):
+            position = position.replace("." * n, str(n))
+
+        castling = "".join(letter for right, letter in CASTLING_LETTERS if self.castling & right)
+        en_passant = "-" if self.ep_square is None else move.square_name(self.ep_square)
+        return " ".join((position, "w" if self.turn == COLOR_WHITE else "b", castling or "-", en_passant,
+                         str(self.halfmove_clock), str(self.fullmove_nb)))
+
+    @property
+    def en_passant(self):
+        """The en passant square as a (row, col) tuple, like `Board.en_passant`, or None"""
+        return None if self.ep_square is None else divmod(self.ep_square, 8)
+
+    def get_cell(self, rank, file):
+        """
+        Get the piece on a square.
+        :return: The SAN letter of the piece (uppercase for white), or None if the square is empty
+        """
+        code = self.squares[rank * 8 + file]
+        if code == 0:
+            return None
+        letter = SAN_LETTERS[code & 7]
+        return letter if code >> 3 == COLOR_WHITE else letter.lower()
+
+    def type_at(self, square):
+        """
+        Get the type of the piece on a square (see `pychess.pieces.Piece.TYPE`), or 0 if the square is empty.
+        """
+        return self.squares[square] & 7
+
+    def color_at(self, square):
+        """
+        Get the color of the piece on a square, or None if the square is empty.
+        """
+        code = self.squares[square]
+        return None if code == 0 else code >> 3
+
+    def is_valid(self, rank, file):
+        return 0 <= rank < 8 and 0 <= file < 8
+
+    def _put(self, piece_type, color, square):
+        bit = 1 << square
+        self.pieces[color][piece_type] |= bit
+        self.occupancy[color] |= bit
+        self.squares[square] = piece_type | color << 3
+        self.zobrist ^= self.zobrist_keys.pieces[color][piece_type][square]
+        self.midgame_score += self.pst.midgame[color][piece_type][square]
+        self.endgame_score += self.pst.endgame[color][piece_type][square]
+        self.phase += self.pst.phase[piece_type]
+
+    def set_pst(self, tables):
+        """
+        Use other piece-square tables, and compute the scores of the pieces with them (see `Board.set_pst`).
+        """
+        self.pst = tables
+        self.midgame_score = 0
+        self.endgame_score = 0
+        self.phase = 0
+        for square, code in enumerate(self.squares):
+            if code:
+                self.midgame_score += tables.midgame[code >> 3][code & 7][square]
+                self.endgame_score += tables.endgame[code >> 3][code & 7][square]
+                self.phase += tables.phase[code & 7]
+
+    def _en_passant_key(self):
+        """
+        Get the key of the en passant square, or 0 if no pawn of the player to move can take en passant.
+        """
+        if self.ep_square is None or not PAWN_ATTACKS[1 - self.turn][self.ep_square] & self.pieces[self.turn][PAWN]:
+            return 0
+        return self.zobrist_keys.en_passant[self.ep_square & 7]
+
+    def attackers(self, square, by_color, occupied=None):
+        """
+        Get the pieces of a player attacking a square.
+        :param occupied: The occupancy used for the sliding pieces, defaults to the current one
+        :return: The bitboard of the attacking pieces
+        """
+        if occupied is None:
+            occupied = self.occupancy[0] | self.occupancy[1]
+        bbs = self.pieces[by_color]
+        return (KNIGHT_ATTACKS[square] & bbs[KNIGHT]) | (PAWN_ATTACKS[1 - by_color][square] & bbs[PAWN]) | (KING_ATTACKS[square] & bbs[KING]) \
+            | (ROOK_TABLES[square][occupied & ROOK_MASKS[square]] & (bbs[ROOK] | bbs[QUEEN])) \
+            | (BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]] & (bbs[BISHOP] | bbs[QUEEN]))
+
+    def piece_attackers(self, square, color, piece_type):
+        """
+        Find the pieces of a type and a color attacking a square (see `Board.piece_attackers`).
+        :return: The list of the indexes of the squares of the pieces
+        """
+        bb = self.attackers(square, color) & self.pieces[color][piece_type]
+        attackers = []
+        while bb:
+            bit = bb & -bb
+            attackers.append(bit.bit_length() - 1)
+            bb ^= bit
+        return attackers
+
+    def material(self, color):
+        """
+        Get the total value of the pieces of a player.
+        """
+        bbs = self.pieces[color]
+        return sum(bin(bbs[piece_type]).count("1") * VALUES[piece_type] for piece_type in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN))
+
+    def see(self, m):
+        """
+        Static exchange evaluation of a capture (see `Board.see`).
+        :param m: The move, packed in an int (see `pychess.move`)
+        :return: The material won, in pawns (see `pychess.board.SEE_VALUES`)
+        """
+        start = m & move.SQUARE_MASK
+        dest = m >> move.DEST_SHIFT & move.SQUARE_MASK
+        occupied = (self.occupancy[0] | self.occupancy[1]) ^ 1 << start
+
+        if m >> move.FLAGS_SHIFT & move.FLAG_EN_PASSANT:
+            gains = [SEE_VALUES[PAWN]]
+            occupied ^= 1 << (dest - 8 if self.turn == COLOR_WHITE else dest + 8)
+        else:
+            gains = [SEE_VALUES[self.squares[dest] & 7]]
+
+        code = self.squares[start]
+        attacker_value = SEE_VALUES[code & 7]
+        color = 1 - (code >> 3)
+        while True:
+            # The pieces that took are removed from the occupancy, so the sliding pieces behind them attack through
+            attackers = self.attackers(dest, color, occupied) & occupied
+            if attackers == 0:
+                break
+            bbs = self.pieces[color]
+            for piece_type in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING):
+                if attackers & bbs[piece_type]:
+                    break
+            bits = attackers & bbs[piece_type]
+            gains.append(attacker_value - gains[-1])
+            attacker_value = SEE_VALUES[piece_type]
+            occupied ^= bits & -bits
+            color = 1 - color
+
+        # Each player can stop taking if it is not profitable
+        for i in range(len(gains) - 1, 0, -1):
+            gains[i - 1] = -max(-gains[i - 1], gains[i])
+        return gains[0]
+
+    def is_square_attacked(self, square, by_color):
+        return self.attackers(square, by_color) != 0
+
+    def is_check(self, color=None):
+        """
+        Check if the king of a player is attacked.
+        :param color: The color of the player, defaults to the player whose turn it is
+        """
+        if color is None:
+            color = self.turn
+        king = self.pieces[color][KING]
+        return king != 0 and self.attackers(king.bit_length() - 1, 1 - color) != 0
+
+    def get_move(self, row, col, dest_row, dest_col, piece_type=None):
+        """
+        Create the move of the piece at (row, col) to (dest_row, dest_col). The move is not checked.
+        :param piece_type: The type of piece to promote to, if the move is a promotion (defaults to a queen)
+        :return: The move, packed in an int (see `pychess.move`)
+        """
+        start, dest = row * 8 + col, dest_row * 8 + dest_col
+        moving = self.squares[start] & 7
+        flags = move.FLAG_CAPTURE if self.squares[dest] != 0 else 0
+        promotion = 0
+        if moving == PAWN:
+            if dest_col != col and flags == 0:
+                flags = move.FLAG_CAPTURE | move.FLAG_EN_PASSANT
+            elif abs(dest_row - row) == 2:
+                flags = move.FLAG_DOUBLE_PUSH
+            if dest_row == 0 or dest_row == 7:
+                promotion = QUEEN if piece_type is None else piece_type.TYPE
+        elif moving == KING and abs(dest_col - col) == 2:
+            flags = move.FLAG_CASTLING
+        return move.encode(start, dest, flags, promotion)
+
+    def generate_moves(self, moves=None, color=None):
+        """
+        Generate the legal moves of a player.
+        :param moves: A list to fill with the moves. It is cleared first, so the same list can be reused to avoid allocations.
+        :param color: The color of the player, defaults to the player whose turn it is
+        :return: The list of moves, packed in ints (see `pychess.move`)
+        """
+        if moves is None:
+            moves = []
+        else:
+            moves.clear()
+        append = moves.append
+
+        us = self.turn if color is None else color
+        them = 1 - us
+        bbs = self.pieces[us]
+        enemies = self.pieces[them]
+        own = self.occupancy[us]
+        enemy = self.occupancy[them]
+        occupied = own | enemy
+        capture = move.FLAG_CAPTURE << move.FLAGS_SHIFT
+
+        king_bb = bbs[KING]
+        pinned = 0
+        if king_bb == 0:
+            king = None
+            checkers = 0
+        else:
+            king = king_bb.bit_length() - 1
+            checkers = self.attackers(king, them, occupied)
+
+            # Pinned pieces : the sliders attacking the king when the pieces of the player are removed, with a single piece between them
+            snipers = (ROOK_TABLES[king][enemy & ROOK_MASKS[king]] & (enemies[ROOK] | enemies[QUEEN])) \
+                | (BISHOP_TABLES[king][enemy & BISHOP_MASKS[king]] & (enemies[BISHOP] | enemies[QUEEN]))
+            while snipers:
+                bit = snipers & -snipers
+                snipers ^= bit
+                between = BETWEEN[king][bit.bit_length() - 1] & occupied
+                if between and between & (between - 1) == 0 and between & own:
+                    pinned |= between
+
+            # King moves : the king is removed from the occupancy so it does not block the sliders attacking it
+            targets = KING_ATTACKS[king] & ~own
+            without_king = occupied ^ king_bb
+            while targets:
+                bit = targets & -targets
+                targets ^= bit
+                dest = bit.bit_length() - 1
+                if not self.attackers(dest, them, without_king):
+                    append(king | dest << move.DEST_SHIFT | (capture if bit & enemy else 0))
+
+        if checkers & (checkers - 1):
+            # Double check, only the king can move
+            return moves
+
+        if checkers:
+            # The check can be stopped by taking the checking piece or by blocking its ray
+            target_mask = checkers | BETWEEN[king][checkers.bit_length() - 1]
+        else:
+            target_mask = FULL & ~own
+            if king is not None:
+                self._castling_moves(us, king, occupied, append)
+
+        # Knights, pinned knights cannot move
+        pieces = bbs[KNIGHT] & ~pinned
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            start = bit.bit_length() - 1
+            self._append_targets(start, KNIGHT_ATTACKS[start] & target_mask, enemy, append)
+
+        # Sliding pieces
+        for piece_type, rook_like, bishop_like in ((BISHOP, False, True), (ROOK, True, False), (QUEEN, True, True)):
+            pieces = bbs[piece_type]
+            while pieces:
+                bit = pieces & -pieces
+                pieces ^= bit
+                start = bit.bit_length() - 1
+                attacks = 0
+                if rook_like:
+                    attacks = ROOK_TABLES[start][occupied & ROOK_MASKS[start]]
+                if bishop_like:
+                    attacks |= BISHOP_TABLES[start][occupied & BISHOP_MASKS[start]]
+                attacks &= target_mask
+                if bit & pinned:
+                    attacks &= LINE[king][start]
+                self._append_targets(start, attacks, enemy, append)
+
+        self._pawn_moves(us, bbs[PAWN], enemy, occupied, target_mask, pinned, king, append)
+
+        return moves
+
+    @staticmethod
+    def _append_targets(start, targets, enemy, append):
+        capture = move.FLAG_CAPTURE << move.FLAGS_SHIFT
+        while targets:
+            bit = targets & -targets
+            targets ^= bit
+            append(start | (bit.bit_length() - 1) << move.DEST_SHIFT | (capture if bit & enemy else 0))
+
+    def _castling_moves(self, us, king, occupied, append):
+        # The king is not in check, the squares between the king and the rook must be empty and the squares the king goes
+        # through must not be attacked
+        them = 1 - us
+        if us == COLOR_WHITE:
+            sides = ((CASTLING_WHITE_KING, 7, 5, 6), (CASTLING_WHITE_QUEEN, 0, 3, 2))
+        else:
+            sides = ((CASTLING_BLACK_KING, 63, 61, 62), (CASTLING_BLACK_QUEEN, 56, 59, 58))
+        rooks = self.pieces[us][ROOK]
+        for right, rook, through, dest in sides:
+            if self.castling & right and rooks >> rook & 1 and BETWEEN[king][rook] & occupied == 0 \
+                    and not self.attackers(through, them, occupied) and not self.attackers(dest, them, occupied):
+                append(king | dest << move.DEST_SHIFT | move.FLAG_CASTLING << move.FLAGS_SHIFT)
+
+    def _pawn_moves(self, us, pawns, enemy, occupied, target_mask, pinned, king, append):
+        empty = ~occupied & FULL
+        if us == COLOR_WHITE:
+            single = (pawns << 8) & empty
+            double = ((single & RANK_3) << 8) & empty
+            forward = 8
+            # Captures towards the a file and towards the h file, with the shift from the start square to the destination
+            captures = (((pawns & ~FILE_A) << 7) & enemy, 7), (((pawns & ~FILE_H) << 9) & enemy, 9)
+        else:
+            single = (pawns >> 8) & empty
+            double = ((single & RANK_6) >> 8) & empty
+            forward = -8
+            captures = (((pawns & ~FILE_A) >> 9) & enemy, -9), (((pawns & ~FILE_H) >> 7) & enemy, -7)
+
+        for targets, shift, flags in ((single & target_mask, forward, 0), (double & target_mask, 2 * forward, move.FLAG_DOUBLE_PUSH),
+                                      (captures[0][0] & target_mask, captures[0][1], move.FLAG_CAPTURE),
+                                      (captures[1][0] & target_mask, captures[1][1], move.FLAG_CAPTURE)):
+            while targets:
+                bit = targets & -targets
+                targets ^= bit
+                dest = bit.bit_length() - 1
+                start = dest - shift
+                if pinned >> start & 1 and not LINE[king][start] & bit:
+                    continue
+                m = start | dest << move.DEST_SHIFT | flags << move.FLAGS_SHIFT
+                if dest >= 56 or dest < 8:
+                    for promotion_type in PROMOTION_TYPES:
+                        append(m | promotion_type << move.PROMOTION_SHIFT)
+                else:
+                    append(m)
+
+        if self.ep_square is not None:
+            ep = self.ep_square
+            taken = ep - forward
+            attackers = PAWN_ATTACKS[1 - us][ep] & pawns
+            while attackers:
+                bit = attackers & -attackers
+                attackers ^= bit
+                start = bit.bit_length() - 1
+                if king is not None:
+                    # Two pieces leave the rank of the king, so the position after the move is tested
+                    after = occupied ^ bit ^ (1 << ep) ^ (1 << taken)
+                    if self.attackers(king, 1 - us, after) & ~(1 << taken):
+                        continue
+                append(start | ep << move.DEST_SHIFT | (move.FLAG_CAPTURE | move.FLAG_EN_PASSANT) << move.FLAGS_SHIFT)
+
+    def push(self, m):
+        """
+        Play a move and pass the turn to the opponent. The move can be undone with `pop()`. The move is not checked.
+        :param m: The move, packed in an int (see `pychess.move`)
+        """
+        start = m & move.SQUARE_MASK
+        dest = m >> move.DEST_SHIFT & move.SQUARE_MASK
+        flags = m >> move.FLAGS_SHIFT & 0xF
+        promotion = m >> move.PROMOTION_SHIFT
+
+        squares = self.squares
+        code = squares[start]
+        piece_type = code & 7
+        us = code >> 3
+        them = 1 - us
+        bbs = self.pieces[us]
+        start_bit = 1 << start
+        dest_bit = 1 << dest
+
+        captured = squares[dest]
+        self._undo_stack.append((m, captured, self.castling, self.ep_square, self.halfmove_clock, self.fullmove_nb, self.zobrist,
+                                 self.midgame_score, self.endgame_score, self.phase))
+        zobrist_keys = self.zobrist_keys
+        keys = zobrist_keys.pieces[us]
+        key = self.zobrist ^ keys[piece_type][start] ^ keys[promotion or piece_type][dest] ^ zobrist_keys.turn \
+            ^ zobrist_keys.castling[self.castling] ^ self._en_passant_key()
+        tables = self.pst
+        midgame = tables.midgame
+        endgame = tables.endgame
+        mg_table = midgame[us]
+        eg_table = endgame[us]
+        dest_type = promotion or piece_type
+        mg = self.midgame_score - mg_table[piece_type][start] + mg_table[dest_type][dest]
+        eg = self.endgame_score - eg_table[piece_type][start] + eg_table[dest_type][dest]
+        phase = self.phase + tables.phase[dest_type] - tables.phase[piece_type]
+
+        if captured:
+            self.pieces[them][captured & 7] ^= dest_bit
+            self.occupancy[them] ^= dest_bit
+            key ^= zobrist_keys.pieces[them][captured & 7][dest]
+            mg -= midgame[them][captured & 7][dest]
+            eg -= endgame[them][captured & 7][dest]
+            phase -= tables.phase[captured & 7]
+        elif flags & move.FLAG_EN_PASSANT:
+            taken = dest - 8 if us == COLOR_WHITE else dest + 8
+            self.pieces[them][PAWN] ^= 1 << taken
+            self.occupancy[them] ^= 1 << taken
+            squares[taken] = 0
+            key ^= zobrist_keys.pieces[them][PAWN][taken]
+            mg -= midgame[them][PAWN][taken]
+            eg -= endgame[them][PAWN][taken]
+            phase -= tables.phase[PAWN]
+
+        bbs[piece_type] ^= start_bit | dest_bit
+        self.occupancy[us] ^= start_bit | dest_bit
+        squares[start] = 0
+        squares[dest] = code
+
+        if promotion:
+            bbs[PAWN] ^= dest_bit
+            bbs[promotion] |= dest_bit
+            squares[dest] = promotion | us << 3
+        elif flags & move.FLAG_CASTLING:
+            rook, rook_dest = (start + 3, start + 1) if dest > start else (start - 4, start - 1)
+            bits = 1 << rook | 1 << rook_dest
+            bbs[ROOK] ^= bits
+            self.occupancy[us] ^= bits
+            squares[rook_dest] = squares[rook]
+            squares[rook] = 0
+            key ^= keys[ROOK][rook] ^ keys[ROOK][rook_dest]
+            mg += mg_table[ROOK][rook_dest] - mg_table[ROOK][rook]
+            eg += eg_table[ROOK][rook_dest] - eg_table[ROOK][rook]
+
+        self.castling &= CASTLING_MASKS[start] & CASTLING_MASKS[dest]
+        self.ep_square = (start + dest) // 2 if flags & move.FLAG_DOUBLE_PUSH else None
+        if captured or piece_type == PAWN:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if us == COLOR_BLACK:
+            self.fullmove_nb += 1
+        self.turn = them
+        self.zobrist = key ^ zobrist_keys.castling[self.castling] ^ self._en_passant_key()
+        self.midgame_score = mg
+        self.endgame_score = eg
+        self.phase = phase
+
+    def pop(self):
+        """
+        Undo the last move played with `push()`.
+        :return: The move undone
+        """
+        m, captured, self.castling, self.ep_square, self.halfmove_clock, self.fullmove_nb, self.zobrist, \
+            self.midgame_score, self.endgame_score, self.phase = self._undo_stack.pop()
+        start = m & move.SQUARE_MASK
+        dest = m >> move.DEST_SHIFT & move.SQUARE_MASK
+        flags = m >> move.FLAGS_SHIFT & 0xF
+        promotion = m >> move.PROMOTION_SHIFT
+
+        squares = self.squares
+        us = 1 - self.turn
+        them = self.turn
+        self.turn = us
+        bbs = self.pieces[us]
+        start_bit = 1 << start
+        dest_bit = 1 << dest
+
+        if promotion:
+            bbs[promotion] ^= dest_bit
+            bbs[PAWN] |= dest_bit
+            code = PAWN | us << 3
+        else:
+            code = squares[dest]
+            if flags & move.FLAG_CASTLING:
+                rook, rook_dest = (start + 3, start + 1) if dest > start else (start - 4, start - 1)
+                bits = 1 << rook | 1 << rook_dest
+                bbs[ROOK] ^= bits
+                self.occupancy[us] ^= bits
+                squares[rook] = squares[rook_dest]
+                squares[rook_dest] = 0
+
+        bbs[code & 7] ^= start_bit | dest_bit
+        self.occupancy[us] ^= start_bit | dest_bit
+        squares[start] = code
+        squares[dest] = captured
+
+        if captured:
+            self.pieces[them][captured & 7] |= dest_bit
+            self.occupancy[them] |= dest_bit
+        elif flags & move.FLAG_EN_PASSANT:
+            taken = dest - 8 if us == COLOR_WHITE else dest + 8
+            self.pieces[them][PAWN] |= 1 << taken
+            self.occupancy[them] |= 1 << taken
+            squares[taken] = PAWN | them << 3
+
+        return m
+
+    # The perft functions only use generate_moves(), push() and pop(), so they are shared with Board
+    perft = Board.perft
+    _perft = Board._perft
+    divide = Board.divide
@@ -1,7 +1,40 @@
+import itertools
 import re
 from pychess.player import *
 import pychess.pieces as pieces
 import pychess.signals as signals
+import pychess.move as move
+import pychess.attacks as attacks
+import pychess.zobrist as zobrist
+import pychess.pst as pst
+import pychess.packed as packed
+
+# Groups : pieces, turn, castling, en passant, halfmove clock, fullmove number
+FEN_REGEX = re.compile(r"^((?:[p,n,b,r,q,k,1-8]{1,8}/?){8}) ([w,b]) (-|(?:k?q?){2}) (-|[a-h][1-8]) ([0-9]+) ([0-9]+)", re.IGNORECASE)
+
+# Types of the sliding pieces moving along ranks and files, and along diagonals
+ORTHOGONAL_SLIDERS = (pieces.ROOK, pieces.QUEEN)
+DIAGONAL_SLIDERS = (pieces.BISHOP, pieces.QUEEN)
+
+# Types of pieces a pawn can be promoted to
+PROMOTION_TYPES = (pieces.QUEEN, pieces.ROOK, pieces.BISHOP, pieces.KNIGHT)
+
+# Values of the pieces in the static exchange evaluation, indexed by type. The king can only take last.
+SEE_VALUES = (0, 1, 3, 3, 5, 9, 100)
+
+# Castling rights
+CASTLING_WHITE_KING = 1
+CASTLING_WHITE_QUEEN = 2
+CASTLING_BLACK_KING = 4
+CASTLING_BLACK_QUEEN = 8
+CASTLING_LETTERS = ((CASTLING_WHITE_KING, "K"), (CASTLING_WHITE_QUEEN, "Q"), (CASTLING_BLACK_KING, "k"), (CASTLING_BLACK_QUEEN, "q"))
+
+# Number of ranks of OFF_BOARD squares below and above the board in the mailbox, so the jumps of a knight stay in the
+# list, and of OFF_BOARD squares between two ranks (one file on each side of the board)
+MAILBOX_PADDING = 2
+
+# Format strings for printing the boards, indexed by shape (see `Board.__init_grid_str`)
+_GRID_STRS = {}
 
 
 class Board:
@@ -16,6 +49,15 @@ class Board:
 
         # The squares are stored from white's perspective, from rank 1 to 8 and file a to h, with cells[0][0] being the square a1 and cells[7,7] being the square h8
         self.ranks = [[None for _ in range(shape[1])] for _ in range(shape[0])]
+        # The same squares in a single list, surrounded by `pychess.pieces.OFF_BOARD` squares (like the 10x12 board of 8x8 engines, for
+        # any shape) : a square is found from a neighbour by adding an offset to its index, and a ray walked this way
+        # stops on an OFF_BOARD square without checking the coordinates (see `mailbox_index` and `is_path_clear`)
+        self.mailbox_stride = shape[1] + MAILBOX_PADDING
+        self.mailbox_origin = MAILBOX_PADDING * self.mailbox_stride + MAILBOX_PADDING // 2
+        self.mailbox = [pieces.OFF_BOARD] * ((shape[0] + 2 * MAILBOX_PADDING) * self.mailbox_stride)
+        for row in range(shape[0]):
+            start = self.mailbox_index(row, 0)
+            self.mailbox[start:start + shape[1]] = [None] * shape[1]
         self.en_passant = en_passant
         self.turn = COLOR_WHITE  # White's turn
         self.halfmove_clock = 0
@@ -29,8 +71,25 @@ class Board:
         self.black = black
         self.black.board = self
         self.players = [white, black]
+        self._undo_stack = []
+        self._pseudo_legal_moves = []
+        self.attack_tables = attacks.get_tables(shape)
+        self.zobrist_keys = zobrist.get_keys(shape)
+        # Zobrist key of the pieces on the board, updated each time a square changes
+        self._pieces_key = 0
+        self.pst = pst.get_tables(shape)
+        # Sums of the piece-square values of the pieces (white's point of view), and phase of the game (see `pychess.pst`)
+        self.midgame_score = 0
+        self.endgame_score = 0
+        self.phase = 0
+        # Pieces on the board of each player, indexed by color and type (see `pychess.pieces.Piece.TYPE`). The lists are
+        # updated when a piece is added or removed, taken, promoted, and when a move is undone, so the loops over the
+        # pieces of a player (`Player.pieces` keeps all of them) do not go through the pieces taken.
+        self.piece_lists = tuple(tuple([] for _ in range(7)) for _ in range(2))
         self.__init_grid_str()
-        self.__init_event_handlers__()
+        # Events of the pieces of this board only (see `pychess.signals`). The board does not listen to them : the
+        # pieces update it directly, and only send the events that have receivers.
+        self.events = signals.BoardEvents()
 
     @classmethod
     def from_fen(cls, fen, white=None, black=None):
@@ -41,8 +100,7 @@ class Board:
 
         # Split the string in the corresponding groups
 
-        m = re.compile(r"^((?:[p,n,b,r,q,k,1-8]{1,8}/?){8}) ([w,b]) (-|(?:k?q?){2}) (-|[a-h][1-8]) ([0-9]+) ([0-9]+)", re.IGNORECASE)
-        g = m.search(fen)
+        g = FEN_REGEX.search(fen)
         if g:
             board_str = g.group(1)
             turn = g.group(2)
@@ -91,33 +149,7 @@ class Board:
                 # Something went wrong : not enough or too many squares in this rank
                 raise ValueError("Invalid number of squares on rank "+str(y + 1)+" ('"+rank+"'). Got "+str(file + 1)+" squares instead of 8")
 
-        # Castling
-        # TODO: Better castling checks
-        if castling == "-":  # No castling
-            if board.white.king is not None:
-                board.white.king.has_moved = True
-            if board.black.king is not None:
-                board.black.king.has_moved = True
-        else:
-            # White king side (h1)
-            rook = board.get_cell(0,7)
-            if "K" not in castling and rook is not None and isinstance(rook, pieces.Rook):
-                rook.has_moved = True
-
-            # White queen side (a1)
-            rook = board.get_cell(0, 0)
-            if "Q" not in castling and rook is not None and isinstance(rook, pieces.Rook):
-                rook.has_moved = True
-
-            # Black king side (h8)
-            rook = board.get_cell(7, 7)
-            if "k" not in castling and rook is not None and isinstance(rook, pieces.Rook):
-                rook.has_moved = True
-
-            # Black queen side (a8)
-            rook = board.get_cell(7, 0)
-            if "q" not in castling and rook is not None and isinstance(rook, pieces.Rook):
-                rook.has_moved = True
+        board._set_castling_rights(sum(right for right, letter in CASTLING_LETTERS if letter in castling))
 
         board.turn = 0 if turn == "w" else 1
         board.halfmove_clock = halfmove_clock
@@ -130,6 +162,53 @@ class Board:
 
         return board
 
+    @classmethod
+    def from_bytes(cls, data, white=None, black=None):
+        """
+        Create a board from the binary encoding of a position (see `pychess.packed`).
+        """
+        codes, castling, turn, ep_square, halfmove_clock, fullmove_nb = packed.unpack(data)
+        board = Board(white=white, black=black)
+        for square, code in enumerate(codes):
+            if code:
+                if not 1 <= code & 7 <= 6:
+                    raise ValueError("Invalid piece code " + str(code))
+                player = board.white if code >> 3 == COLOR_WHITE else board.black
+                board.add_piece(pieces.TYPES[code & 7](player), square // 8, square % 8)
+        board._set_castling_rights(castling)
+        board.turn = turn
+        board.halfmove_clock = halfmove_clock
+        board.fullmove_nb = fullmove_nb
+        board.en_passant = None if ep_square is None else divmod(ep_square, 8)
+        return board
+
+    def _set_castling_rights(self, rights):
+        """
+        Mark the kings and rooks as moved when their castling rights are not available.
+        :param rights: The castling rights available (see `castling_rights()`)
+        """
+        # TODO: Better castling checks
+        if rights == 0:
+            if self.white.king is not None:
+                self.white.king.has_moved = True
+            if self.black.king is not None:
+                self.black.king.has_moved = True
+            return
+        for right, row, col in ((CASTLING_WHITE_KING, 0, 7), (CASTLING_WHITE_QUEEN, 0, 0), (CASTLING_BLACK_KING, 7, 7), (CASTLING_BLACK_QUEEN, 7, 0)):
+            rook = self.get_cell(row, col)
+            if not rights & right and rook is not None and isinstance(rook, pieces.Rook):
+                rook.has_moved = True
+
+    def to_bytes(self):
+        """
+        Encode the position in `pychess.packed.RECORD_SIZE` bytes (see `pychess.packed`). Only the 8x8 boards can be encoded.
+        """
+        if self.shape != (8, 8):
+            raise ValueError("Only the 8x8 boards can be encoded")
+        codes = [0 if piece is None else piece.TYPE | piece.color << 3 for rank in self.ranks for piece in rank]
+        ep_square = None if self.en_passant is None else self.en_passant[0] * 8 + self.en_passant[1]
+        return packed.pack(codes, self.castling_rights(), self.turn, ep_square, self.halfmove_clock, self.fullmove_nb)
+
     def to_fen(self):
         # Encode position
         position = ""
@@ -154,32 +233,8 @@ class Board:
 
         turn = "w" if self.turn == COLOR_WHITE else "b"
 
-        castling = ""
-        # TODO: Better checks for castling
-        # White castling
-        if self.white.king is not None and not self.white.king.has_moved:
-            # King side (h1)
-            rook = self.ranks[0][7]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "K"
-
-            # Queen side (a1)
-            rook = self.ranks[0][0]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "Q"
-
-        # Black castling
-        if self.black.king is not None and not self.black.king.has_moved:
-            # King side (h8)
-            rook = self.ranks[7][7]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "k"
-
-            # Queen side (a8)
-            rook = self.ranks[7][0]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "q"
-
+        rights = self.castling_rights()
+        castling = "".join(letter for right, letter in CASTLING_LETTERS if rights & right)
         if castling == "":
             castling = "-"
 
@@ -197,35 +252,48 @@ class Board:
     def next_turn(self):
         if self.turn == COLOR_WHITE:
             self.turn = COLOR_BLACK
-            if self.fullmove_nb != 1:
-                self.fullmove_nb += 1
         else:
             self.turn = COLOR_WHITE
             self.fullmove_nb += 1
 
-    def _on_piece_move(self, piece, **kwargs):
-        start_row, start_col = kwargs["start"]
-        dest_row, dest_col = kwargs["dest"]
+    def _on_piece_move(self, piece, start_row, start_col, dest_row, dest_col):
+        """
+        Update the state of the board before a piece moves (called by `Piece.move`).
+        """
         if isinstance(piece, pieces.Pawn) and dest_row == start_row + 2 * piece.direction:
             self.en_passant = (dest_row - piece.direction, dest_col)
         else:
             self.en_passant = None
 
-        # Increment the halfmove clock
-        if self.turn == COLOR_BLACK and not isinstance(piece, pieces.Pawn):
-            # We increment only after black's turn because here a "move" consists of a player completing a turn followed by the opponent completing a turn
+        # The halfmove clock counts the plies since the last pawn move or capture, like `push` (a capture resets it in
+        # `_on_piece_taken`)
+        if isinstance(piece, pieces.Pawn):
+            self.halfmove_clock = 0
+        else:
             self.halfmove_clock += 1
 
-    def _on_piece_taken(self, piece, **kwargs):
+    def _on_piece_taken(self, piece):
+        """
+        Update the state of the board when a piece is taken (called by `Piece.on_eat`).
+        """
         # Reset the halfmove clock
         self.halfmove_clock = 0
+        piece_list = self.piece_lists[piece.color][piece.TYPE]
+        if piece in piece_list:
+            piece_list.remove(piece)
 
     def __init_grid_str(self):
         """
         Initialize the format strings for printing the board.
         grid_str : format string without labels
         grid_str_label : format string with labels
+        The strings are shared by the boards of the same shape.
         """
+        strings = _GRID_STRS.get(self.shape)
+        if strings is not None:
+            self.grid_str, self.grid_str_label = strings
+            return
+
         grid_str = "┌─────" + (self.shape[1] - 1) * "┬─────" + "┐\n"
         for i in range(self.shape[0] - 1):
             grid_str += "│  {}  " * self.shape[1] + "│\n"
@@ -247,43 +315,307 @@ class Board:
         grid_str_label += "   └─────" + (self.shape[1] - 1) * "┴─────" + "┘\n"
 
         self.grid_str_label = grid_str_label
+        _GRID_STRS[self.shape] = (grid_str, grid_str_label)
 
-    def __init_event_handlers__(self):
+    def get_cell(self, rank, file):
+        return self.ranks[rank][file]
 
-        # Piece move event
-        def handle_piece_move(sender, **kwargs):
-            self._on_piece_move(sender, **kwargs)
-        self.handle_piece_move = handle_piece_move
-        signals.PIECE_MOVE.connect(handle_piece_move)
+    def mailbox_index(self, rank, file):
+        """
+        Get the index of a square in `mailbox`. The offset between two squares does not depend on where they are : it is
+        `rows * mailbox_stride + cols`.
+        """
+        return self.mailbox_origin + rank * self.mailbox_stride + file
 
-        # Piece take
-        def handle_piece_taken(sender, **kwargs):
-            self._on_piece_taken(sender, **kwargs)
+    def is_path_clear(self, rank, file, dest_rank, dest_file):
+        """
+        Check if the squares between two squares on the same rank, file or diagonal are empty.
+        """
+        stride = self.mailbox_stride
+        step = ((dest_rank > rank) - (dest_rank < rank)) * stride + (dest_file > file) - (dest_file < file)
+        index = self.mailbox_origin + rank * stride + file + step
+        dest = self.mailbox_origin + dest_rank * stride + dest_file
+        mailbox = self.mailbox
+        while index != dest:
+            if mailbox[index] is not None:
+                return False
+            index += step
+        return True
+
+    def type_at(self, square):
+        """
+        Get the type of the piece on a square (see `pychess.pieces.Piece.TYPE`), or 0 if the square is empty.
+        :param square: The index of the square (`row * files + col`)
+        """
+        piece = self.ranks[square // self.shape[1]][square % self.shape[1]]
+        return 0 if piece is None else piece.TYPE
 
-        self.handle_piece_taken = handle_piece_taken
-        signals.PIECE_TAKEN.connect(handle_piece_taken)
+    def color_at(self, square):
+        """
+        Get the color of the piece on a square, or None if the square is empty.
+        :param square: The index of the square (`row * files + col`)
+        """
+        piece = self.ranks[square // self.shape[1]][square % self.shape[1]]
+        return None if piece is None else piece.color
 
-    def get_cell(self, rank, file):
-        return self.ranks[rank][file]
+    def set_cell(self, rank, file, piece):
+        """
+        Put a piece on a square, or empty it if piece is None, and update the Zobrist key and the piece-square scores.
+        The coordinates of the pieces and the piece lists are not changed (see `add_piece` and `remove_piece`).
+        """
+        keys = self.zobrist_keys.pieces
+        tables = self.pst
+        square = rank * self.shape[1] + file
+        old = self.ranks[rank][file]
+        if old is not None:
+            self._pieces_key ^= keys[old.color][old.TYPE][square]
+            self.midgame_score -= tables.midgame[old.color][old.TYPE][square]
+            self.endgame_score -= tables.endgame[old.color][old.TYPE][square]
+            self.phase -= tables.phase[old.TYPE]
+        if piece is not None:
+            self._pieces_key ^= keys[piece.color][piece.TYPE][square]
+            self.midgame_score += tables.midgame[piece.color][piece.TYPE][square]
+            self.endgame_score += tables.endgame[piece.color][piece.TYPE][square]
+            self.phase += tables.phase[piece.TYPE]
+        self.ranks[rank][file] = piece
+        self.mailbox[self.mailbox_origin + rank * self.mailbox_stride + file] = piece
+
+    def set_pst(self, tables):
+        """
+        Use other piece-square tables, and compute the scores of the pieces on the board with them.
+        :param tables: The `pychess.pst.PieceSquareTables`, for the shape of the board
+        """
+        self.pst = tables
+        self.midgame_score = 0
+        self.endgame_score = 0
+        self.phase = 0
+        files = self.shape[1]
+        for rank in range(self.shape[0]):
+            for file in range(files):
+                piece = self.ranks[rank][file]
+                if piece is not None:
+                    square = rank * files + file
+                    self.midgame_score += tables.midgame[piece.color][piece.TYPE][square]
+                    self.endgame_score += tables.endgame[piece.color][piece.TYPE][square]
+                    self.phase += tables.phase[piece.TYPE]
+
+    def castling_rights(self):
+        """
+        Get the castling rights of the players, from the kings and rooks that have not moved.
+        :return: A bitmask of `CASTLING_WHITE_KING`, `CASTLING_WHITE_QUEEN`, `CASTLING_BLACK_KING` and `CASTLING_BLACK_QUEEN`
+        """
+        rights = 0
+        for player, row, king_side, queen_side in ((self.white, 0, CASTLING_WHITE_KING, CASTLING_WHITE_QUEEN),
+                                                   (self.black, self.shape[0] - 1, CASTLING_BLACK_KING, CASTLING_BLACK_QUEEN)):
+            if player.king is None or player.king.has_moved:
+                continue
+            rank = self.ranks[row]
+            rook = rank[-1]
+            if rook is not None and isinstance(rook, pieces.Rook) and rook.color == player.color and not rook.has_moved:
+                rights |= king_side
+            rook = rank[0]
+            if rook is not None and isinstance(rook, pieces.Rook) and rook.color == player.color and not rook.has_moved:
+                rights |= queen_side
+        return rights
+
+    @property
+    def zobrist(self):
+        """
+        The 64 bits Zobrist key of the position (pieces, side to move, castling rights and en passant file).
+        The en passant file is only taken into account if a pawn can take en passant, so that positions that only differ
+        by an unusable en passant square have the same key.
+        """
+        keys = self.zobrist_keys
+        key = self._pieces_key ^ keys.castling[self.castling_rights()]
+        if self.turn == COLOR_BLACK:
+            key ^= keys.turn
+        if self.en_passant is not None:
+            ep_row, ep_col = self.en_passant
+            # The pawns that can take are on the rank the opponent's pawn arrived on
+            row = ep_row - 1 if self.turn == COLOR_WHITE else ep_row + 1
+            if 0 <= row < self.shape[0]:
+                for col in (ep_col - 1, ep_col + 1):
+                    if 0 <= col < self.shape[1]:
+                        pawn = self.ranks[row][col]
+                        if pawn is not None and pawn.TYPE == pieces.PAWN and pawn.color == self.turn:
+                            key ^= keys.en_passant[ep_col]
+                            break
+        return key
 
     def is_valid(self, rank, file):
-        return 0 <= rank < self.shape[0] and 0 <= file < self.shape[0]
+        return 0 <= rank < self.shape[0] and 0 <= file < self.shape[1]
 
-    def is_check(self, player, ignorepiece=None):
-        king_row = player.king.row
-        king_col = player.king.col
-        for p in self.players:
-            if p == player:
-                continue
-            for piece in p.pieces:
-                if piece == ignorepiece:
-                    continue
-                if piece.can_move(king_row, king_col, ignoreillegal=True):
-                    if self.debug:
-                        print("Piece "+str(piece)+ " at "+str(piece.row)+ " " + str(piece.col) + " is checking king "+str(player.color))
+    def is_check(self, player=None):
+        """
+        Check if the king of a player is attacked.
+        :param player: The player or its color, defaults to the player whose turn it is
+        """
+        if player is None:
+            player = self.white if self.turn == COLOR_WHITE else self.black
+        elif isinstance(player, int):
+            player = self.white if player == COLOR_WHITE else self.black
+        king = player.king
+        if king is None or king.row is None:
+            return False
+        return self.is_square_attacked(king.row * self.shape[1] + king.col, 1 - player.color)
+
+    def material(self, color):
+        """
+        Get the total value of the pieces of a player on the board.
+        """
+        return sum(piece.value for piece_list in self.piece_lists[color] for piece in piece_list)
+
+    def is_square_attacked(self, square, by_color):
+        """
+        Check if a square is attacked by a player. The attacks are searched from the square, with the attack tables.
+        :param square: The index of the square (`row * files + col`)
+        :param by_color: The color of the attacking player
+        :return: True if a piece of the player attacks the square, otherwise False
+        """
+        ranks = self.ranks
+        tables = self.attack_tables
+        # The attacks of the types of pieces the player does not have any more are not searched
+        piece_lists = self.piece_lists[by_color]
+
+        if piece_lists[pieces.KNIGHT]:
+            for r, c in tables.knight[square]:
+                piece = ranks[r][c]
+                if piece is not None and piece.TYPE == pieces.KNIGHT and piece.color == by_color:
+                    return True
+
+        # A pawn attacking the square is on a square a pawn of the opponent would attack from this square
+        if piece_lists[pieces.PAWN]:
+            for r, c in tables.pawn[1 - by_color][square]:
+                piece = ranks[r][c]
+                if piece is not None and piece.TYPE == pieces.PAWN and piece.color == by_color:
                     return True
+
+        queens = piece_lists[pieces.QUEEN]
+        for rays, sliders in ((tables.rook_rays[square] if queens or piece_lists[pieces.ROOK] else (), ORTHOGONAL_SLIDERS),
+                              (tables.bishop_rays[square] if queens or piece_lists[pieces.BISHOP] else (), DIAGONAL_SLIDERS)):
+            for ray in rays:
+                for r, c in ray:
+                    piece = ranks[r][c]
+                    if piece is not None:
+                        if piece.color == by_color and piece.TYPE in sliders:
+                            return True
+                        break
+
+        for r, c in tables.king[square]:
+            piece = ranks[r][c]
+            if piece is not None and piece.TYPE == pieces.KING and piece.color == by_color:
+                return True
+
         return False
 
+    def piece_attackers(self, square, color, piece_type):
+        """
+        Find the pieces of a type and a color attacking a square. The pins are not taken into account.
+        :param square: The index of the square (`row * files + col`)
+        :param color: The color of the pieces
+        :param piece_type: The type of the pieces (see `pychess.pieces.Piece.TYPE`)
+        :return: The list of the indexes of the squares of the pieces
+        """
+        ranks = self.ranks
+        files = self.shape[1]
+        tables = self.attack_tables
+        if piece_type == pieces.KNIGHT:
+            candidates = tables.knight[square]
+        elif piece_type == pieces.KING:
+            candidates = tables.king[square]
+        elif piece_type == pieces.PAWN:
+            candidates = tables.pawn[1 - color][square]
+        else:
+            # The first piece on each ray
+            rays = tables.queen_rays if piece_type == pieces.QUEEN else tables.rook_rays if piece_type == pieces.ROOK else tables.bishop_rays
+            candidates = []
+            for ray in rays[square]:
+                for r, c in ray:
+                    if ranks[r][c] is not None:
+                        candidates.append((r, c))
+                        break
+
+        attackers = []
+        for r, c in candidates:
+            piece = ranks[r][c]
+            if piece is not None and piece.TYPE == piece_type and piece.color == color:
+                attackers.append(r * files + c)
+        return attackers
+
+    def _least_valuable_attacker(self, square, color, removed):
+        """
+        Find the piece of a player of lowest value attacking a square, ignoring the pieces on the removed squares (so the
+        sliding pieces behind them attack through).
+        :param removed: A set of indexes of squares
+        :return: A tuple (value, index of the square of the piece), or None if the square is not attacked
+        """
+        ranks = self.ranks
+        tables = self.attack_tables
+        files = self.shape[1]
+
+        for squares, piece_type in ((tables.pawn[1 - color][square], pieces.PAWN), (tables.knight[square], pieces.KNIGHT)):
+            for r, c in squares:
+                piece = ranks[r][c]
+                if piece is not None and piece.TYPE == piece_type and piece.color == color and r * files + c not in removed:
+                    return SEE_VALUES[piece_type], r * files + c
+
+        best = None
+        for rays, sliders in ((tables.bishop_rays[square], DIAGONAL_SLIDERS), (tables.rook_rays[square], ORTHOGONAL_SLIDERS)):
+            for ray in rays:
+                for r, c in ray:
+                    piece = ranks[r][c]
+                    if piece is not None and r * files + c not in removed:
+                        if piece.color == color and piece.TYPE in sliders and (best is None or SEE_VALUES[piece.TYPE] < best[0]):
+                            best = SEE_VALUES[piece.TYPE], r * files + c
+                        break
+        if best is not None:
+            return best
+
+        for r, c in tables.king[square]:
+            piece = ranks[r][c]
+            if piece is not None and piece.TYPE == pieces.KING and piece.color == color and r * files + c not in removed:
+                return SEE_VALUES[pieces.KING], r * files + c
+        return None
+
+    def see(self, m):
+        """
+        Static exchange evaluation : the material won by a capture, if both players then keep taking on the square with their
+        least valuable piece while it is profitable. The moves are not played, and the pins are ignored.
+        :param m: The move, packed in an int (see `pychess.move`)
+        :return: The material won, in pawns (see `SEE_VALUES`)
+        """
+        files = self.shape[1]
+        start = m & move.SQUARE_MASK
+        dest = m >> move.DEST_SHIFT & move.SQUARE_MASK
+        row, col = divmod(start, files)
+        dest_row, dest_col = divmod(dest, files)
+        piece = self.ranks[row][col]
+        removed = {start}
+
+        if m >> move.FLAGS_SHIFT & move.FLAG_EN_PASSANT:
+            gains = [SEE_VALUES[pieces.PAWN]]
+            removed.add(row * files + dest_col)
+        else:
+            victim = self.ranks[dest_row][dest_col]
+            gains = [0 if victim is None else SEE_VALUES[victim.TYPE]]
+
+        attacker_value = SEE_VALUES[piece.TYPE]
+        color = 1 - piece.color
+        while True:
+            attacker = self._least_valuable_attacker(dest, color, removed)
+            if attacker is None:
+                break
+            # The player takes the last piece that took
+            gains.append(attacker_value - gains[-1])
+            attacker_value, square = attacker
+            removed.add(square)
+            color = 1 - color
+
+        # Each player can stop taking if it is not profitable
+        for i in range(len(gains) - 1, 0, -1):
+            gains[i - 1] = -max(-gains[i - 1], gains[i])
+        return gains[0]
+
     def is_checkmate(self, player):
         if self.is_check(player) and not player.can_move():
             return True
@@ -306,21 +638,449 @@ class Board:
         :param dest_col: The destination cell's y
         :return: True if the move is illegal, otherwise False.
         """
-        # We move the piece and keep in dest_piece the piece in the destination cell
-        dest_piece, self.ranks[row][col], self.ranks[dest_row][dest_col] = self.ranks[dest_row][dest_col], None, self.ranks[row][col]
-        piece = self.ranks[dest_row][dest_col]
+        # We play the move, so castling, en passant and promotions are taken into account, then undo it
+        self.push(self.get_move(row, col, dest_row, dest_col))
+        check = self.is_check(player)
+        self.pop()
+
+        return check
+
+    def get_move(self, row, col, dest_row, dest_col, piece_type=None):
+        """
+        Create the move of the piece at (row, col) to (dest_row, dest_col). The move is not checked.
+        :param piece_type: The type of piece to promote to, if the move is a promotion (defaults to a queen)
+        :return: The move, packed in an int (see `pychess.move`)
+        """
+        piece = self.ranks[row][col]
+        flags = 0
+        promotion = 0
+        if self.ranks[dest_row][dest_col] is not None:
+            flags = move.FLAG_CAPTURE
+
+        if piece.TYPE == pieces.PAWN:
+            if dest_col != col and flags == 0:
+                flags = move.FLAG_CAPTURE | move.FLAG_EN_PASSANT
+            elif abs(dest_row - row) == 2:
+                flags = move.FLAG_DOUBLE_PUSH
+
+            if dest_row == 0 or dest_row == self.shape[0] - 1:
+                promotion = pieces.QUEEN if piece_type is None else piece_type.TYPE
+
+        elif piece.TYPE == pieces.KING and abs(dest_col - col) == 2:
+            flags = move.FLAG_CASTLING
+
+        files = self.shape[1]
+        return move.encode(row * files + col, dest_row * files + dest_col, flags, promotion)
+
+    def push(self, m):
+        """
+        Play a move on the board and pass the turn to the opponent. The move can be undone with `pop()`.
+        The move is not checked, and no signal is sent.
+        :param m: The move, packed in an int (see `pychess.move`)
+        """
+        files = self.shape[1]
+        row, col = divmod(m & move.SQUARE_MASK, files)
+        dest_row, dest_col = divmod(m >> move.DEST_SHIFT & move.SQUARE_MASK, files)
+        flags = m >> move.FLAGS_SHIFT & 0xF
+        promotion = m >> move.PROMOTION_SHIFT
+
+        piece = self.ranks[row][col]
+        player = piece.player
+        dest_piece = self.ranks[dest_row][dest_col]
+        captured = dest_piece
+        has_moved = getattr(piece, "has_moved", None)
+        rook = None
+        promoted = None
+        en_passant, halfmove_clock, fullmove_nb = self.en_passant, self.halfmove_clock, self.fullmove_nb
+        pieces_key = self._pieces_key
+        keys = self.zobrist_keys.pieces[player.color]
+        start_square = row * files + col
+        dest_square = dest_row * files + dest_col
+        key = pieces_key ^ keys[piece.TYPE][start_square] ^ keys[promotion or piece.TYPE][dest_square]
+        scores = self.midgame_score, self.endgame_score, self.phase
+        tables = self.pst
+        midgame = tables.midgame
+        endgame = tables.endgame
+        mg_table = midgame[player.color]
+        eg_table = endgame[player.color]
+        dest_type = promotion or piece.TYPE
+        mg = scores[0] - mg_table[piece.TYPE][start_square] + mg_table[dest_type][dest_square]
+        eg = scores[1] - eg_table[piece.TYPE][start_square] + eg_table[dest_type][dest_square]
+        phase = scores[2] + tables.phase[dest_type] - tables.phase[piece.TYPE]
+
+        mailbox = self.mailbox
+        stride = self.mailbox_stride
+        row_index = self.mailbox_origin + row * stride
+        dest_index = self.mailbox_origin + dest_row * stride + dest_col
+        self.ranks[row][col] = None
+        self.ranks[dest_row][dest_col] = piece
+        mailbox[row_index + col] = None
+        mailbox[dest_index] = piece
         piece.row = dest_row
         piece.col = dest_col
 
-        check = self.is_check(player, ignorepiece=dest_piece)
+        self.en_passant = None
+        if flags & move.FLAG_CAPTURE or piece.TYPE == pieces.PAWN:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
 
-        # We revert the board to it's original state
-        self.ranks[row][col], self.ranks[dest_row][dest_col] = self.ranks[dest_row][dest_col], dest_piece
-        piece = self.ranks[row][col]
+        if flags & move.FLAG_EN_PASSANT:
+            # The pawn taken is next to the start square
+            captured = self.ranks[row][dest_col]
+            self.ranks[row][dest_col] = None
+            mailbox[row_index + dest_col] = None
+            if captured is not None:
+                key ^= self.zobrist_keys.pieces[captured.color][pieces.PAWN][row * files + dest_col]
+                mg -= midgame[captured.color][pieces.PAWN][row * files + dest_col]
+                eg -= endgame[captured.color][pieces.PAWN][row * files + dest_col]
+                phase -= tables.phase[pieces.PAWN]
+        elif flags & move.FLAG_DOUBLE_PUSH:
+            self.en_passant = ((row + dest_row) // 2, col)
+        elif flags & move.FLAG_CASTLING:
+            # We move the rook next to the king
+            rook_col = 0 if dest_col < col else files - 1
+            rook = self.ranks[row][rook_col]
+            self.ranks[row][rook_col] = None
+            rook_dest = dest_col + 1 if dest_col < col else dest_col - 1
+            self.ranks[row][rook_dest] = rook
+            mailbox[row_index + rook_col] = None
+            mailbox[row_index + rook_dest] = rook
+            rook.col = rook_dest
+            rook.has_moved = True
+            key ^= keys[pieces.ROOK][row * files + rook_col] ^ keys[pieces.ROOK][row * files + rook_dest]
+            rook_table = mg_table[pieces.ROOK]
+            mg += rook_table[row * files + rook_dest] - rook_table[row * files + rook_col]
+            rook_table = eg_table[pieces.ROOK]
+            eg += rook_table[row * files + rook_dest] - rook_table[row * files + rook_col]
+
+        if promotion:
+            # We replace the pawn with the promoted piece
+            promoted = pieces.TYPES[promotion](player)
+            self.ranks[dest_row][dest_col] = promoted
+            mailbox[dest_index] = promoted
+            promoted.row = dest_row
+            promoted.col = dest_col
+            promoted.board = self
+            piece.row = None
+            piece.col = None
+            piece_lists = self.piece_lists[player.color]
+            piece_lists[pieces.PAWN].remove(piece)
+            piece_lists[promotion].append(promoted)
+
+        if dest_piece is not None:
+            key ^= self.zobrist_keys.pieces[dest_piece.color][dest_piece.TYPE][dest_square]
+            mg -= midgame[dest_piece.color][dest_piece.TYPE][dest_square]
+            eg -= endgame[dest_piece.color][dest_piece.TYPE][dest_square]
+            phase -= tables.phase[dest_piece.TYPE]
+        self._pieces_key = key
+        self.midgame_score = mg
+        self.endgame_score = eg
+        self.phase = phase
+
+        if captured is not None:
+            captured.row = None
+            captured.col = None
+            player.eaten.append(captured)
+            self.piece_lists[captured.color][captured.TYPE].remove(captured)
+
+        if has_moved is not None:
+            piece.has_moved = True
+
+        if self.turn == COLOR_BLACK:
+            self.fullmove_nb += 1
+        self.turn = 1 - self.turn
+
+        self._undo_stack.append((m, piece, dest_piece, captured, rook, promoted, has_moved, en_passant, halfmove_clock, fullmove_nb, pieces_key, scores))
+
+    def pop(self):
+        """
+        Undo the last move played with `push()`.
+        :return: The move undone
+        """
+        m, piece, dest_piece, captured, rook, promoted, has_moved, en_passant, halfmove_clock, fullmove_nb, self._pieces_key, scores = self._undo_stack.pop()
+        self.midgame_score, self.endgame_score, self.phase = scores
+        files = self.shape[1]
+        row, col = divmod(m & move.SQUARE_MASK, files)
+        dest_row, dest_col = divmod(m >> move.DEST_SHIFT & move.SQUARE_MASK, files)
+        player = piece.player
+        mailbox = self.mailbox
+        row_index = self.mailbox_origin + row * self.mailbox_stride
+
+        self.turn = 1 - self.turn
+        self.en_passant = en_passant
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_nb = fullmove_nb
+        if has_moved is not None:
+            piece.has_moved = has_moved
+
+        if promoted is not None:
+            promoted.row = None
+            promoted.col = None
+            promoted.board = None
+            player.pieces.remove(promoted)
+            piece_lists = self.piece_lists[player.color]
+            piece_lists[promoted.TYPE].remove(promoted)
+            piece_lists[pieces.PAWN].append(piece)
+
+        if rook is not None:
+            # Put the castling rook back in its corner
+            rook_col = 0 if dest_col < col else files - 1
+            self.ranks[row][rook.col] = None
+            self.ranks[row][rook_col] = rook
+            mailbox[row_index + rook.col] = None
+            mailbox[row_index + rook_col] = rook
+            rook.col = rook_col
+            rook.has_moved = False
+
+        self.ranks[dest_row][dest_col] = dest_piece
+        self.ranks[row][col] = piece
+        mailbox[self.mailbox_origin + dest_row * self.mailbox_stride + dest_col] = dest_piece
+        mailbox[row_index + col] = piece
         piece.row = row
         piece.col = col
 
-        return check
+        if captured is not None:
+            player.eaten.pop()
+            self.piece_lists[captured.color][captured.TYPE].append(captured)
+            if captured is dest_piece:
+                captured.row = dest_row
+            else:
+                # En passant
+                self.ranks[row][dest_col] = captured
+                mailbox[row_index + dest_col] = captured
+                captured.row = row
+            captured.col = dest_col
+
+        return m
+
+    def generate_moves(self, moves=None, color=None):
+        """
+        Generate the legal moves of a player.
+        :param moves: A list to fill with the moves. It is cleared first, so the same list can be reused to avoid allocations.
+        :param color: The color of the player, defaults to the player whose turn it is
+        :return: The list of moves, packed in ints (see `pychess.move`)
+        """
+        if moves is None:
+            moves = []
+        else:
+            moves.clear()
+
+        if color is None:
+            color = self.turn
+        player = self.white if color == COLOR_WHITE else self.black
+        ranks = self.ranks
+        nb_ranks, files = self.shape
+        last_rank = nb_ranks - 1
+        append = moves.append
+        tables = self.attack_tables
+        pseudo_legal = self._pseudo_legal_moves
+        pseudo_legal.clear()
+        add = pseudo_legal.append
+
+        for piece in itertools.chain.from_iterable(self.piece_lists[color]):
+            row = piece.row
+            col = piece.col
+            start = row * files + col
+            piece_type = piece.TYPE
+
+            if piece_type == pieces.PAWN:
+                direction = piece.direction
+                r = row + direction
+                if not 0 <= r < nb_ranks:
+                    continue
+                promotion = r == 0 or r == last_rank
+
+                # Forward
+                if ranks[r][col] is None:
+                    if promotion:
+                        for promotion_type in PROMOTION_TYPES:
+                            add(start | (r * files + col) << move.DEST_SHIFT | promotion_type << move.PROMOTION_SHIFT)
+                    else:
+                        add(start | (r * files + col) << move.DEST_SHIFT)
+                        if not piece.has_moved and (row == 1 or row == nb_ranks - 2) and 0 <= r + direction < nb_ranks \
+                                and ranks[r + direction][col] is None:
+                            add(start | ((r + direction) * files + col) << move.DEST_SHIFT | move.FLAG_DOUBLE_PUSH << move.FLAGS_SHIFT)
+
+                # Captures
+                for c in (col - 1, col + 1):
+                    if not 0 <= c < files:
+                        continue
+                    target = ranks[r][c]
+                    if target is None:
+                        if self.en_passant == (r, c):
+                            add(start | (r * files + c) << move.DEST_SHIFT | (move.FLAG_CAPTURE | move.FLAG_EN_PASSANT) << move.FLAGS_SHIFT)
+                    elif target.color != color:
+                        if promotion:
+                            for promotion_type in PROMOTION_TYPES:
+                                add(start | (r * files + c) << move.DEST_SHIFT | move.FLAG_CAPTURE << move.FLAGS_SHIFT | promotion_type << move.PROMOTION_SHIFT)
+                        else:
+                            add(start | (r * files + c) << move.DEST_SHIFT | move.FLAG_CAPTURE << move.FLAGS_SHIFT)
+
+            elif piece_type == pieces.KNIGHT or piece_type == pieces.KING:
+                for r, c in tables.knight[start] if piece_type == pieces.KNIGHT else tables.king[start]:
+                    target = ranks[r][c]
+                    if target is None:
+                        add(start | (r * files + c) << move.DEST_SHIFT)
+                    elif target.color != color:
+                        add(start | (r * files + c) << move.DEST_SHIFT | move.FLAG_CAPTURE << move.FLAGS_SHIFT)
+
+                if piece_type == pieces.KING and not piece.has_moved:
+                    # Castling is checked completely by the king, including the squares it goes through
+                    for c in (col - 2, col + 2):
+                        if 0 <= c < files and piece.can_move(row, c):
+                            append(start | (row * files + c) << move.DEST_SHIFT | move.FLAG_CASTLING << move.FLAGS_SHIFT)
+
+            else:
+                if piece_type == pieces.ROOK:
+                    rays = tables.rook_rays[start]
+                elif piece_type == pieces.BISHOP:
+                    rays = tables.bishop_rays[start]
+                else:
+                    rays = tables.queen_rays[start]
+
+                for ray in rays:
+                    for r, c in ray:
+                        target = ranks[r][c]
+                        if target is None:
+                            add(start | (r * files + c) << move.DEST_SHIFT)
+                        else:
+                            if target.color != color:
+                                add(start | (r * files + c) << move.DEST_SHIFT | move.FLAG_CAPTURE << move.FLAGS_SHIFT)
+                            break
+
+        king = player.king
+        if king is None or king.row is None:
+            moves.extend(pseudo_legal)
+            return moves
+
+        # We keep only the moves that do not leave the king in check
+        king_row, king_col = king.row, king.col
+        king_square = king_row * files + king_col
+        opponent = 1 - color
+        check_mask, pins = self._checks_and_pins(color)
+        for m in pseudo_legal:
+            start = m & move.SQUARE_MASK
+            dest = m >> move.DEST_SHIFT & move.SQUARE_MASK
+            if start == king_square:
+                # The king is removed from the board, so it does not block the attacks along the ray it moves on
+                ranks[king_row][king_col] = None
+                attacked = self.is_square_attacked(dest, opponent)
+                ranks[king_row][king_col] = king
+                if not attacked:
+                    append(m)
+            elif m >> move.FLAGS_SHIFT & move.FLAG_EN_PASSANT:
+                # En passant removes two pieces from the same rank, so the move is played to check it
+                self.push(m)
+                if not self.is_check(player):
+                    append(m)
+                self.pop()
+            elif check_mask is not None and dest not in check_mask:
+                continue
+            else:
+                pin = pins.get(start)
+                if pin is None or dest in pin:
+                    append(m)
+
+        return moves
+
+    def _checks_and_pins(self, color):
+        """
+        Find the pieces checking the king of a player and the pieces pinned to it.
+        :param color: The color of the player
+        :return: A tuple (check_mask, pins). check_mask is None if the king is not in check, otherwise it is the set of
+        the squares where a piece other than the king can move to stop the check (empty in case of double check). pins is a
+        dict with the squares of the pinned pieces as keys and the sets of squares where they can move as values.
+        """
+        player = self.white if color == COLOR_WHITE else self.black
+        ranks = self.ranks
+        files = self.shape[1]
+        king_row, king_col = player.king.row, player.king.col
+        check_mask = None
+        pins = {}
+
+        # Sliding pieces : the first piece on a ray is either checking the king, or pinned if it is followed by an enemy slider
+        king_square = king_row * files + king_col
+        tables = self.attack_tables
+        # Only the rays of the sliding pieces the opponent still has, and the squares of its knights and pawns if any
+        piece_lists = self.piece_lists[1 - color]
+        queens = piece_lists[pieces.QUEEN]
+        for rays, sliders in ((tables.rook_rays[king_square] if queens or piece_lists[pieces.ROOK] else (), ORTHOGONAL_SLIDERS),
+                              (tables.bishop_rays[king_square] if queens or piece_lists[pieces.BISHOP] else (), DIAGONAL_SLIDERS)):
+            for ray in rays:
+                squares = []
+                pinned = None
+                for r, c in ray:
+                    square = r * files + c
+                    squares.append(square)
+                    piece = ranks[r][c]
+                    if piece is not None:
+                        if piece.color == color:
+                            if pinned is not None:
+                                break
+                            pinned = square
+                        else:
+                            if piece.TYPE in sliders:
+                                if pinned is not None:
+                                    pins[pinned] = set(squares)
+                                elif check_mask is None:
+                                    check_mask = set(squares)
+                                else:
+                                    check_mask = set()
+                            break
+
+        # Knights and pawns : the check can only be stopped by taking the checking piece
+        for squares, piece_type in ((tables.knight[king_square], pieces.KNIGHT), (tables.pawn[color][king_square], pieces.PAWN)):
+            if not piece_lists[piece_type]:
+                continue
+            for r, c in squares:
+                piece = ranks[r][c]
+                if piece is not None and piece.color != color and piece.TYPE == piece_type:
+                    check_mask = {r * files + c} if check_mask is None else set()
+
+        return check_mask, pins
+
+    def perft(self, depth):
+        """
+        Count the leaf nodes of the tree of legal moves from this position.
+        :param depth: The depth of the tree, in half moves
+        :return: The number of positions reachable in exactly `depth` half moves
+        """
+        # One move list per ply, reused for every node at this ply
+        return self._perft(depth, [[] for _ in range(depth)])
+
+    def _perft(self, depth, move_lists):
+        if depth == 0:
+            return 1
+
+        moves = self.generate_moves(move_lists[depth - 1])
+        if depth == 1:
+            return len(moves)
+
+        nodes = 0
+        for m in moves:
+            self.push(m)
+            nodes += self._perft(depth - 1, move_lists)
+            self.pop()
+        return nodes
+
+    def divide(self, depth):
+        """
+        Count the leaf nodes of the tree of legal moves for each legal move of the position.
+        :param depth: The depth of the tree, in half moves
+        :return: A dict with the moves in coordinate notation (ex: e2e4, e7e8q) as keys and their node count as values
+        """
+        if depth < 1:
+            raise ValueError("The depth must be at least 1")
+
+        move_lists = [[] for _ in range(depth)]
+        counts = {}
+        for m in self.generate_moves():
+            self.push(m)
+            counts[move.to_str(m, self.shape[1])] = self._perft(depth - 1, move_lists)
+            self.pop()
+
+        return counts
 
     def _format_grid(self, printable_grid, label=False):
         """format the given grid to a printabe format"""
@@ -373,14 +1133,20 @@ class Board:
             return
 
     def add_piece(self, piece, x, y):
-        self.ranks[x][y] = piece
+        self.set_cell(x, y, piece)
+        piece_list = self.piece_lists[piece.color][piece.TYPE]
+        if piece not in piece_list:
+            piece_list.append(piece)
         piece.row = x
         piece.col = y
         piece.board = self
 
     def remove_piece(self, x, y):
         piece = self.ranks[x][y]
-        self.ranks[x][y] = None
+        self.set_cell(x, y, None)
+        piece_list = self.piece_lists[piece.color][piece.TYPE]
+        if piece in piece_list:
+            piece_list.remove(piece)
         piece.board = None
         piece.row = None
         piece.col = None
@@ -396,81 +1162,13 @@ class Board:
         """
         The hash of the state of the board. Takes the position of the pieces, the castling availability, the turn, the en passant square and the fullmove and halfmove clocks into account.
         """
-        pos = ""
-        for rank in self.ranks:
-            for piece in rank:
-                if piece is None:
-                    pos += " "
-                else:
-                    pos += piece.san
-
-        castling = ""
-        # TODO: Better checks for castling
-        # White castling
-        if self.white.king is not None and not self.white.king.has_moved:
-            # King side (h1)
-            rook = self.ranks[0][7]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "K"
-
-            # Queen side (a1)
-            rook = self.ranks[0][0]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "Q"
-
-        # Black castling
-        if self.black.king is not None and not self.black.king.has_moved:
-            # King side (h8)
-            rook = self.ranks[7][7]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "k"
-
-            # Queen side (a8)
-            rook = self.ranks[7][0]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "q"
-
-        return hash((self.shape, pos, self.turn, castling, self.en_passant, self.halfmove_clock, self.fullmove_nb))
+        return hash((self.shape, self.zobrist, self.halfmove_clock, self.fullmove_nb))
 
     def __position_hash__(self):
         """
-        The hash of the position of the board, taking into account the turn, castling and en passant
+        The hash of the position of the board, taking into account the turn, castling and en passant. Same as `zobrist`.
         """
-        pos = ""
-        for rank in self.ranks:
-            for piece in rank:
-                if piece is None:
-                    pos += " "
-                else:
-                    pos += piece.san
-
-        castling = ""
-        # TODO: Better checks for castling
-        # White castling
-        if self.white.king is not None and not self.white.king.has_moved:
-            # King side (h1)
-            rook = self.ranks[0][7]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "K"
-
-            # Queen side (a1)
-            rook = self.ranks[0][0]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "Q"
-
-        # Black castling
-        if self.black.king is not None and not self.black.king.has_moved:
-            # King side (h8)
-            rook = self.ranks[7][7]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "k"
-
-            # Queen side (a8)
-            rook = self.ranks[7][0]
-            if rook is not None and isinstance(rook, pieces.Rook) and not rook.has_moved:
-                castling += "q"
-
-        return hash((pos, self.turn, castling, self.en_passant))
+        return self.zobrist
 
     def __repr__(self):
         return "<Board shape={}, state_hash='{}' fen='{}', white={}, black={}>".format(str(self.shape), str(self.__state_hash__()), self.to_fen(), self.white
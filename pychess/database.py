@@ -0,0 +1,242 @@
+"""
+Database of positions : the games played from each position, their results and the move played most often.
+
+The database is a file opened with `mmap`, so a lookup only reads the few pages it needs, and the page cache of the OS
+keeps the pages used often in memory, shared by all the processes reading the file. The file has :
+
+- a header of `HEADER_SIZE` bytes : `MAGIC`, the number of entries and the number of slots of the index
+- the entries, `ENTRY_SIZE` bytes each, sorted by key : the Zobrist key of the position (see `pychess.zobrist`), the
+  position (see `pychess.packed`), the number of games, of white wins, of draws and of black wins, the move played most
+  often (see `pychess.move`, 0 if none) and the number of games it was played in
+- the index : a hash table of 32 bits ints, the number of slots being a power of two at least twice the number of
+  entries. The slot of a key is its low bits, and the next slots are probed until an empty one (0). A slot holds the
+  index of an entry plus 1.
+
+The numbers are little-endian. The key of a position does not depend on its move counters, so the games of a position
+reached at different moves are counted together (the position stored is the first one added).
+
+A database is written at once by a `DatabaseBuilder`, from PGN files or FEN strings, and read with `PositionDatabase`.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from pychess.bitboard import BitBoard
+import pychess.packed as packed
+import pychess.replay as replay
+
+MAGIC = b"PYCHDB01"
+
+_HEADER = struct.Struct("<8sQQ8x")
+HEADER_SIZE = _HEADER.size
+_ENTRY = struct.Struct("<Q{}sIIIIII".format(packed.RECORD_SIZE))
+ENTRY_SIZE = _ENTRY.size
+_SLOT = struct.Struct("<I")
+
+# Bytes of the packed positions compared to check the key of a lookup : the pieces, the castling rights and the turn.
+# The en passant square is not compared, as it is only in the key when a pawn can take.
+_CHECKED_SIZE = 25
+
+# Index of the counter of each result in the statistics
+RESULTS = {"1-0": 0, "1/2-1/2": 1, "0-1": 2}
+
+
+class PositionStats:
+    """
+    Statistics of a position of the database.
+    """
+
+    def __init__(self, key, position, games, white_wins, draws, black_wins, best_move, best_move_games):
+        self.key = key
+        # The position, encoded with `pychess.packed`
+        self.position = position
+        self.games = games
+        self.white_wins = white_wins
+        self.draws = draws
+        self.black_wins = black_wins
+        # The move played most often from the position, packed in an int (see `pychess.move`), or 0
+        self.best_move = best_move
+        self.best_move_games = best_move_games
+
+    def to_board(self):
+        """
+        Get the position as a `BitBoard`.
+        """
+        return BitBoard.from_bytes(self.position)
+
+    def __repr__(self):
+        return "<PositionStats games={} +{} ={} -{} best_move={}>".format(self.games, self.white_wins, self.draws, self.black_wins, self.best_move)
+
+
+def encode(board):
+    """
+    Encode a position for `DatabaseBuilder.add_pgn` : a tuple (key, position).
+    """
+    return board.zobrist, board.to_bytes()
+
+
+class DatabaseBuilder:
+    """
+    Collect the statistics of positions in memory, then write them to a database file.
+    """
+
+    def __init__(self):
+        # Entries indexed by key : [position, games, white wins, draws, black wins, {move: games}]
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, position, m=0, result="*"):
+        """
+        Count a game played from a position.
+        :param key: The Zobrist key of the position
+        :param position: The position, encoded with `pychess.packed`
+        :param m: The move played from the position, or 0 if unknown
+        :param result: The result of the game : "1-0", "0-1", "1/2-1/2" or "*"
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = [position, 0, 0, 0, 0, {}]
+            self.entries[key] = entry
+        entry[1] += 1
+        index = RESULTS.get(result)
+        if index is not None:
+            entry[2 + index] += 1
+        if m:
+            entry[5][m] = entry[5].get(m, 0) + 1
+
+    def add_board(self, board, m=0, result="*"):
+        """
+        Count a game played from the position of a board (a `Board` or a `BitBoard`), see `add`.
+        """
+        self.add(board.zobrist, board.to_bytes(), m, result)
+
+    def add_fens(self, lines):
+        """
+        Count positions given by FEN strings.
+        :param lines: An iterable of lines (like a text file), each one a FEN string optionally followed by the result of
+        the game. The empty lines are skipped.
+        """
+        for line in lines:
+            fields = line.split()
+            if not fields:
+                continue
+            result = fields[6] if len(fields) > 6 else "*"
+            self.add_board(BitBoard.from_fen(" ".join(fields[:6])), result=result)
+
+    def add_pgn(self, path, workers=None, chunk_size=replay.CHUNK_SIZE, executor=None):
+        """
+        Count the positions of all the games of a PGN file, and the moves played from them. The games are replayed on
+        several processes (see `pychess.replay.replay`).
+        :return: The `pychess.replay.ReplayStats` of the replay
+        """
+        return replay.replay(path, self._add_records, workers=workers, chunk_size=chunk_size, encode=encode, executor=executor)
+
+    def _add_records(self, records):
+        for (key, position), m, result in records:
+            self.add(key, position, m, result)
+
+    def write(self, path):
+        """
+        Write the database to a file (see the module documentation).
+        """
+        keys = sorted(self.entries)
+        nb_slots = 2
+        while nb_slots < 2 * len(keys):
+            nb_slots <<= 1
+        mask = nb_slots - 1
+        index = array("I", bytes(4 * nb_slots))
+        for i, key in enumerate(keys):
+            slot = key & mask
+            while index[slot]:
+                slot = (slot + 1) & mask
+            index[slot] = i + 1
+        if sys.byteorder != "little":
+            index.byteswap()
+
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, len(keys), nb_slots))
+            for key in keys:
+                position, games, white_wins, draws, black_wins, moves = self.entries[key]
+                best_move, best_move_games = 0, 0
+                if moves:
+                    # The move played most often, the smallest one on a tie so the file does not depend on the order
+                    best_move, best_move_games = min(moves.items(), key=lambda item: (-item[1], item[0]))
+                f.write(_ENTRY.pack(key, position, games, white_wins, draws, black_wins, best_move, best_move_games))
+            f.write(index.tobytes())
+
+
+class PositionDatabase:
+    """
+    Database of positions read from a file (see the module documentation).
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of a file written by `DatabaseBuilder.write`
+        """
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER_SIZE:
+            self._mm.close()
+            raise ValueError("Not a position database : " + str(path))
+        magic, self.nb_entries, self.nb_slots = _HEADER.unpack_from(self._mm)
+        if magic != MAGIC or len(self._mm) != HEADER_SIZE + self.nb_entries * ENTRY_SIZE + self.nb_slots * _SLOT.size:
+            self._mm.close()
+            raise ValueError("Not a position database : " + str(path))
+        self._index_offset = HEADER_SIZE + self.nb_entries * ENTRY_SIZE
+
+    def __len__(self):
+        return self.nb_entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+
+    def _entry(self, i):
+        return PositionStats(*_ENTRY.unpack_from(self._mm, HEADER_SIZE + i * ENTRY_SIZE))
+
+    def __iter__(self):
+        """
+        Iterate over the `PositionStats` of all the positions, sorted by key.
+        """
+        for i in range(self.nb_entries):
+            yield self._entry(i)
+
+    def get(self, key):
+        """
+        Get the statistics of a position from its key.
+        :param key: The Zobrist key of the position
+        :return: The `PositionStats` of the position, or None if it is not in the database
+        """
+        mm = self._mm
+        mask = self.nb_slots - 1
+        slot = key & mask
+        while True:
+            i = _SLOT.unpack_from(mm, self._index_offset + slot * _SLOT.size)[0]
+            if i == 0:
+                return None
+            offset = HEADER_SIZE + (i - 1) * ENTRY_SIZE
+            if struct.unpack_from("<Q", mm, offset)[0] == key:
+                return PositionStats(*_ENTRY.unpack_from(mm, offset))
+            slot = (slot + 1) & mask
+
+    def lookup(self, board):
+        """
+        Get the statistics of the position of a board.
+        :param board: A `Board` or a `BitBoard` (8x8)
+        :return: The `PositionStats` of the position, or None if it is not in the database
+        """
+        stats = self.get(board.zobrist)
+        if stats is None or stats.position[:_CHECKED_SIZE] != board.to_bytes()[:_CHECKED_SIZE]:
+            return None
+        return stats
+
+    def __contains__(self, board):
+        return self.lookup(board) is not None
@@ -0,0 +1,10 @@
+import pychess.engine.evaluation as evaluation
+import pychess.engine.search as search
+import pychess.engine.smp as smp
+import pychess.engine.analysis as analysis
+
+Engine = search.Engine
+SearchResult = search.SearchResult
+parallel_search = smp.parallel_search
+analyse = analysis.analyse
+iter_analysis = analysis.iter_analysis
@@ -0,0 +1,121 @@
+"""
+Analysis of all the moves of a position (multi-PV), each move being searched in its own process.
+
+The moves of the position are played on copies of the board in worker processes of a
+`concurrent.futures.ProcessPoolExecutor`, and searched independently. The workers receive the position as a FEN string
+and the move as an int, not as a pickled board. The results are given as soon as each search completes.
+"""
+import concurrent.futures
+import time as _time
+import pychess.move as move
+from pychess.engine.search import Engine, MATE_SCORE, MAX_PLY
+
+# Time given to the searches running to return their result after the timeout, in seconds
+STOP_DELAY = 1.0
+
+
+class MoveAnalysis:
+    """
+    Result of the search of a move.
+    """
+
+    def __init__(self, move, score, pv, depth, nodes):
+        self.move = move
+        # The score of the position after the move, for the player playing it, in centipawns
+        self.score = score
+        # The principal variation, starting with the move
+        self.pv = pv
+        self.depth = depth
+        self.nodes = nodes
+
+    def __repr__(self):
+        return "<MoveAnalysis move={} score={} depth={} pv='{}'>".format(move.to_str(self.move), self.score, self.depth,
+                                                                         " ".join(move.to_str(m) for m in self.pv))
+
+
+def _analyse_move(fen, backend, m, depth, deadline, hash_size):
+    """
+    Search the position after a move, in a worker process.
+    :param deadline: The time (`time.time()`) at which the search must stop, or None
+    :return: A `MoveAnalysis`
+    """
+    board = backend.from_fen(fen)
+    board.push(m)
+    time = None if deadline is None else max(0.0, deadline - _time.time())
+    result = Engine(hash_size=hash_size).search(board, depth=depth, time=time)
+
+    # The score is for the opponent, and the mates are one move further from the position analysed
+    score = -result.score
+    if score >= MATE_SCORE - MAX_PLY:
+        score -= 1
+    elif score <= -MATE_SCORE + MAX_PLY:
+        score += 1
+    return MoveAnalysis(m, score, [m] + result.pv, result.depth, result.nodes)
+
+
+def iter_analysis(board, depth=3, timeout=None, workers=None, executor=None, hash_size=4):
+    """
+    Search every legal move of the player to move, and yield the results as they complete.
+    When the timeout is reached, the searches running return the result of their deepest depth completed, and the
+    searches not started are cancelled.
+    :param board: The board to analyse (a `Board` or a `BitBoard`). It is not changed.
+    :param depth: The depth searched after each move, in plies
+    :param timeout: The maximum time of the analysis, in seconds
+    :param workers: The number of worker processes, if no executor is given (defaults to the number of CPUs)
+    :param executor: A `ProcessPoolExecutor` to run the searches, to reuse the same processes for several analyses
+    :param hash_size: The memory used by the transposition table of each search, in megabytes
+    :return: A generator of `MoveAnalysis`
+    """
+    fen = board.to_fen()
+    backend = type(board)
+    deadline = None if timeout is None else _time.time() + timeout
+    moves = list(board.generate_moves())
+
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    futures = [executor.submit(_analyse_move, fen, backend, m, depth, deadline, hash_size) for m in moves]
+    # The futures whose result was given
+    yielded = set()
+    try:
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                yielded.add(future)
+                yield future.result()
+        except concurrent.futures.TimeoutError:
+            # The searches not started are cancelled, the ones running stop at the deadline. The searches completed
+            # while the previous results were handled are given first.
+            running = []
+            for future in futures:
+                if future in yielded or future.cancel():
+                    continue
+                if future.done():
+                    yielded.add(future)
+                    yield future.result()
+                else:
+                    running.append(future)
+            try:
+                for future in concurrent.futures.as_completed(running, timeout=STOP_DELAY):
+                    yield future.result()
+            except concurrent.futures.TimeoutError:
+                pass
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def analyse(board, depth=3, timeout=None, workers=None, executor=None, hash_size=4, callback=None):
+    """
+    Search every legal move of the player to move (see `iter_analysis`), and rank them.
+    :param callback: A function called with each `MoveAnalysis` as soon as it completes
+    :return: The list of `MoveAnalysis` completed, the best move first
+    """
+    results = []
+    for result in iter_analysis(board, depth, timeout, workers, executor, hash_size):
+        results.append(result)
+        if callback is not None:
+            callback(result)
+    results.sort(key=lambda r: r.score, reverse=True)
+    return results
@@ -0,0 +1,222 @@
+"""
+Evaluation of many positions at once with NumPy.
+
+The positions are read from their FEN strings straight into a `(N, 12, 8, 8)` array of 0 and 1, without creating any
+board : plane `color * 6 + type - 1` (see `pychess.pieces.Piece.TYPE`) has a 1 on the squares of the pieces of this
+color and type, indexed by row (rank 1 first) and column, like the squares of a `Board`. The evaluation works on the
+smaller `(N, 64)` array of the plane of the piece on each square, and computes its terms for the whole batch with array
+operations.
+
+NumPy is an optional dependency (`pip install pychess[numpy]`), only needed by this module.
+"""
+import numpy as np
+import pychess.pst as pst
+from pychess.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+NB_PLANES = 12
+
+# Plane of each FEN letter, EMPTY for the empty squares, and INVALID for the other characters
+EMPTY = NB_PLANES
+INVALID = 255
+_PLANES = np.full(256, INVALID, dtype=np.uint8)
+_PLANES[ord(".")] = EMPTY
+for _type, _letter in enumerate(" PNBRQK"):
+    if _type:
+        _PLANES[ord(_letter)] = _type - 1
+        _PLANES[ord(_letter.lower())] = 6 + _type - 1
+
+# Separators after each rank of an expanded FEN string
+_SEPARATORS = np.frombuffer(b"/////// ", dtype=np.uint8)
+
+# Bonus for each square attacked by a piece, in centipawns, indexed by type
+MOBILITY_WEIGHTS = (0, 0, 4, 5, 2, 1, 0)
+
+_FULL = np.uint64((1 << 64) - 1)
+_NOT_FILE_A = np.uint64(0xFEFEFEFEFEFEFEFE)
+_NOT_FILE_H = np.uint64(0x7F7F7F7F7F7F7F7F)
+_NOT_FILES_AB = np.uint64(0xFCFCFCFCFCFCFCFC)
+_NOT_FILES_GH = np.uint64(0x3F3F3F3F3F3F3F3F)
+
+# Shifts of the squares for each direction, and the mask of the squares a piece can arrive on
+_ORTHOGONAL = ((8, _FULL), (-8, _FULL), (1, _NOT_FILE_A), (-1, _NOT_FILE_H))
+_DIAGONAL = ((9, _NOT_FILE_A), (7, _NOT_FILE_H), (-7, _NOT_FILE_A), (-9, _NOT_FILE_H))
+_KNIGHT = ((17, _NOT_FILE_A), (15, _NOT_FILE_H), (10, _NOT_FILES_AB), (6, _NOT_FILES_GH),
+           (-6, _NOT_FILES_AB), (-10, _NOT_FILES_GH), (-15, _NOT_FILE_A), (-17, _NOT_FILE_H))
+
+
+def fens_to_planes(fens):
+    """
+    Read the pieces of positions from their FEN strings.
+    :param fens: An iterable of FEN strings. Only the placement of the pieces (the first field) is read.
+    :return: A `(N, 64)` uint8 array of the plane of the piece on each square (see the module documentation), or `EMPTY`
+    """
+    placements = [fen.partition(" ")[0] for fen in fens]
+    if not placements:
+        return np.empty((0, 64), dtype=np.uint8)
+    # The digits are expanded in the bytes of all the positions at once, so each rank takes 8 bytes and a separator
+    data = " ".join(placements).encode("ascii", "replace") + b" "
+    for n in range(1, 9):
+        data = data.replace(b"%d" % n, b"." * n)
+    if len(data) % 72:
+        raise ValueError("Invalid pieces position")
+    data = np.frombuffer(data, dtype=np.uint8).reshape(-1, 8, 9)
+    if (data[:, :, 8] != _SEPARATORS).any():
+        raise ValueError("Invalid pieces position")
+    # The FEN strings start with the 8th rank
+    planes = _PLANES[data[:, ::-1, :8]].reshape(-1, 64)
+    if (planes == INVALID).any():
+        raise ValueError("Invalid pieces position")
+    return planes
+
+
+def fens_to_tensor(fens, packed=False):
+    """
+    Read the pieces of positions from their FEN strings (see `fens_to_planes`).
+    :param packed: Pack the squares of each rank in the bits of a byte (the bit `col` for the column `col`)
+    :return: A `(N, 12, 8, 8)` uint8 array, or a `(N, 12, 8)` uint8 array if packed
+    """
+    planes = fens_to_planes(fens)
+    n = len(planes)
+    tensor = np.zeros((n, NB_PLANES + 1, 64), dtype=np.uint8)
+    tensor[np.arange(n)[:, np.newaxis], planes, np.arange(64)] = 1
+    tensor = tensor[:, :NB_PLANES].reshape(n, NB_PLANES, 8, 8)
+    if packed:
+        return np.packbits(tensor, axis=-1, bitorder="little").reshape(n, NB_PLANES, 8)
+    return tensor
+
+
+def fens_to_turns(fens):
+    """
+    Read the player to move of positions from their FEN strings. White is to move when the FEN string only has the
+    placement of the pieces.
+    :return: A bool array, True when black is to move
+    """
+    turns = []
+    for fen in fens:
+        fields = fen.split(" ", 2)
+        turns.append(len(fields) > 1 and fields[1] == "b")
+    return np.array(turns, dtype=bool)
+
+
+def tensor_to_planes(tensor):
+    """
+    Get the plane of the piece on each square of positions from their tensor.
+    :param tensor: A tensor given by `fens_to_tensor`, packed or not
+    :return: A `(N, 64)` uint8 array (see `fens_to_planes`)
+    """
+    if tensor.ndim == 3:
+        tensor = np.unpackbits(tensor[..., np.newaxis], axis=-1, bitorder="little")
+    tensor = tensor.reshape(-1, NB_PLANES, 64)
+    return np.where(tensor.any(axis=1), tensor.argmax(axis=1), EMPTY).astype(np.uint8)
+
+
+def _bitboards(planes):
+    """
+    Get the bitboards of the pieces of positions (see `pychess.bitboard`).
+    :param planes: The planes of the pieces on each square (see `fens_to_planes`)
+    :return: A `(N, 12)` uint64 array
+    """
+    one_hot = planes[:, np.newaxis, :] == np.arange(NB_PLANES, dtype=np.uint8)[:, np.newaxis]
+    return np.packbits(one_hot, axis=-1, bitorder="little").view("<u8").reshape(-1, NB_PLANES).astype(np.uint64)
+
+
+def _shift(bb, shift):
+    return bb << np.uint64(shift) if shift > 0 else bb >> np.uint64(-shift)
+
+
+def _popcount(bb):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bb).astype(np.int64)
+    return np.unpackbits(bb.view(np.uint8).reshape(bb.shape + (8,)), axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def _slider_attacks(bb, empty, directions):
+    """
+    Get the squares attacked by sliding pieces, with an occluded fill in each direction (Kogge-Stone).
+    """
+    attacks = np.zeros_like(bb)
+    for shift, mask in directions:
+        gen = bb
+        propagate = empty & mask
+        for step in (shift, 2 * shift, 4 * shift):
+            gen = gen | (propagate & _shift(gen, step))
+            propagate = propagate & _shift(propagate, step)
+        attacks |= _shift(gen, shift) & mask
+    return attacks
+
+
+def _leaper_attacks(bb, offsets):
+    attacks = np.zeros_like(bb)
+    for shift, mask in offsets:
+        attacks |= _shift(bb, shift) & mask
+    return attacks
+
+
+def mobility(planes):
+    """
+    Evaluate the mobility of the pieces : the number of squares attacked by the knights, the bishops, the rooks and the
+    queens of each player, not occupied by their own pieces, weighted by `MOBILITY_WEIGHTS`. The squares attacked by
+    several pieces of the same type are counted once.
+    :param planes: The planes of the pieces on each square (see `fens_to_planes`)
+    :return: An int64 array of the scores, from white's point of view
+    """
+    bbs = _bitboards(planes)
+    own = (np.bitwise_or.reduce(bbs[:, :6], axis=1), np.bitwise_or.reduce(bbs[:, 6:], axis=1))
+    empty = ~(own[0] | own[1])
+    scores = np.zeros(len(bbs), dtype=np.int64)
+    for color, sign in ((0, 1), (1, -1)):
+        plane = color * 6 - 1
+        for piece_type, attacks in ((KNIGHT, _leaper_attacks(bbs[:, plane + KNIGHT], _KNIGHT)),
+                                    (BISHOP, _slider_attacks(bbs[:, plane + BISHOP], empty, _DIAGONAL)),
+                                    (ROOK, _slider_attacks(bbs[:, plane + ROOK], empty, _ORTHOGONAL)),
+                                    (QUEEN, _slider_attacks(bbs[:, plane + QUEEN], empty, _ORTHOGONAL + _DIAGONAL))):
+            scores += sign * MOBILITY_WEIGHTS[piece_type] * _popcount(attacks & ~own[color])
+    return scores
+
+
+def _table_weights(tables):
+    """
+    Get the values of the pieces of each plane in piece-square tables, with zeros for the empty squares.
+    :return: A tuple (midgame, endgame, phase), with midgame and endgame `(13, 64)` arrays and phase a `(13,)` array
+    """
+    types = range(PAWN, KING + 1)
+    midgame = np.array([tables.midgame[color][piece_type] for color in (0, 1) for piece_type in types] + [[0] * 64], dtype=np.int64)
+    endgame = np.array([tables.endgame[color][piece_type] for color in (0, 1) for piece_type in types] + [[0] * 64], dtype=np.int64)
+    phase = np.array([tables.phase[piece_type] for _ in (0, 1) for piece_type in types] + [0], dtype=np.int64)
+    return midgame, endgame, phase
+
+
+def evaluate(positions, turns=None, tables=None, with_mobility=True):
+    """
+    Evaluate positions with piece-square tables (material included, like `pychess.engine.evaluation.pst`) and the
+    mobility of the pieces.
+    :param positions: A list of FEN strings, the array given by `fens_to_planes`, or a tensor given by `fens_to_tensor`,
+    packed or not
+    :param turns: A bool array, True when black is to move (see `fens_to_turns`). Read from the FEN strings if not given,
+    and white to move for the arrays.
+    :param tables: The `pychess.pst.PieceSquareTables` to use, defaults to the ones of the 8x8 boards
+    :param with_mobility: Add the mobility of the pieces to the score (see `mobility`)
+    :return: An int64 array of the scores, in centipawns, for the player to move in each position
+    """
+    if isinstance(positions, np.ndarray):
+        planes = positions if positions.ndim == 2 else tensor_to_planes(positions)
+    else:
+        positions = list(positions)
+        planes = fens_to_planes(positions)
+        if turns is None:
+            turns = fens_to_turns(positions)
+    if tables is None:
+        tables = pst.get_tables((8, 8))
+
+    midgame_weights, endgame_weights, phase_weights = _table_weights(tables)
+    squares = np.arange(64)
+    midgame = midgame_weights[planes, squares].sum(axis=1)
+    endgame = endgame_weights[planes, squares].sum(axis=1)
+    phase = np.minimum(phase_weights[planes].sum(axis=1), tables.max_phase)
+    scores = (midgame * phase + endgame * (tables.max_phase - phase)) // tables.max_phase
+    if with_mobility:
+        scores += mobility(planes)
+
+    if turns is not None:
+        scores = np.where(turns, -scores, scores)
+    return scores
@@ -0,0 +1,30 @@
+"""
+Static evaluation of the positions.
+
+The scores are in centipawns, from the point of view of the player whose turn it is.
+"""
+from pychess.player import COLOR_WHITE, COLOR_BLACK
+
+# Value of a pawn, in the unit of the scores
+PAWN_SCORE = 100
+
+
+def material(board):
+    """
+    Evaluate a position by the difference of the values of the pieces (see `pychess.pieces.Piece.value`).
+    :param board: A `Board` or a `BitBoard`
+    :return: The score for the player whose turn it is
+    """
+    score = (board.material(COLOR_WHITE) - board.material(COLOR_BLACK)) * PAWN_SCORE
+    return score if board.turn == COLOR_WHITE else -score
+
+
+def pst(board):
+    """
+    Evaluate a position with the piece-square tables of the board, tapered between the middlegame and the endgame (see
+    `pychess.pst`). The scores are kept up to date by the board, so the evaluation does not depend on the number of pieces.
+    :param board: A `Board` or a `BitBoard`
+    :return: The score for the player whose turn it is
+    """
+    score = board.pst.taper(board.midgame_score, board.endgame_score, board.phase)
+    return score if board.turn == COLOR_WHITE else -score
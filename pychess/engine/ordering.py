@@ -0,0 +1,114 @@
+"""
+Ordering of the moves searched : the earlier a good move is searched, the more moves alpha-beta can skip.
+
+The moves are searched in this order :
+
+- the hash move (the best move found by a previous search of the position)
+- the captures that do not lose material, by most valuable victim / least valuable attacker (MVV-LVA), and the
+  promotions to a queen
+- the killer moves : quiet moves that caused a cutoff in another position at the same ply
+- the other quiet moves, by their history score : how often they caused a cutoff in the previous searches
+- the captures losing material (see `pychess.board.Board.see`)
+"""
+import pychess.move as move
+from pychess.board import SEE_VALUES
+from pychess.pieces import PAWN, QUEEN
+
+HASH_MOVE_SCORE = 1 << 30
+GOOD_CAPTURE_SCORE = 1 << 28
+KILLER_SCORES = (1 << 27, (1 << 27) - 1)
+BAD_CAPTURE_SCORE = -(1 << 28)
+# The history scores are halved when one of them reaches this value, so they stay below the killer moves
+HISTORY_MAX = 1 << 20
+
+CAPTURE = move.FLAG_CAPTURE << move.FLAGS_SHIFT
+
+
+def mvv_lva(board, m):
+    """
+    Score a capture by the value of the piece taken, then by the value of the piece taking.
+    """
+    victim = board.type_at(m >> move.DEST_SHIFT & move.SQUARE_MASK) or PAWN  # En passant
+    return SEE_VALUES[victim] * 16 - SEE_VALUES[board.type_at(m & move.SQUARE_MASK)]
+
+
+def is_losing_capture(board, m):
+    """
+    Check if a capture loses material. The exchange is only evaluated if the piece taking is more valuable than the piece taken.
+    """
+    victim = board.type_at(m >> move.DEST_SHIFT & move.SQUARE_MASK) or PAWN
+    return SEE_VALUES[victim] < SEE_VALUES[board.type_at(m & move.SQUARE_MASK)] and board.see(m) < 0
+
+
+class MoveOrdering:
+    """
+    Killer moves and history table of an engine. The killer moves are reset for each search, the history is kept (and
+    aged) between the searches.
+    """
+
+    def __init__(self, max_ply):
+        self.max_ply = max_ply
+        # The two last killer moves of each ply
+        self.killers = [[0, 0] for _ in range(max_ply + 1)]
+        # Butterfly table : history scores indexed by color, start square and destination square
+        self.history = []
+        self._nb_squares = 0
+
+    def new_search(self, board):
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+
+        nb_squares = board.shape[0] * board.shape[1]
+        if nb_squares != self._nb_squares:
+            self._nb_squares = nb_squares
+            self.history = [0] * (2 * nb_squares * nb_squares)
+        else:
+            # The old scores count less than the new ones
+            self.history = [score >> 1 for score in self.history]
+
+    def order(self, board, moves, ply, hash_move=0):
+        """
+        Sort a list of moves, the most promising first.
+        :param moves: The list of moves, sorted in place
+        :param ply: The distance to the root of the search
+        :param hash_move: The move to search first, or 0
+        """
+        killer_1, killer_2 = self.killers[ply]
+        history = self.history
+        nb_squares = self._nb_squares
+        base = board.turn * nb_squares
+        scores = {}
+        for m in moves:
+            if m == hash_move:
+                scores[m] = HASH_MOVE_SCORE
+            elif m & CAPTURE:
+                scores[m] = mvv_lva(board, m) + (BAD_CAPTURE_SCORE if is_losing_capture(board, m) else GOOD_CAPTURE_SCORE)
+            elif m >> move.PROMOTION_SHIFT == QUEEN:
+                scores[m] = GOOD_CAPTURE_SCORE + SEE_VALUES[QUEEN] * 16
+            elif m == killer_1:
+                scores[m] = KILLER_SCORES[0]
+            elif m == killer_2:
+                scores[m] = KILLER_SCORES[1]
+            else:
+                scores[m] = history[(base + (m & move.SQUARE_MASK)) * nb_squares + (m >> move.DEST_SHIFT & move.SQUARE_MASK)]
+        moves.sort(key=scores.__getitem__, reverse=True)
+
+    def cutoff(self, board, m, depth, ply):
+        """
+        Record a move that caused a beta cutoff.
+        :param board: The board, in the position where the move was played
+        """
+        if m & CAPTURE or m >> move.PROMOTION_SHIFT:
+            # The captures and promotions are already searched early
+            return
+
+        killers = self.killers[ply]
+        if killers[0] != m:
+            killers[1] = killers[0]
+            killers[0] = m
+
+        nb_squares = self._nb_squares
+        index = (board.turn * nb_squares + (m & move.SQUARE_MASK)) * nb_squares + (m >> move.DEST_SHIFT & move.SQUARE_MASK)
+        self.history[index] += depth * depth
+        if self.history[index] >= HISTORY_MAX:
+            self.history = [score >> 1 for score in self.history]
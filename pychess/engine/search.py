@@ -0,0 +1,337 @@
+"""
+Alpha-beta search of the best move of a position.
+
+The search works on any board with `generate_moves()`, `push()`, `pop()`, `is_check()`, `turn`, `halfmove_clock` and
+`zobrist` (a `Board` or a `BitBoard`). The moves are played with `push()` and `pop()`, so no signal is sent and the
+board is left unchanged.
+"""
+import time as _time
+import pychess.move as move
+from pychess.board import SEE_VALUES
+from pychess.pieces import QUEEN
+from pychess.engine import evaluation
+from pychess.engine.tt import TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+from pychess.engine.ordering import MoveOrdering, mvv_lva, is_losing_capture
+
+# Score of a checkmate. The number of plies to the mate is subtracted, so shorter mates have better scores.
+MATE_SCORE = 100000
+INFINITY = MATE_SCORE + 1
+# Maximum depth of the search, in plies
+MAX_PLY = 64
+# Number of nodes searched between two checks of the time limit
+CHECK_INTERVAL = 1024
+
+
+# Flags of the moves searched by the quiescence search
+TACTICAL_FLAGS = move.FLAG_CAPTURE << move.FLAGS_SHIFT
+
+
+def score_to_tt(score, ply):
+    """
+    Convert a score to store it in the transposition table : the mate scores are stored from the position, not from the root.
+    """
+    if score >= MATE_SCORE - MAX_PLY:
+        return score + ply
+    if score <= -MATE_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    if score >= MATE_SCORE - MAX_PLY:
+        return score - ply
+    if score <= -MATE_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+class SearchResult:
+    """
+    Result of a search, for the deepest iteration completed.
+    """
+
+    def __init__(self, move, score, pv, depth, nodes, time, cutoffs=0, first_move_cutoffs=0):
+        # The best move, or None if the player cannot move
+        self.move = move
+        # The score of the position for the player to move, in centipawns
+        self.score = score
+        # The principal variation : the moves expected to be played, starting with the best move
+        self.pv = pv
+        self.depth = depth
+        # Number of nodes searched and time taken by the whole search, in seconds
+        self.nodes = nodes
+        self.time = time
+        # Number of beta cutoffs, and of cutoffs caused by the first move searched
+        self.cutoffs = cutoffs
+        self.first_move_cutoffs = first_move_cutoffs
+
+    @property
+    def nps(self):
+        """Nodes searched per second"""
+        return self.nodes / self.time if self.time > 0 else 0
+
+    @property
+    def cutoff_rate(self):
+        """Proportion of the beta cutoffs caused by the first move searched : the quality of the move ordering"""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs > 0 else 0
+
+    @property
+    def is_mate(self):
+        return abs(self.score) >= MATE_SCORE - MAX_PLY
+
+    def __repr__(self):
+        return "<SearchResult move={} score={} depth={} pv='{}' nodes={} nps={:.0f}>".format(
+            None if self.move is None else move.to_str(self.move), self.score, self.depth, " ".join(move.to_str(m) for m in self.pv),
+            self.nodes, self.nps)
+
+
+class SearchStopped(Exception):
+    """
+    Raised in the search when a limit is reached, to stop the iteration.
+    """
+    pass
+
+
+class Engine:
+    """
+    Negamax alpha-beta search with iterative deepening.
+    """
+
+    def __init__(self, evaluate=None, hash_size=16, ordering=True, tt=None):
+        """
+        :param evaluate: The function evaluating a position, for the player to move (see `pychess.engine.evaluation`)
+        :param hash_size: The memory used by the transposition table, in megabytes, or 0 to search without it
+        :param ordering: Whether to order the moves (see `pychess.engine.ordering`). Otherwise only the hash move is searched first.
+        :param tt: A `TranspositionTable` to use instead of creating one, for example a table shared by several processes
+        """
+        self.evaluate = evaluation.pst if evaluate is None else evaluate
+        if tt is None and hash_size:
+            tt = TranspositionTable(hash_size)
+        self.tt = tt
+        self.ordering = MoveOrdering(MAX_PLY) if ordering else None
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.board = None
+        self._move_lists = [[] for _ in range(MAX_PLY + 1)]
+        # Zobrist keys of the positions from the root to the current node, to detect repetitions
+        self._keys = []
+        self._pv = []
+        self._follow_pv = False
+        self._deadline = None
+        self._max_nodes = None
+        self._next_check = 0
+        self._stopping = False
+        self._stop = None
+
+    def search(self, board, depth=None, nodes=None, time=None, callback=None, start_depth=1, stop=None):
+        """
+        Search the best move of the player whose turn it is.
+        The depths are searched one after the other, until a limit is reached. The result of the deepest depth completed
+        is returned, and the first depth is always completed.
+        :param board: The board to search. It is left unchanged.
+        :param depth: The maximum depth to search, in plies. Defaults to `MAX_PLY` if another limit is given, else 4.
+        :param nodes: The maximum number of nodes to search
+        :param time: The maximum time to search, in seconds
+        :param callback: A function called with the `SearchResult` of each depth completed
+        :param start_depth: The first depth to search
+        :param stop: An event (`threading.Event`, `multiprocessing.Event`...) stopping the search when it is set, even
+        during the first depth : the result is then None if no depth was completed.
+        :return: A `SearchResult`
+        """
+        if depth is None:
+            depth = MAX_PLY if nodes is not None or time is not None else 4
+        depth = min(depth, MAX_PLY)
+
+        start = _time.perf_counter()
+        self.board = board
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self._keys = [board.zobrist]
+        self._pv = []
+        self._deadline = None if time is None else start + time
+        self._max_nodes = nodes
+        self._next_check = CHECK_INTERVAL if nodes is None else min(CHECK_INTERVAL, nodes)
+        self._stopping = False
+        self._stop = stop
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.ordering is not None:
+            self.ordering.new_search(board)
+
+        root_moves = len(board._undo_stack)
+        result = None
+        for current_depth in range(min(start_depth, depth), depth + 1):
+            # The limits are not checked in the first iteration, so there is always a move to return
+            self._stopping = current_depth > start_depth
+            pv = []
+            self._follow_pv = True
+            try:
+                score = self._negamax(current_depth, 0, -INFINITY, INFINITY, pv)
+            except SearchStopped:
+                break
+            finally:
+                # Undo the moves of the interrupted iteration
+                del self._keys[1:]
+                while len(board._undo_stack) > root_moves:
+                    board.pop()
+
+            self._pv = pv
+            result = SearchResult(pv[0] if len(pv) != 0 else None, score, pv, current_depth, self.nodes, _time.perf_counter() - start,
+                                  self.cutoffs, self.first_move_cutoffs)
+            if callback is not None:
+                callback(result)
+            if len(pv) == 0 or result.is_mate:
+                # No legal move, or the mate is found : deeper searches would give the same result
+                break
+
+        if result is not None:
+            result.nodes = self.nodes
+            result.time = _time.perf_counter() - start
+            result.cutoffs = self.cutoffs
+            result.first_move_cutoffs = self.first_move_cutoffs
+        return result
+
+    def _check_limits(self):
+        self._next_check = self.nodes + CHECK_INTERVAL
+        if self._max_nodes is not None:
+            self._next_check = min(self._next_check, self._max_nodes)
+        if self._stop is not None and self._stop.is_set():
+            raise SearchStopped()
+        if not self._stopping:
+            return
+        if self._max_nodes is not None and self.nodes >= self._max_nodes:
+            raise SearchStopped()
+        if self._deadline is not None and _time.perf_counter() >= self._deadline:
+            raise SearchStopped()
+
+    def _negamax(self, depth, ply, alpha, beta, pv):
+        """
+        Search a position.
+        :param pv: A list to fill with the principal variation of the position
+        :return: The score of the position, for the player to move
+        """
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_limits()
+
+        board = self.board
+        if ply != 0:
+            if board.halfmove_clock >= 100:
+                return 0
+            key = self._keys[-1]
+            # Repetition of a position of the search : the opponent can repeat it again, so it is a draw
+            for i in range(len(self._keys) - 3, -1, -2):
+                if self._keys[i] == key:
+                    return 0
+
+        if depth == 0 or ply >= MAX_PLY:
+            return self._quiesce(ply, alpha, beta)
+
+        tt = self.tt
+        hash_move = 0
+        if tt is not None:
+            entry = tt.probe(self._keys[-1])
+            if entry is not None:
+                hash_move, score, entry_depth, bound = entry
+                if ply != 0 and entry_depth >= depth:
+                    score = score_from_tt(score, ply)
+                    if bound == BOUND_EXACT or (bound == BOUND_LOWER and score >= beta) or (bound == BOUND_UPPER and score <= alpha):
+                        return score
+
+        moves = board.generate_moves(self._move_lists[ply])
+        if len(moves) == 0:
+            return -MATE_SCORE + ply if board.is_check() else 0
+
+        first_move = hash_move
+        if self._follow_pv:
+            # Search the move of the principal variation of the previous iteration first
+            if ply < len(self._pv) and self._pv[ply] in moves:
+                first_move = self._pv[ply]
+            else:
+                self._follow_pv = False
+        if self.ordering is not None:
+            self.ordering.order(board, moves, ply, first_move)
+        elif first_move != 0 and first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+
+        alpha_start = alpha
+        best_move = 0
+        child_pv = []
+        keys = self._keys
+        for i, m in enumerate(moves):
+            board.push(m)
+            keys.append(board.zobrist)
+            child_pv.clear()
+            score = -self._negamax(depth - 1, ply + 1, -beta, -alpha, child_pv)
+            keys.pop()
+            board.pop()
+            self._follow_pv = False
+
+            if score > alpha:
+                alpha = score
+                best_move = m
+                pv[:] = [m] + child_pv
+                if score >= beta:
+                    self.cutoffs += 1
+                    if i == 0:
+                        self.first_move_cutoffs += 1
+                    if self.ordering is not None:
+                        self.ordering.cutoff(board, m, depth, ply)
+                    break
+
+        if tt is not None:
+            if alpha >= beta:
+                bound = BOUND_LOWER
+            elif alpha > alpha_start:
+                bound = BOUND_EXACT
+            else:
+                bound = BOUND_UPPER
+            tt.store(keys[-1], best_move, score_to_tt(alpha, ply), depth, bound)
+        return alpha
+
+    def _quiesce(self, ply, alpha, beta):
+        """
+        Search only the captures and the promotions of a position, until it is quiet, so the evaluation is not done in
+        the middle of an exchange. The captures losing material (see `Board.see`) are not searched.
+        :return: The score of the position, for the player to move
+        """
+        board = self.board
+        # The player to move can choose not to take
+        stand_pat = self.evaluate(board)
+        if ply >= MAX_PLY or stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        moves = board.generate_moves(self._move_lists[ply])
+        if len(moves) == 0:
+            return -MATE_SCORE + ply if board.is_check() else 0
+
+        captures = []
+        for m in moves:
+            promotion = m >> move.PROMOTION_SHIFT
+            if promotion:
+                # Only the promotions to a queen are searched
+                if promotion == QUEEN:
+                    captures.append((SEE_VALUES[QUEEN] * 16, m))
+            elif m & TACTICAL_FLAGS and not is_losing_capture(board, m):
+                captures.append((mvv_lva(board, m), m))
+        if len(captures) == 0:
+            return alpha
+        captures.sort(reverse=True)
+
+        for _, m in captures:
+            self.nodes += 1
+            if self.nodes >= self._next_check:
+                self._check_limits()
+            board.push(m)
+            score = -self._quiesce(ply + 1, -beta, -alpha)
+            board.pop()
+            if score > alpha:
+                alpha = score
+                if score >= beta:
+                    break
+        return alpha
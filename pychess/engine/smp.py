@@ -0,0 +1,110 @@
+"""
+Parallel search on several processes (Lazy SMP).
+
+Every worker process searches the same position with its own `Engine`, and all the engines use the same transposition
+table, stored in a `multiprocessing.shared_memory.SharedMemory`. The workers do not communicate otherwise : they help
+each other through the entries of the table, and half of them start one depth deeper so they fill the table ahead of
+the others. The result of the deepest depth completed by a worker is returned.
+
+The workers receive the position as a FEN string, not as a pickled board.
+"""
+import multiprocessing
+import os
+import queue
+import time as _time
+from multiprocessing import shared_memory
+from pychess.bitboard import BitBoard
+from pychess.engine.search import Engine, SearchResult
+from pychess.engine.tt import TranspositionTable, table_size
+
+
+def _worker(worker_id, fen, backend, shm_name, size, limits, stop, results):
+    """
+    Search a position in a worker process, and put the result in the results queue : a tuple (worker_id, result).
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffer = shm.buf[:size]
+    tt = TranspositionTable(buffer=buffer)
+    try:
+        engine = Engine(tt=tt)
+        board = backend.from_fen(fen)
+        result = engine.search(board, start_depth=1 + worker_id % 2, stop=stop, **limits)
+        if result is None:
+            # Stopped before the end of the first depth
+            result = SearchResult(None, 0, [], 0, engine.nodes, 0)
+        results.put((worker_id, result))
+    finally:
+        tt.close()
+        buffer.release()
+        shm.close()
+
+
+def parallel_search(board, workers=None, depth=None, nodes=None, time=None, hash_size=64, backend=None, context=None):
+    """
+    Search the best move of a position on several processes.
+    :param board: The board to search (a `Board` or a `BitBoard`), or a FEN string
+    :param workers: The number of worker processes, defaults to the number of CPUs
+    :param depth: The maximum depth to search, in plies
+    :param nodes: The maximum number of nodes to search, shared equally by the workers
+    :param time: The maximum time to search, in seconds
+    :param hash_size: The memory used by the shared transposition table, in megabytes
+    :param backend: The board class used by the workers, defaults to the class of the board (or `BitBoard` for a FEN string)
+    :param context: The multiprocessing context used to start the workers, defaults to the default context
+    :return: The `SearchResult` of the deepest search of the workers, with the nodes searched by all the workers
+    """
+    if isinstance(board, str):
+        fen = board
+        backend = BitBoard if backend is None else backend
+    else:
+        fen = board.to_fen()
+        backend = type(board) if backend is None else backend
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if context is None:
+        context = multiprocessing.get_context()
+
+    limits = {"depth": depth, "time": time, "nodes": None if nodes is None else max(1, nodes // workers)}
+    size = table_size(hash_size)
+    start = _time.perf_counter()
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    processes = []
+    try:
+        shm.buf[:size] = bytes(size)
+        stop = context.Event()
+        results = context.Queue()
+        processes = [context.Process(target=_worker, args=(i, fen, backend, shm.name, size, limits, stop, results), daemon=True)
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+
+        # The main worker has the limits of the search : when it is done, the helpers are stopped
+        finished = {}
+        while len(finished) < workers:
+            try:
+                worker_id, result = results.get(timeout=0.1)
+            except queue.Empty:
+                for i, process in enumerate(processes):
+                    if i not in finished and process.exitcode is not None and results.empty():
+                        stop.set()
+                        raise RuntimeError("Search worker {} exited with code {}".format(i, process.exitcode))
+                continue
+            finished[worker_id] = result
+            if worker_id == 0:
+                stop.set()
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        shm.close()
+        shm.unlink()
+
+    best = finished[0]
+    for worker_id in range(1, workers):
+        result = finished[worker_id]
+        if result.move is not None and result.depth > best.depth:
+            best = result
+    best.nodes = sum(result.nodes for result in finished.values())
+    best.time = _time.perf_counter() - start
+    return best
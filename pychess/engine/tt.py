@@ -0,0 +1,163 @@
+"""
+Transposition table : a fixed size cache of the results of the search, indexed by the Zobrist key of the positions.
+
+The entries are stored in a preallocated `array` of 64 bits ints (or in a buffer given to the table, for example a
+`multiprocessing.shared_memory.SharedMemory` shared by several processes), so the memory used does not depend on the
+number of positions searched. Each entry takes two ints : the key of the position xor the data, and the packed data :
+
+- bits 0 to 30 : the best move (see `pychess.move`), or 0
+- bits 31 to 51 : the score, plus `SCORE_OFFSET`
+- bits 52 to 58 : the depth searched
+- bits 59 to 60 : the bound of the score (`BOUND_EXACT`, `BOUND_LOWER`, `BOUND_UPPER`)
+- bits 61 to 63 : the generation of the search that stored the entry
+
+Storing the key xor the data lets a process detect an entry being written by another process at the same time without
+any lock : the two ints would not match, and the entry is ignored.
+
+The entries are grouped in buckets of two : the first entry is only replaced by a deeper search or by an entry of a
+newer search (depth-preferred), the second entry is always replaced.
+"""
+from array import array
+
+# Bound of the score of an entry. 0 means the entry is empty.
+BOUND_EXACT = 1
+BOUND_LOWER = 2  # The score is at least the one stored (the search failed high)
+BOUND_UPPER = 3  # The score is at most the one stored (the search failed low)
+
+MOVE_MASK = (1 << 31) - 1
+SCORE_SHIFT = 31
+SCORE_MASK = (1 << 21) - 1
+SCORE_OFFSET = 1 << 20
+DEPTH_SHIFT = 52
+DEPTH_MASK = 0x7F
+BOUND_SHIFT = 59
+GENERATION_SHIFT = 61
+
+# Size of an entry, in bytes
+ENTRY_SIZE = 16
+ENTRIES_PER_BUCKET = 2
+BUCKET_SIZE = ENTRY_SIZE * ENTRIES_PER_BUCKET
+
+
+def table_size(size_mb):
+    """
+    Get the number of bytes used by a table of a given size : the number of buckets is rounded down to a power of two,
+    so the bucket of a key is found with a mask.
+    :param size_mb: The size of the table, in megabytes
+    """
+    nb_buckets = max(1, int(size_mb * 1024 * 1024) // BUCKET_SIZE)
+    return (1 << (nb_buckets.bit_length() - 1)) * BUCKET_SIZE
+
+
+class TranspositionTable:
+
+    def __init__(self, size_mb=16, buffer=None):
+        """
+        :param size_mb: The memory used by the table, in megabytes (see `table_size`)
+        :param buffer: A writable buffer to store the entries in, instead of allocating them. Its size must be given by
+        `table_size`. The entries already in the buffer are kept.
+        """
+        if buffer is None:
+            self.table = array("Q", [0]) * (table_size(size_mb) // 8)
+        else:
+            self.table = memoryview(buffer).cast("B").cast("Q")
+            nb_buckets = len(self.table) * 8 // BUCKET_SIZE
+            if nb_buckets == 0 or nb_buckets & (nb_buckets - 1) or len(self.table) * 8 != nb_buckets * BUCKET_SIZE:
+                self.table.release()
+                raise ValueError("The size of the buffer must be a power of two number of buckets (see table_size())")
+        self._mask = len(self.table) // 4 - 1
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    @property
+    def nb_entries(self):
+        return len(self.table) // 2
+
+    @property
+    def size(self):
+        """The memory used by the entries, in bytes"""
+        return len(self.table) * self.table.itemsize
+
+    def clear(self):
+        self.table[:] = array("Q", [0]) * len(self.table)
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def close(self):
+        """
+        Release the buffer given to the table. The table cannot be used after.
+        """
+        if isinstance(self.table, memoryview):
+            self.table.release()
+
+    def new_search(self):
+        """
+        Start a new search : the entries of the previous searches will be replaced first.
+        """
+        self.generation = (self.generation + 1) & 7
+
+    def probe(self, key):
+        """
+        Look for the entry of a position.
+        :param key: The Zobrist key of the position
+        :return: A tuple (move, score, depth, bound), or None if the position is not in the table
+        """
+        self.probes += 1
+        table = self.table
+        index = (key & self._mask) * 4
+        data = table[index + 1]
+        if table[index] ^ data != key:
+            data = table[index + 3]
+            if table[index + 2] ^ data != key:
+                return None
+        bound = data >> BOUND_SHIFT & 3
+        if bound == 0:
+            return None
+        self.hits += 1
+        return data & MOVE_MASK, (data >> SCORE_SHIFT & SCORE_MASK) - SCORE_OFFSET, data >> DEPTH_SHIFT & DEPTH_MASK, bound
+
+    def store(self, key, move, score, depth, bound):
+        """
+        Store the result of the search of a position.
+        :param key: The Zobrist key of the position
+        :param move: The best move found, or 0
+        :param score: The score of the position
+        :param depth: The depth searched
+        :param bound: `BOUND_EXACT`, `BOUND_LOWER` or `BOUND_UPPER`
+        """
+        table = self.table
+        index = (key & self._mask) * 4
+        data = move | (score + SCORE_OFFSET) << SCORE_SHIFT | depth << DEPTH_SHIFT | bound << BOUND_SHIFT | self.generation << GENERATION_SHIFT
+
+        old_data = table[index + 1]
+        old_key = table[index] ^ old_data
+        if old_key == key or old_data == 0 or depth >= (old_data >> DEPTH_SHIFT & DEPTH_MASK) \
+                or old_data >> GENERATION_SHIFT != self.generation:
+            if old_key == key and move == 0:
+                # Keep the best move of a previous search of the position
+                data |= old_data & MOVE_MASK
+            elif old_key != key and old_data != 0:
+                # The entry replaced goes to the always-replace slot
+                table[index + 2] = table[index]
+                table[index + 3] = old_data
+            table[index] = key ^ data
+            table[index + 1] = data
+        else:
+            if table[index + 2] ^ table[index + 3] == key and move == 0:
+                data |= table[index + 3] & MOVE_MASK
+            table[index + 2] = key ^ data
+            table[index + 3] = data
+
+    def hashfull(self):
+        """
+        Get the proportion of the entries used by the current search, in permill (sampled on the first 1000 buckets).
+        """
+        table = self.table
+        nb = min(1000, len(table) // 4)
+        used = 0
+        for i in range(0, nb * 4, 2):
+            if table[i + 1] != 0 and table[i + 1] >> GENERATION_SHIFT == self.generation:
+                used += 1
+        return used * 1000 // (nb * 2)
@@ -0,0 +1,78 @@
+"""
+Compact representation of moves.
+
+A move is stored in a single int :
+
+- bits 0 to 11 : the index of the start square
+- bits 12 to 23 : the index of the destination square
+- bits 24 to 27 : the flags of the move (`FLAG_CAPTURE`, `FLAG_DOUBLE_PUSH`, `FLAG_EN_PASSANT`, `FLAG_CASTLING`)
+- bits 28 to 30 : the type of the piece a pawn is promoted to (see `pychess.pieces.Piece.TYPE`), or 0
+
+The index of a square is `row * files + col`, with `files` the number of files of the board.
+"""
+
+FLAG_CAPTURE = 1
+FLAG_DOUBLE_PUSH = 2
+FLAG_EN_PASSANT = 4
+FLAG_CASTLING = 8
+
+SQUARE_MASK = 0xFFF
+DEST_SHIFT = 12
+FLAGS_SHIFT = 24
+PROMOTION_SHIFT = 28
+
+FILE_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# Promotion letters, indexed by piece type
+PROMOTION_LETTERS = ("", "", "n", "b", "r", "q", "")
+
+
+def encode(start, dest, flags=0, promotion=0):
+    """
+    Pack a move in an int.
+    :param start: The index of the start square
+    :param dest: The index of the destination square
+    :param flags: The flags of the move
+    :param promotion: The type of the piece to promote to, or 0
+    :return: The move
+    """
+    return start | dest << DEST_SHIFT | flags << FLAGS_SHIFT | promotion << PROMOTION_SHIFT
+
+
+def start_square(move):
+    return move & SQUARE_MASK
+
+
+def dest_square(move):
+    return move >> DEST_SHIFT & SQUARE_MASK
+
+
+def flags(move):
+    return move >> FLAGS_SHIFT & 0xF
+
+
+def promotion(move):
+    return move >> PROMOTION_SHIFT
+
+
+def is_capture(move):
+    return move >> FLAGS_SHIFT & FLAG_CAPTURE != 0
+
+
+def square_name(square, files=8):
+    """
+    Get the name of a square (ex: e4).
+    :param square: The index of the square
+    :param files: The number of files of the board
+    """
+    row, col = divmod(square, files)
+    return FILE_LETTERS[col] + str(row + 1)
+
+
+def to_str(move, files=8):
+    """
+    Get the move in coordinate notation (ex: e2e4, e7e8q).
+    :param move: The move
+    :param files: The number of files of the board
+    """
+    return square_name(move & SQUARE_MASK, files) + square_name(move >> DEST_SHIFT & SQUARE_MASK, files) + PROMOTION_LETTERS[move >> PROMOTION_SHIFT]
@@ -0,0 +1,104 @@
+"""
+Fixed size binary encoding of the 8x8 positions, to store them and to send them between processes.
+
+A position takes `RECORD_SIZE` bytes :
+
+- bytes 0 to 7 : the occupancy, a little-endian 64 bits int with the bit `row * 8 + col` set when a piece is on the square
+- bytes 8 to 23 : the code of each piece (`type | color << 3`, see `pychess.pieces.Piece.TYPE`) in 4 bits, in the order
+  of the squares of the occupancy, the first piece in the low bits of byte 8
+- byte 24 : the castling rights (see `pychess.board.CASTLING_WHITE_KING`...), with the player to move in bit 4
+- byte 25 : the index of the en passant square, or `NO_EN_PASSANT`
+- byte 26 : the halfmove clock, capped to 255
+- bytes 27 and 28 : the fullmove number, a little-endian 16 bits int, capped to 65535
+- bytes 29 to 31 : zeros
+
+Many records stored one after the other can be decoded at once with `decode_array` (with NumPy).
+"""
+import struct
+
+RECORD_SIZE = 32
+NO_EN_PASSANT = 0xFF
+MAX_PIECES = 32
+
+_STRUCT = struct.Struct("<Q16sBBBH3x")
+
+
+def pack(codes, castling, turn, ep_square, halfmove_clock, fullmove_nb):
+    """
+    Encode a position.
+    :param codes: The code of the piece on each of the 64 squares (`type | color << 3`), or 0 if the square is empty
+    :param castling: The castling rights
+    :param turn: The color of the player to move
+    :param ep_square: The index of the en passant square, or None
+    :return: The `RECORD_SIZE` bytes of the position
+    """
+    occupancy = 0
+    nibbles = 0
+    shift = 0
+    for square, code in enumerate(codes):
+        if code:
+            occupancy |= 1 << square
+            nibbles |= code << shift
+            shift += 4
+    if shift > MAX_PIECES * 4:
+        raise ValueError("Too many pieces to encode the position")
+    return _STRUCT.pack(occupancy, nibbles.to_bytes(16, "little"), castling | turn << 4, NO_EN_PASSANT if ep_square is None else ep_square,
+                        min(halfmove_clock, 255), min(fullmove_nb, 0xFFFF))
+
+
+def unpack(data):
+    """
+    Decode a position.
+    :param data: The `RECORD_SIZE` bytes of the position
+    :return: A tuple (codes, castling, turn, ep_square, halfmove_clock, fullmove_nb), see `pack`
+    """
+    if len(data) != RECORD_SIZE:
+        raise ValueError("A position takes {} bytes, got {}".format(RECORD_SIZE, len(data)))
+    occupancy, nibbles, state, ep_square, halfmove_clock, fullmove_nb = _STRUCT.unpack(data)
+    codes = [0] * 64
+    nibbles = int.from_bytes(nibbles, "little")
+    while occupancy:
+        bit = occupancy & -occupancy
+        codes[bit.bit_length() - 1] = nibbles & 0xF
+        nibbles >>= 4
+        occupancy ^= bit
+    return codes, state & 0xF, state >> 4 & 1, None if ep_square == NO_EN_PASSANT else ep_square, halfmove_clock, fullmove_nb
+
+
+def decode_array(buffer):
+    """
+    Decode many positions stored one after the other, with NumPy.
+    :param buffer: A bytes-like object (bytes, `mmap.mmap`, NumPy array...) of a multiple of `RECORD_SIZE` bytes
+    :return: A dict of arrays with N rows : "codes" (N, 64) uint8 (see `pack`), "planes" (N, 64) uint8 (the planes of
+    `pychess.engine.batch`, to evaluate the positions), "castling", "turn", "ep_square" (`NO_EN_PASSANT` if none),
+    "halfmove_clock" and "fullmove_nb"
+    """
+    import numpy as np
+    from pychess.engine.batch import EMPTY
+
+    records = np.frombuffer(buffer, dtype=np.uint8)
+    if len(records) % RECORD_SIZE:
+        raise ValueError("The size of the buffer must be a multiple of {}".format(RECORD_SIZE))
+    records = records.reshape(-1, RECORD_SIZE)
+
+    occupied = np.unpackbits(records[:, :8], axis=1, bitorder="little").astype(bool)
+    nibbles = np.empty((len(records), MAX_PIECES), dtype=np.uint8)
+    nibbles[:, 0::2] = records[:, 8:24] & 0xF
+    nibbles[:, 1::2] = records[:, 8:24] >> 4
+    # The n-th piece is on the n-th occupied square
+    index = np.clip(np.cumsum(occupied, axis=1) - 1, 0, MAX_PIECES - 1)
+    codes = np.where(occupied, np.take_along_axis(nibbles, index, axis=1), 0).astype(np.uint8)
+
+    planes = np.full(16, EMPTY, dtype=np.uint8)
+    for piece_type in range(1, 7):
+        planes[piece_type] = piece_type - 1
+        planes[piece_type | 8] = 6 + piece_type - 1
+    return {
+        "codes": codes,
+        "planes": planes[codes],
+        "castling": records[:, 24] & 0xF,
+        "turn": records[:, 24] >> 4 & 1,
+        "ep_square": records[:, 25],
+        "halfmove_clock": records[:, 26],
+        "fullmove_nb": records[:, 27].astype(np.uint16) | records[:, 28].astype(np.uint16) << 8,
+    }
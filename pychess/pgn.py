@@ -0,0 +1,149 @@
+"""
+Reading of games in the PGN format (Portable Game Notation).
+
+The games are read one at a time from a file, so the memory used does not depend on the size of the file. Each game
+keeps its movetext as a string, and only splits it into moves when they are used (see `Game.moves`), so the games that
+are only filtered by their headers are never tokenised.
+"""
+import re
+
+# Groups : name, value
+TAG_REGEX = re.compile(r'^\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+
+# Groups : opening of a variation, closing of a variation, result, move. The comments, NAGs, move numbers and
+# annotations (!, ?, e.p.) are matched without group.
+TOKEN_REGEX = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+|(\()|(\))|\d+\.+|e\.p\.(?![^\s(){};$!?])|(1-0|0-1|1/2-1/2|\*)|([^\s(){};$!?]+)[!?]*")
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+
+class Game:
+    """
+    A game read from a PGN file.
+    """
+
+    def __init__(self, headers, movetext):
+        """
+        :param headers: The tags of the game, as a dict of names to values, in the order of the file
+        :param movetext: The moves of the game, as written in the file
+        """
+        self.headers = headers
+        self.movetext = movetext
+        self._moves = None
+        self._result = None
+
+    def _tokenise(self):
+        moves = []
+        result = None
+        depth = 0
+        for opening, closing, token_result, san in TOKEN_REGEX.findall(self.movetext):
+            if opening:
+                depth += 1
+            elif closing:
+                depth = max(0, depth - 1)
+            elif depth:
+                # Moves of a variation
+                continue
+            elif token_result:
+                result = token_result
+            elif san:
+                moves.append(san)
+        self._moves = moves
+        self._result = result
+
+    @property
+    def moves(self):
+        """The moves of the main line, in SAN (see `pychess.san`), without the comments and the variations"""
+        if self._moves is None:
+            self._tokenise()
+        return self._moves
+
+    @property
+    def result(self):
+        """The result of the game : "1-0", "0-1", "1/2-1/2", or "*" if unknown"""
+        result = self.headers.get("Result")
+        if result in RESULTS:
+            return result
+        if self._moves is None:
+            self._tokenise()
+        return self._result or "*"
+
+    def __repr__(self):
+        return "<Game white='{}' black='{}' result='{}'>".format(self.headers.get("White", "?"), self.headers.get("Black", "?"), self.result)
+
+
+def _unescape(value):
+    return value.replace('\\"', '"').replace("\\\\", "\\")
+
+
+def _ends_in_comment(line, in_comment):
+    """
+    Find whether a line of movetext ends inside a brace comment. The comments do not nest : a comment ends at the first
+    "}", and a ";" outside a comment starts a comment ending with the line.
+    :param line: The line
+    :param in_comment: True if the line starts inside a brace comment
+    :return: True if the line ends inside a brace comment
+    """
+    for c in line:
+        if in_comment:
+            if c == "}":
+                in_comment = False
+        elif c == "{":
+            in_comment = True
+        elif c == ";":
+            break
+    return in_comment
+
+
+def read_games(f, header_filter=None):
+    """
+    Read the games of a PGN file, one at a time.
+    :param f: A file, opened in text or binary mode, or any object with a `readline()` method (like a `mmap.mmap`). The
+    bytes are decoded as UTF-8.
+    :param header_filter: A function called with the headers of each game, returning False to skip the game. The moves of
+    the games skipped are not kept.
+    :return: A generator of `Game`
+    """
+    headers = {}
+    movetext = []
+    in_movetext = False
+    # True inside a comment of the movetext : a line starting with "[" is not a tag inside a comment
+    in_comment = False
+    keep = True
+
+    while True:
+        line = f.readline()
+        if not line:
+            break
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        stripped = line.strip()
+
+        if not in_comment and stripped.startswith("["):
+            match = TAG_REGEX.match(stripped)
+            if match is not None:
+                if in_movetext or match.group(1) in headers:
+                    # The tags of the next game
+                    if keep if in_movetext else header_filter is None or header_filter(headers):
+                        yield Game(headers, "".join(movetext))
+                    headers = {}
+                    movetext = []
+                    in_movetext = False
+                    keep = True
+                headers[match.group(1)] = _unescape(match.group(2))
+                continue
+
+        if not stripped or stripped.startswith("%"):
+            # Empty line, or escaped line
+            continue
+        if not in_movetext:
+            in_movetext = True
+            keep = header_filter is None or header_filter(headers)
+        if in_comment or "{" in line:
+            in_comment = _ends_in_comment(line, in_comment)
+        if keep:
+            movetext.append(line)
+
+    if in_movetext or headers:
+        if keep if in_movetext else header_filter is None or header_filter(headers):
+            yield Game(headers, "".join(movetext))
@@ -1,12 +1,31 @@
 import abc
-import types
 from pychess.player import COLOR_BLACK, COLOR_WHITE
-import pychess.signals as signals
+
+# Piece types
+PAWN = 1
+KNIGHT = 2
+BISHOP = 3
+ROOK = 4
+QUEEN = 5
+KING = 6
+
+# Value of the squares around the board in the mailbox of a board (see `pychess.board.Board.mailbox`)
+OFF_BOARD = object()
+
+# Steps (rows, cols) of the sliding pieces, in the order their moves are listed
+ROOK_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_STEPS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
 
 
 class Piece:
 
+    # The attributes of all the types of pieces are declared here, and the subclasses do not add any, so all the pieces
+    # have the same layout and a pawn can change its class when it is promoted (see `Pawn.promote`).
+    # has_moved is only set for the pawns, the rooks and the kings, and direction for the pawns.
+    __slots__ = ("player", "color", "row", "col", "board", "value", "has_moved", "direction", "promoted", "__weakref__")
+
     SAN_LETTER = "?"
+    TYPE = 0
 
     def __init__(self, player, value, row=None, col=None, board=None):
         self.player = player
@@ -15,6 +34,8 @@ class Piece:
         self.col = col  # The file of the piece
         self.board = board
         self.value = value
+        # True for a pawn promoted with `Pawn.promote`
+        self.promoted = False
         player.pieces.append(self)
 
     def display(self):
@@ -26,17 +47,24 @@ class Piece:
 
     def move(self, row, col, check=True):
         if not check or self.can_move(row, col):
-            signals.PIECE_MOVE.send(self, start=(self.row, self.col), dest=(row, col))
-            self.board.ranks[self.row][self.col] = None
+            board = self.board
+            start_row, start_col = self.row, self.col
+            board._on_piece_move(self, start_row, start_col, row, col)
+            self.board.set_cell(self.row, self.col, None)
 
             # If there is a piece where we move, we eat it
-            if self.board.ranks[row][col] is not None:
-                self.board.ranks[row][col].on_eat(self)
+            eaten = self.board.ranks[row][col]
+            self.board.set_cell(row, col, self)
+            if eaten is not None:
+                eaten.on_eat(self)
 
-            self.board.ranks[row][col] = self
             self.row = row
             self.col = col
 
+            # The signal is only built and sent if something listens to it
+            if board.events.piece_move.receivers:
+                board.events.piece_move.send(self, start=(start_row, start_col), dest=(row, col))
+
             return True
 
         return False
@@ -45,10 +73,48 @@ class Piece:
     def get_possible_moves(self):
         pass
 
+    def _slide(self, steps):
+        """
+        Get the squares a sliding piece can move to, walking the mailbox of the board in each direction until a piece
+        or an `OFF_BOARD` square. The squares where the move is illegal are skipped, but do not end the ray, as a farther
+        square can block a check.
+        :param steps: The steps (rows, cols) of the directions
+        :return: A list of (row, col) tuples
+        """
+        board = self.board
+        mailbox = board.mailbox
+        start = board.mailbox_index(self.row, self.col)
+        possible = []
+        for dr, dc in steps:
+            step = dr * board.mailbox_stride + dc
+            index = start + step
+            row, col = self.row + dr, self.col + dc
+            target = mailbox[index]
+            while target is not OFF_BOARD and (target is None or target.player != self.player):
+                if not board.is_illegal_move(self.player, self.row, self.col, row, col):
+                    possible.append((row, col))
+                if target is not None:
+                    break
+                index += step
+                row += dr
+                col += dc
+                target = mailbox[index]
+        return possible
+
     def on_eat(self, piece):
-        signals.PIECE_TAKEN.send(self, attacker=piece)
+        if self.board is not None:
+            # Before the type of a promoted pawn changes, so the board finds it in its piece lists
+            self.board._on_piece_taken(self)
+        if self.promoted:
+            # A promoted pawn is a pawn again once taken
+            self.__class__ = Pawn
+            self.value = Pawn.VALUE
+            self.promoted = False
         self.row = None
         self.col = None
+        if self.board is not None:
+            if self.board.events.piece_taken.receivers:
+                self.board.events.piece_taken.send(self, attacker=piece)
         piece.player.eaten.append(self)
 
     def __str__(self):
@@ -67,7 +133,10 @@ class Piece:
 
 class Pawn(Piece):
 
+    __slots__ = ()
+
     SAN_LETTER = "P"
+    TYPE = PAWN
     VALUE = 1
 
     def __init__(self, player, row=None, col=None):
@@ -170,33 +239,38 @@ class Pawn(Piece):
 
             if en_passant:
                 # Eat the opponent's pawn
-                self.board.get_cell(row - self.direction, col).on_eat(self)
-                self.board.ranks[row - self.direction][col] = None
+                eaten = self.board.get_cell(row - self.direction, col)
+                self.board.set_cell(row - self.direction, col, None)
+                eaten.on_eat(self)
 
             # We check if the pawn can promote
             if row == 0 or row == self.board.shape[0] - 1:
-                signals.PAWN_PROMOTION.send(self)
+                if self.board.events.pawn_promotion.receivers:
+                    self.board.events.pawn_promotion.send(self)
 
     def promote(self, piece_type):
-        # Override instance methods to the ones of the piece promoted to
-        self.icon = types.MethodType(piece_type.icon, self)
-        self.display = types.MethodType(piece_type.display, self)
-        self.can_move = types.MethodType(piece_type.can_move, self)
-        self.get_possible_moves = types.MethodType(piece_type.get_possible_moves, self)
-        self.move = types.MethodType(piece_type.move, self)
+        # The piece changes type, so it is put on its square again to update the key of the board
+        on_board = self.board is not None and self.row is not None
+        if on_board:
+            self.board.set_cell(self.row, self.col, None)
+            self.board.piece_lists[self.color][self.TYPE].remove(self)
+        # The pawn becomes a piece of the type promoted to, with its methods, TYPE and SAN_LETTER
+        self.__class__ = piece_type
         self.value = piece_type.VALUE
-        signals.PAWN_PROMOTED.send(self, piece_type=piece_type)
-
-    def on_eat(self, piece):
-        self.icon = types.MethodType(Pawn.icon, self)
-        self.display = types.MethodType(Pawn.display, self)
-        self.value = 1
-        super().on_eat(piece)
+        self.promoted = True
+        if on_board:
+            self.board.set_cell(self.row, self.col, self)
+            self.board.piece_lists[self.color][self.TYPE].append(self)
+        if self.board is not None and self.board.events.pawn_promoted.receivers:
+            self.board.events.pawn_promoted.send(self, piece_type=piece_type)
 
 
 class Rook(Piece):
 
+    __slots__ = ()
+
     SAN_LETTER = "R"
+    TYPE = ROOK
     VALUE = 5
 
     def __init__(self, player, row=None, col=None):
@@ -231,29 +305,12 @@ class Rook(Piece):
         if row == self.row and col == self.col:
             return False
 
-        # Change column
-        if row == self.row:
-            # We check if the path is not blocked by another piece
-            if col > self.col:
-                direction = 1
-            else:
-                direction = -1
-
-            for c in range(self.col + direction, col, direction):
-                if self.board.get_cell(self.row, c) is not None:
-                    return False
-        # Change row
-        elif col == self.col:
-            # We check if the path is not blocked by another piece
-            if row > self.row:
-                direction = 1
-            else:
-                direction = -1
+        # The piece is not on the same rank or file
+        if row != self.row and col != self.col:
+            return False
 
-            for r in range(self.row + direction, row, direction):
-                if self.board.get_cell(r, self.col) is not None:
-                    return False
-        else:
+        # We check if the path is not blocked by another piece
+        if not self.board.is_path_clear(self.row, self.col, row, col):
             return False
 
         # We check if the move puts the player in check :
@@ -266,25 +323,15 @@ class Rook(Piece):
         if self.row is None or self.col is None:
             return []
 
-        possible = []
-        for col in (1, -1):
-            i = 1
-            while self.can_move(self.row + i * col, self.col):
-                possible.append((self.row + i * col, self.col))
-                i += 1
-
-        for line in (1, -1):
-            i = 1
-            while self.can_move(self.row, self.col + i * line):
-                possible.append((self.row, self.col + i * line))
-                i += 1
-
-        return possible
+        return self._slide(ROOK_STEPS)
 
 
 class Bishop(Piece):
 
+    __slots__ = ()
+
     SAN_LETTER = "B"
+    TYPE = BISHOP
     VALUE = 3
 
     def __init__(self, player, row=None, col=None):
@@ -319,21 +366,8 @@ class Bishop(Piece):
             return False
 
         # We check if the path is not blocked by another piece
-        if col > self.col:
-            coldir = 1
-        else:
-            coldir = -1
-
-        if row > self.row:
-            rowdir = 1
-        else:
-            rowdir = -1
-
-        i = 1
-        while self.row + i * rowdir != row and self.col + i * coldir != col:
-            if self.board.get_cell(self.row + i * rowdir, self.col + i * coldir) is not None:
-                return False
-            i += 1
+        if not self.board.is_path_clear(self.row, self.col, row, col):
+            return False
 
         # We check if the move puts the player in check :
         if ignoreillegal:
@@ -345,19 +379,15 @@ class Bishop(Piece):
         if self.row is None or self.col is None:
             return []
 
-        possible = []
-        for xdir in (1, -1):
-            for ydir in (1, -1):
-                i = 1
-                while self.can_move(self.row + i * xdir, self.col + i * ydir):
-                    possible.append((self.row + i * xdir, self.col + i * ydir))
-                    i += 1
-        return possible
+        return self._slide(BISHOP_STEPS)
 
 
 class Queen(Piece):
 
+    __slots__ = ()
+
     SAN_LETTER = "Q"
+    TYPE = QUEEN
     VALUE = 9
 
     def __init__(self, player, row=None, col=None):
@@ -387,50 +417,12 @@ class Queen(Piece):
         if row == self.row and col == self.col:
             return False
 
-        # The piece is in a diagonal
-        if row - col == self.row - self.col or row + col == self.row + self.col:
-
-            # We check if the path is not blocked by another piece
-            if col > self.col:
-                ydir = 1
-            else:
-                ydir = -1
-
-            if row > self.row:
-                xdir = 1
-            else:
-                xdir = -1
-
-            i = 1
-            while self.row + i * xdir != row and self.row + i * xdir != col:
-                if self.board.get_cell(self.row + i * xdir, self.col + i * ydir) is not None:
-                    return False
-                i += 1
-
-        # Column
-        elif row == self.row:
-            # We check if the path is not blocked by another piece
-            if col > self.col:
-                direction = 1
-            else:
-                direction = -1
-
-            for line in range(self.col + direction, col, direction):
-                if self.board.get_cell(self.row, line) is not None:
-                    return False
-        # Line
-        elif col == self.col:
-            # We check if the path is not blocked by another piece
-            if row > self.row:
-                direction = 1
-            else:
-                direction = -1
-
-            for col in range(self.row + direction, row, direction):
-                if self.board.get_cell(col, self.col) is not None:
-                    return False
+        # The piece is not on the same rank, file or diagonal
+        if row != self.row and col != self.col and row - col != self.row - self.col and row + col != self.row + self.col:
+            return False
 
-        else:
+        # We check if the path is not blocked by another piece
+        if not self.board.is_path_clear(self.row, self.col, row, col):
             return False
 
         # We check if the move puts the player in check :
@@ -443,36 +435,15 @@ class Queen(Piece):
         if self.row is None or self.col is None:
             return []
 
-        possible = []
-
-        # Columns
-        for col in (1, -1):
-            i = 1
-            while self.can_move(self.row + i * col, self.col):
-                possible.append((self.row + i * col, self.col))
-                i += 1
-
-        # Lines
-        for line in (1, -1):
-            i = 1
-            while self.can_move(self.row, self.col + i * line):
-                possible.append((self.row, self.col + i * line))
-                i += 1
-
-        # Diagonals
-        for xdir in (1, -1):
-            for ydir in (1, -1):
-                i = 1
-                while self.can_move(self.row + i * xdir, self.col + i * ydir):
-                    possible.append((self.row + i * xdir, self.col + i * ydir))
-                    i += 1
-
-        return possible
+        return self._slide(ROOK_STEPS + BISHOP_STEPS)
 
 
 class Knight(Piece):
 
+    __slots__ = ()
+
     SAN_LETTER = "N"
+    TYPE = KNIGHT
     VALUE = 3
 
     def __init__(self, player, row=None, col=None):
@@ -535,7 +506,10 @@ class Knight(Piece):
 
 class King(Piece):
 
+    __slots__ = ()
+
     SAN_LETTER = "K"
+    TYPE = KING
     VALUE = 0
 
     def __init__(self, player, row=None, col=None):
@@ -579,7 +553,7 @@ class King(Piece):
                             # The path is blocked
                             return False
 
-                        if self.board.is_illegal_move(self.player, self.row, self.col, self.row, 5):
+                        if self.board.is_square_attacked(self.row * self.board.shape[1] + 5, 1 - self.color):
                             # The path is attacked
                             return False
                     else:
@@ -594,7 +568,7 @@ class King(Piece):
                             # The path is blocked
                             return False
 
-                        if self.board.is_illegal_move(self.player, self.row, self.col, self.row, 3):
+                        if self.board.is_square_attacked(self.row * self.board.shape[1] + 3, 1 - self.color):
                             # The path is attacked
                             return False
                     else:
@@ -635,15 +609,28 @@ class King(Piece):
                 if col == 2:
                     # Queen side
                     # Move the rook
-                    rook, self.board.ranks[self.row][0] = self.board.ranks[self.row][0], None
-                    self.board.ranks[self.row][3] = rook
+                    rook = self.board.get_cell(self.row, 0)
+                    self.board.set_cell(self.row, 0, None)
+                    self.board.set_cell(self.row, 3, rook)
                     rook.col = 3
 
                 if col == 6:
                     # King side
                     # Move the rook
-                    rook, self.board.ranks[self.row][7] = self.board.ranks[self.row][7], None
-                    self.board.ranks[self.row][5] = rook
+                    rook = self.board.get_cell(self.row, 7)
+                    self.board.set_cell(self.row, 7, None)
+                    self.board.set_cell(self.row, 5, rook)
                     rook.col = 5
 
             self.has_moved = True
+
+
+# Piece classes, indexed by their type
+TYPES = {
+    PAWN: Pawn,
+    KNIGHT: Knight,
+    BISHOP: Bishop,
+    ROOK: Rook,
+    QUEEN: Queen,
+    KING: King
+}
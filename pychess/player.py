@@ -1,8 +1,12 @@
+from pychess.move import SQUARE_MASK, DEST_SHIFT
+
 COLOR_WHITE = 0
 COLOR_BLACK = 1
 
 class Player:
 
+    __slots__ = ("board", "king", "pieces", "color", "name", "selected", "eaten", "__weakref__")
+
     def __init__(self, color, name="", board=None):
         self.board = None
         self.king = None
@@ -32,14 +36,20 @@ class Player:
         return self.board.is_checkmate(self)
 
     def can_move(self):
-        for piece in self.pieces:
-            if len(piece.get_possible_moves()) != 0:
-                return True
-        return False
+        return len(self.board.generate_moves(color=self.color)) != 0
 
     def possible_moves(self):
         poss = {}
         for piece in self.pieces:
-            poss[piece] = piece.get_possible_moves()
+            poss[piece] = []
+
+        files = self.board.shape[1]
+        for m in self.board.generate_moves(color=self.color):
+            row, col = divmod(m & SQUARE_MASK, files)
+            dest = divmod(m >> DEST_SHIFT & SQUARE_MASK, files)
+            moves = poss[self.board.get_cell(row, col)]
+            # A promotion is generated once for each type of piece
+            if len(moves) == 0 or moves[-1] != dest:
+                moves.append(dest)
 
         return poss
@@ -0,0 +1,98 @@
+"""
+Piece-square tables : the value of each piece on each square, in the middlegame and in the endgame.
+
+The boards keep the sum of the values of their pieces up to date when a square changes (see `Board.set_cell` and
+`Board.push`), like the Zobrist key, so the evaluation of a position does not look at its squares. The values of the
+black pieces are negative, so the sums are from white's point of view.
+
+The tables are loaded from a JSON file, by default `data/pst.json` in this package, so they can be tuned without
+changing the code. The file has the keys :
+
+- "phase" : the weight of each piece type in the game phase (see `PieceSquareTables.max_phase`)
+- "midgame" and "endgame" : the values of the pieces ("values") and a table for each piece type, from white's point of
+  view, with the 8th rank first as on a diagram
+
+The pieces are named "pawn", "knight", "bishop", "rook", "queen" and "king".
+"""
+import json
+import os
+from pychess.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "data", "pst.json")
+
+# Names of the piece types in the file
+NAMES = ((PAWN, "pawn"), (KNIGHT, "knight"), (BISHOP, "bishop"), (ROOK, "rook"), (QUEEN, "queen"), (KING, "king"))
+
+
+class PieceSquareTables:
+    """
+    Values of the pieces on each square of a board shape.
+    """
+
+    def __init__(self, shape, data):
+        """
+        :param shape: The shape of the board (ranks, files)
+        :param data: The content of a tables file (see the module documentation). If the tables do not have the shape of
+        the board, only the values of the pieces are used.
+        """
+        self.shape = shape
+        nb_ranks, files = shape
+        # Weight of each piece type in the phase, indexed by type, and phase of the starting position
+        self.phase = [0] * 7
+        for piece_type, name in NAMES:
+            self.phase[piece_type] = data["phase"][name]
+        self.max_phase = 2 * sum(self.phase[piece_type] * count for piece_type, count in ((KNIGHT, 2), (BISHOP, 2), (ROOK, 2), (QUEEN, 1)))
+        # Values indexed by color, type and index of the square
+        self.midgame = self._load(data["midgame"], nb_ranks, files)
+        self.endgame = self._load(data["endgame"], nb_ranks, files)
+
+    @staticmethod
+    def _load(data, nb_ranks, files):
+        white = [[0] * (nb_ranks * files) for _ in range(7)]
+        black = [[0] * (nb_ranks * files) for _ in range(7)]
+        for piece_type, name in NAMES:
+            value = data["values"][name]
+            table = data[name]
+            fits = len(table) == nb_ranks and all(len(rank) == files for rank in table)
+            for row in range(nb_ranks):
+                for col in range(files):
+                    # Black's table is white's one seen from the other side
+                    white[piece_type][row * files + col] = value + (table[nb_ranks - 1 - row][col] if fits else 0)
+                    black[piece_type][row * files + col] = -value - (table[row][col] if fits else 0)
+        return tuple(tuple(table) for table in white), tuple(tuple(table) for table in black)
+
+    def taper(self, midgame, endgame, phase):
+        """
+        Interpolate between the middlegame and endgame scores of a position.
+        :param phase: The sum of the weights of the pieces on the board : `max_phase` for the starting position, and 0
+        when only the pawns and the kings are left
+        """
+        phase = min(phase, self.max_phase)
+        return (midgame * phase + endgame * (self.max_phase - phase)) // self.max_phase
+
+
+def load(path=DEFAULT_PATH, shape=(8, 8)):
+    """
+    Load piece-square tables from a file.
+    :param path: The path of the JSON file (see the module documentation)
+    :param shape: The shape of the board (ranks, files)
+    :return: The `PieceSquareTables`
+    """
+    with open(path) as f:
+        return PieceSquareTables(shape, json.load(f))
+
+
+__TABLES = {}
+
+
+def get_tables(shape):
+    """
+    Get the default piece-square tables for a board shape. The file is loaded once for each shape.
+    :param shape: The shape of the board (ranks, files)
+    :return: The `PieceSquareTables` of the shape
+    """
+    tables = __TABLES.get(shape)
+    if tables is None:
+        tables = load(shape=shape)
+        __TABLES[shape] = tables
+    return tables
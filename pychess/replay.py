@@ -0,0 +1,183 @@
+"""
+Replay of the games of a PGN file on several processes, to extract their positions.
+
+The file is split into byte ranges starting at the beginning of a game (see `split_pgn`), and each range is replayed
+by a worker process of a `concurrent.futures.ProcessPoolExecutor`. The workers read their range from a memory-mapped
+file, parse the moves with `pychess.san` and play them on a `BitBoard`, without any `Piece` object or signal. The
+positions are sent back to the main process, which gives them to a sink, one range at a time.
+
+Each position is a record : a tuple (position, move, result), with the position encoded before the move (by default
+as a FEN string, see `replay`), the move played packed in an int (see `pychess.move`), and the result of the game
+("1-0", "0-1", "1/2-1/2" or "*").
+"""
+import concurrent.futures
+import mmap
+import os
+import re
+import time as _time
+from pychess.bitboard import BitBoard
+from pychess.pgn import read_games
+import pychess.san as san
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Default size of the ranges of the file replayed by the workers, in bytes
+CHUNK_SIZE = 1024 * 1024
+
+# A game starts with a tag after an empty line
+GAME_START = re.compile(rb"\n[ \t\r]*\n(?=\[)")
+
+
+class ReplayStats:
+    """
+    Counters of a replay.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.games = 0
+        self.positions = 0
+        # Games not replayed to the end, because of an invalid move
+        self.errors = 0
+        # Time taken by the replay, and sum of the times taken by the workers, in seconds
+        self.time = 0
+        self.cpu_time = 0
+
+    @property
+    def games_per_second(self):
+        return self.games / self.time if self.time > 0 else 0
+
+    @property
+    def games_per_second_per_core(self):
+        return self.games / self.cpu_time if self.cpu_time > 0 else 0
+
+    def __str__(self):
+        return "{} games ({} with errors), {} positions in {:.2f}s on {} workers : {:.0f} games/s, {:.0f} games/s per core".format(
+            self.games, self.errors, self.positions, self.time, self.workers, self.games_per_second, self.games_per_second_per_core)
+
+
+def split_pgn(path, chunk_size=CHUNK_SIZE):
+    """
+    Split a PGN file into byte ranges of about the same size, each starting at the beginning of a game.
+    :param path: The path of the file
+    :param chunk_size: The minimum size of a range, in bytes (the last one can be smaller)
+    :return: A list of tuples (start, end)
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    boundaries = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = chunk_size
+        while position < size:
+            match = GAME_START.search(mm, position)
+            if match is None:
+                break
+            boundaries.append(match.end())
+            position = match.end() + chunk_size
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+class _RangeReader:
+    """
+    Read the lines of a byte range of a memory-mapped file (see `pychess.pgn.read_games`).
+    """
+
+    def __init__(self, mm, start, end):
+        self.mm = mm
+        self.end = end
+        mm.seek(start)
+
+    def readline(self):
+        if self.mm.tell() >= self.end:
+            return b""
+        return self.mm.readline()
+
+
+def to_fen(board):
+    return board.to_fen()
+
+
+def to_bytes(board):
+    # Fixed size binary encoding, decoded at once with `pychess.packed.decode_array`
+    return board.to_bytes()
+
+
+def replay_game(game, encode=to_fen):
+    """
+    Replay a game on a `BitBoard`.
+    :param game: A `pychess.pgn.Game`
+    :param encode: The function encoding the positions
+    :return: A tuple (records, complete), complete being False if the game has an invalid move (the records of the moves
+    before it are given)
+    """
+    result = game.result
+    records = []
+    try:
+        board = BitBoard.from_fen(game.headers.get("FEN", START_FEN))
+        for text in game.moves:
+            m = san.parse(board, text)
+            records.append((encode(board), m, result))
+            board.push(m)
+    except ValueError:
+        return records, False
+    return records, True
+
+
+def _replay_range(path, start, end, encode):
+    """
+    Replay the games of a range of a PGN file, in a worker process.
+    :return: A tuple (records, games, errors, time)
+    """
+    begin = _time.perf_counter()
+    records = []
+    games = 0
+    errors = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for game in read_games(_RangeReader(mm, start, end)):
+            game_records, complete = replay_game(game, encode)
+            records.extend(game_records)
+            games += 1
+            if not complete:
+                errors += 1
+    return records, games, errors, _time.perf_counter() - begin
+
+
+def replay(path, sink, workers=None, chunk_size=CHUNK_SIZE, encode=to_fen, executor=None):
+    """
+    Replay all the games of a PGN file, and give their positions to a sink.
+    :param path: The path of the PGN file
+    :param sink: A function called in this process with the list of the records (see the module documentation) of each
+    range of the file, in the order the ranges are replayed
+    :param workers: The number of worker processes, if no executor is given (defaults to the number of CPUs)
+    :param chunk_size: The size of the ranges of the file given to the workers, in bytes (see `split_pgn`)
+    :param encode: The function encoding the positions, called with a `BitBoard` in the workers. It must be a function
+    defined at the top level of a module, to be sent to the workers. Defaults to the FEN string, `to_bytes` gives the
+    binary encoding of `pychess.packed`.
+    :param executor: A `ProcessPoolExecutor` to replay the games, to reuse the same processes
+    :return: The `ReplayStats` of the replay
+    """
+    begin = _time.perf_counter()
+    ranges = split_pgn(path, chunk_size)
+    own_executor = executor is None
+    if own_executor:
+        workers = os.cpu_count() or 1 if workers is None else workers
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    else:
+        workers = getattr(executor, "_max_workers", workers)
+    stats = ReplayStats(workers)
+    try:
+        futures = [executor.submit(_replay_range, path, start, end, encode) for start, end in ranges]
+        for future in concurrent.futures.as_completed(futures):
+            records, games, errors, elapsed = future.result()
+            stats.games += games
+            stats.errors += errors
+            stats.positions += len(records)
+            stats.cpu_time += elapsed
+            sink(records)
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+    stats.time = _time.perf_counter() - begin
+    return stats
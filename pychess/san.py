@@ -0,0 +1,169 @@
+"""
+Standard Algebraic Notation (SAN) of the moves, like Nbd7, exd6, O-O-O or e8=Q+.
+
+The moves are parsed and written from the pieces that can reach the destination square (see `Board.piece_attackers`),
+and the legality of a move is checked by playing it, so the list of the legal moves is only generated for the
+castling moves and for the mate suffix.
+
+The functions work with a `Board` or a `BitBoard`.
+"""
+import re
+import pychess.move as move
+from pychess.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, TYPES
+from pychess.player import COLOR_WHITE
+
+# Groups : piece, start file, start rank, capture, destination file, destination rank, promotion
+SAN_REGEX = re.compile(r"^([NBRQK])?((?!x[a-z]\d)[a-z])?(\d+)?(x)?([a-z])(\d+)(?:=?([NBRQ]))?\+?#?[!?]*$")
+CASTLING_REGEX = re.compile(r"^([O0]-[O0](-[O0])?)[+#]?[!?]*$")
+# En passant suffix, allowed after the move
+EN_PASSANT_SUFFIX = re.compile(r"\s*e\.?p\.?$")
+
+# Types of the pieces, indexed by SAN letter, and SAN letters indexed by type
+PIECE_TYPES = {"N": KNIGHT, "B": BISHOP, "R": ROOK, "Q": QUEEN, "K": KING}
+LETTERS = ("", "", "N", "B", "R", "Q", "K")
+
+
+def _is_legal(board, m):
+    """
+    Check if a pseudo-legal move leaves the king of the player safe.
+    """
+    board.push(m)
+    legal = not board.is_check(1 - board.turn)
+    board.pop()
+    return legal
+
+
+def parse(board, san):
+    """
+    Get the move written in SAN, for the player to move.
+    :param board: The board (a `Board` or a `BitBoard`)
+    :param san: The move in SAN (ex: Nbd7, exd6, exd6 e.p., O-O-O, e8=Q+). The check and annotation suffixes are ignored.
+    :return: The move, packed in an int (see `pychess.move`)
+    :raise ValueError: If the move is not valid SAN, or is not a legal move
+    """
+    text = EN_PASSANT_SUFFIX.sub("", san.strip())
+    nb_ranks, files = board.shape
+    color = board.turn
+
+    if CASTLING_REGEX.match(text):
+        king_side = text.count("-") == 1
+        for m in board.generate_moves():
+            if m >> move.FLAGS_SHIFT & move.FLAG_CASTLING:
+                start, dest = m & move.SQUARE_MASK, m >> move.DEST_SHIFT & move.SQUARE_MASK
+                if (dest > start) == king_side:
+                    return m
+        raise ValueError("Illegal move : " + san)
+
+    g = SAN_REGEX.match(text)
+    if g is None:
+        raise ValueError("Invalid SAN move : " + san)
+    letter, from_file, from_rank, capture, dest_file, dest_rank, promotion = g.groups()
+    dest_row = int(dest_rank) - 1
+    dest_col = move.FILE_LETTERS.index(dest_file)
+    if not (0 <= dest_row < nb_ranks and 0 <= dest_col < files):
+        raise ValueError("Invalid SAN move : " + san)
+    dest = dest_row * files + dest_col
+    if board.color_at(dest) == color:
+        raise ValueError("Illegal move : " + san)
+    promotion_type = None if promotion is None else TYPES[PIECE_TYPES[promotion]]
+
+    if letter is None:
+        # Pawn move
+        direction = 1 if color == COLOR_WHITE else -1
+        row = dest_row - direction
+        if from_file is not None:
+            col = move.FILE_LETTERS.index(from_file)
+            if abs(col - dest_col) != 1 or (board.type_at(dest) == 0 and board.en_passant != (dest_row, dest_col)):
+                raise ValueError("Illegal move : " + san)
+        else:
+            col = dest_col
+            if board.type_at(dest) != 0:
+                raise ValueError("Illegal move : " + san)
+            if 0 <= row < nb_ranks and board.type_at(row * files + col) == 0:
+                # Double push from the starting rank
+                row -= direction
+                if row != (1 if color == COLOR_WHITE else nb_ranks - 2):
+                    raise ValueError("Illegal move : " + san)
+        if not 0 <= row < nb_ranks or board.type_at(row * files + col) != PAWN or board.color_at(row * files + col) != color:
+            raise ValueError("Illegal move : " + san)
+        if (dest_row in (0, nb_ranks - 1)) != (promotion is not None):
+            raise ValueError("Invalid promotion : " + san)
+        m = board.get_move(row, col, dest_row, dest_col, promotion_type)
+        if not _is_legal(board, m):
+            raise ValueError("Illegal move : " + san)
+        return m
+
+    if promotion is not None:
+        raise ValueError("Invalid promotion : " + san)
+    candidates = []
+    for start in board.piece_attackers(dest, color, PIECE_TYPES[letter]):
+        row, col = divmod(start, files)
+        if from_file is not None and move.FILE_LETTERS[col] != from_file:
+            continue
+        if from_rank is not None and row != int(from_rank) - 1:
+            continue
+        m = board.get_move(row, col, dest_row, dest_col)
+        if _is_legal(board, m):
+            candidates.append(m)
+    if len(candidates) == 0:
+        raise ValueError("Illegal move : " + san)
+    if len(candidates) > 1:
+        raise ValueError("Ambiguous move : " + san)
+    return candidates[0]
+
+
+def render(board, m):
+    """
+    Write a legal move in SAN, with the check (+) or mate (#) suffix.
+    :param board: The board (a `Board` or a `BitBoard`), before the move
+    :param m: The move, packed in an int (see `pychess.move`)
+    :return: The move in SAN
+    """
+    files = board.shape[1]
+    start, dest = m & move.SQUARE_MASK, m >> move.DEST_SHIFT & move.SQUARE_MASK
+    flags = m >> move.FLAGS_SHIFT & 0xF
+    promotion = m >> move.PROMOTION_SHIFT
+    piece_type = board.type_at(start)
+
+    if flags & move.FLAG_CASTLING:
+        san = "O-O" if dest > start else "O-O-O"
+    elif piece_type == PAWN:
+        san = move.square_name(dest, files)
+        if flags & move.FLAG_CAPTURE:
+            san = move.FILE_LETTERS[start % files] + "x" + san
+        if promotion:
+            san += "=" + LETTERS[promotion]
+    else:
+        san = LETTERS[piece_type]
+        # The other pieces of the same type that can go to the destination
+        row, col = divmod(start, files)
+        others = []
+        for other in board.piece_attackers(dest, board.turn, piece_type):
+            if other != start and _is_legal(board, board.get_move(other // files, other % files, dest // files, dest % files)):
+                others.append(divmod(other, files))
+        if others:
+            if all(other_col != col for _, other_col in others):
+                san += move.FILE_LETTERS[col]
+            elif all(other_row != row for other_row, _ in others):
+                san += str(row + 1)
+            else:
+                san += move.FILE_LETTERS[col] + str(row + 1)
+        if flags & move.FLAG_CAPTURE:
+            san += "x"
+        san += move.square_name(dest, files)
+
+    board.push(m)
+    if board.is_check():
+        san += "#" if len(board.generate_moves()) == 0 else "+"
+    board.pop()
+    return san
+
+
+def push(board, san):
+    """
+    Play a move written in SAN (see `parse`).
+    :return: The move played, packed in an int (see `pychess.move`)
+    """
+    m = parse(board, san)
+    board.push(m)
+    return m
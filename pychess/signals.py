@@ -1,48 +1,71 @@
-from blinker import Signal
+"""
+Events of a board.
+
+Each board has its own `BoardEvents` (`Board.events`), so a move on a board is only delivered to the receivers of this
+board, and a process can host many games without each move being seen by all the boards. The events are `blinker`
+signals :
+
+- a receiver can be connected for one sender only, with `connect(receiver, sender=piece)` : blinker finds the receivers
+  of a sender with a dict lookup, without calling the other ones
+- the receivers are kept with weak references by default, so they are disconnected when they are garbage collected,
+  and as the events are only referenced by the board, nothing keeps a board alive once the game is over
 
-# Pieces
-PIECE_MOVE = Signal("piece.move")
+The board does not depend on the events : the pieces update its state directly (see `Board._on_piece_move`), and only
+send an event when it has receivers, so the moves cost nothing more when nobody listens.
 """
-Emitted after each `Piece.move()`.
+from blinker import Signal
 
-*Args:*
 
-- **sender :** The piece moved.
+class BoardEvents:
+    """
+    Signals of the pieces of a board.
+    """
 
-- **start :** A tuple containing the coordinates (row, col) of the square where the piece was.
+    def __init__(self):
+        # Pieces
+        self.piece_move = Signal("piece.move")
+        """
+        Emitted after each `Piece.move()`, once the piece and the board are updated. For a castling or an en passant
+        capture, it is sent after the piece moved, before the rook moves or the pawn taken is removed.
 
-- **dest :** A tuple containing the coordinates (row, col) of the square where the piece moved.
-"""
+        *Args:*
 
-PIECE_TAKEN = Signal("piece.taken")
-"""
-Emitted when a piece is taken, after each `Piece.on_eat()`.
+        - **sender :** The piece moved.
 
-*Args :*
+        - **start :** A tuple containing the coordinates (row, col) of the square where the piece was.
 
-- **sender :** The piece getting taken.
+        - **dest :** A tuple containing the coordinates (row, col) of the square where the piece moved.
+        """
 
-- **attacker :** The attacking piece.
-"""
+        self.piece_taken = Signal("piece.taken")
+        """
+        Emitted when a piece is taken, at the end of `Piece.on_eat()` : the piece is no longer on the board, and a
+        promoted pawn is a pawn again.
 
-# Pawn promotion
-PAWN_PROMOTION = Signal("pawn.promotion")
-"""
-Emitted when a pawn reached the opposite side of the board and is waiting for a promotion.
+        *Args :*
 
-*Args :*
+        - **sender :** The piece getting taken.
 
-- **sender :** The pawn waiting for the promotion.
-"""
+        - **attacker :** The attacking piece.
+        """
 
-PAWN_PROMOTED = Signal("pawn.promoted")
-"""
-Emitted when a pawn is promoted, after `Pawn.promote()`.
+        # Pawn promotion
+        self.pawn_promotion = Signal("pawn.promotion")
+        """
+        Emitted when a pawn reached the opposite side of the board and is waiting for a promotion.
 
-*Args :*
+        *Args :*
 
-- **sender :** The pawn that got promoted.
+        - **sender :** The pawn waiting for the promotion.
+        """
 
-- **piece_type :** The type of piece the pawn was promoted to.
-"""
+        self.pawn_promoted = Signal("pawn.promoted")
+        """
+        Emitted when a pawn is promoted, after `Pawn.promote()`.
+
+        *Args :*
+
+        - **sender :** The pawn that got promoted.
 
+        - **piece_type :** The type of piece the pawn was promoted to.
+        """
@@ -3,7 +3,6 @@ import pychess.ui
 from pychess.player import Player
 from pychess.board import Board
 import pychess.pieces as pieces
-import pychess.signals as signals
 import re
 
 
@@ -18,11 +17,6 @@ class StandardVariant(Variant):
         self.black = None
         self.board = None
 
-        def handle_pawn_promotion(sender, **kwargs):
-            self.__on_pawn_promotion(sender, **kwargs)
-        self.handle_pawn_protection = handle_pawn_promotion
-        signals.PAWN_PROMOTION.connect(handle_pawn_promotion)
-
     def __on_pawn_promotion(self, sender: pieces.Pawn, **kwargs):
         piece_type = self.ui.promote_dialog(sender)
         sender.promote(piece_type)
@@ -37,6 +31,7 @@ class StandardVariant(Variant):
 
         # Create the board
         self.board = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", white=self.white, black=self.black)
+        self.board.events.pawn_promotion.connect(self.__on_pawn_promotion)
 
     def start(self):
         gameover = False
@@ -246,7 +241,7 @@ class StandardVariant(Variant):
                 self.ui.print("Draw ! (50 moves without capture or pawn move)")
 
             # We check if a position was repeated 3 times
-            pos_hash = str(self.board.__position_hash__())
+            pos_hash = self.board.zobrist
             if positions.get(pos_hash) is None:
                 positions[pos_hash] = 0
             positions[pos_hash] += 1
@@ -0,0 +1,57 @@
+"""
+Zobrist keys of the positions.
+
+The key of a position is the xor of a random 64 bits number for each piece on each square, for the castling rights,
+for the file of the en passant square and for the side to move. As the xor is its own inverse, the key can be updated
+when a move is played instead of being recomputed.
+
+The random numbers are drawn from a generator with a fixed seed, so the keys are the same in every process and can be
+stored (unlike `hash()` of a string, which is salted for each process).
+"""
+import random
+
+SEED = 0x5EED_C4E55
+
+
+class ZobristKeys:
+    """
+    Random numbers used to compute the keys of the positions of a board shape.
+    """
+
+    def __init__(self, shape):
+        self.shape = shape
+        nb_squares = shape[0] * shape[1]
+        rng = random.Random(SEED)
+
+        # Keys of the pieces, indexed by color, type (see `pychess.pieces.Piece.TYPE`) and index of the square
+        self.pieces = tuple(tuple(tuple(rng.getrandbits(64) for _ in range(nb_squares)) for _ in range(7)) for _ in range(2))
+        # Keys of the castling rights, indexed by the bitmask of the rights (see `pychess.board.CASTLING_WHITE_KING`...)
+        rights = tuple(rng.getrandbits(64) for _ in range(4))
+        self.castling = tuple(_xor(rights[i] for i in range(4) if mask >> i & 1) for mask in range(16))
+        # Keys of the en passant square, indexed by its file
+        self.en_passant = tuple(rng.getrandbits(64) for _ in range(shape[1]))
+        # Key of the black player to move
+        self.turn = rng.getrandbits(64)
+
+
+def _xor(keys):
+    result = 0
+    for key in keys:
+        result ^= key
+    return result
+
+
+__KEYS = {}
+
+
+def get_keys(shape):
+    """
+    Get the Zobrist keys for a board shape. The keys are computed once for each shape.
+    :param shape: The shape of the board (ranks, files)
+    :return: The `ZobristKeys` of the shape
+    """
+    keys = __KEYS.get(shape)
+    if keys is None:
+        keys = ZobristKeys(shape)
+        __KEYS[shape] = keys
+    return keys
@@ -1,2 +1,2 @@
 from setuptools import setup, find_packages
-setup(name="pychess", packages=find_packages())
\ No newline at end of file
+setup(name="pychess", packages=find_packages(), package_data={"pychess": ["data/*.json"]}, extras_require={"numpy": ["numpy"]})
\ No newline at end of file
@@ -2,7 +2,6 @@ import types
 
 from pychess.board import Board
 import pychess.pieces as pieces
-import pychess.signals as signals
 
 
 class TestPawnMoves:
@@ -126,12 +125,12 @@ class TestPawnMoves:
         promotion_signals = []
         promoted_signals = []
 
-        @signals.PAWN_PROMOTION.connect
+        @self.board.events.pawn_promotion.connect
         def on_promotion(sender, **kwargs):
             nonlocal promotion_signals
             promotion_signals.append((sender, kwargs))
 
-        @signals.PAWN_PROMOTED.connect
+        @self.board.events.pawn_promoted.connect
         def on_promoted(sender, **kwargs):
             nonlocal promoted_signals
             promoted_signals.append((sender, kwargs))
@@ -160,14 +159,38 @@ class TestPawnMoves:
 
     def test_promote(self):
         """
-        Test if the pawn promotion overrides the movement and the display methods correctly
+        Test if the pawn promotion changes the class of the pawn, and so its movement and display methods
         """
         pawn = self.board.get_cell(6, 0)
         pawn.promote(pieces.Rook)
 
+        assert type(pawn) is pieces.Rook, "The promotion should change the class of the pawn"
         assert pawn.move == types.MethodType(pieces.Rook.move, pawn), "The promotion should override the move method"
         assert pawn.can_move == types.MethodType(pieces.Rook.can_move, pawn), "The promotion should override the can_move method"
         assert pawn.get_possible_moves == types.MethodType(pieces.Rook.get_possible_moves, pawn), "The promotion should override the get_possible_moves method"
         assert pawn.icon == types.MethodType(pieces.Rook.icon, pawn), "The promotion should override the icon method"
         assert pawn.display == types.MethodType(pieces.Rook.display, pawn), "The promotion should override the display method"
         assert pawn.value == pieces.Rook.VALUE, "The promotion should override the value propertie"
+        assert pawn.san == "R", "The promotion should override the SAN letter"
+        assert pawn.TYPE == pieces.ROOK
+        assert not hasattr(pawn, "__dict__"), "The pieces should not have an instance dict"
+
+    def test_promoted_taken(self):
+        """
+        Test if a promoted pawn is a pawn again once taken
+        """
+        board = Board.from_fen("1k6/P7/8/8/8/8/8/4K3 w - - 0 1")
+        pawn = board.get_cell(6, 0)
+        pawn.move(7, 0)
+        pawn.promote(pieces.Rook)
+        board.next_turn()
+        assert board.piece_lists[pawn.color][pieces.ROOK] == [pawn]
+
+        board.get_cell(7, 1).move(7, 0)
+        board.next_turn()
+        assert board.get_cell(7, 0) is board.black.king
+        assert type(pawn) is pieces.Pawn
+        assert pawn.value == pieces.Pawn.VALUE
+        assert board.piece_lists[pawn.color][pieces.ROOK] == []
+        assert board.piece_lists[pawn.color][pieces.PAWN] == []
+        assert board.to_fen() == "k7/8/8/8/8/8/8/4K3 w - - 0 2"
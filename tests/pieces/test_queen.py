@@ -87,3 +87,9 @@ class TestQueenMoves:
         # Black queen on e5
         queen = self.board.get_cell(4, 4)
         assert set(queen.get_possible_moves()) == {(7, 4), (6, 2), (5, 5), (7, 1), (7, 7), (3, 4), (4, 3), (2, 4), (5, 4), (5, 3), (4, 6), (6, 4), (4, 5), (3, 3), (2, 6), (6, 6), (3, 5)}
+
+    def test_diagonal_blocked_far_from_queen(self):
+        board = Board.from_fen("4k3/8/8/8/1p6/Q7/8/4K3 w - - 0 1")
+        queen = board.get_cell(2, 0)
+        assert queen.can_move(3, 1)  # Takes black pawn on b4
+        assert not queen.can_move(5, 3)  # d6, behind black pawn
@@ -0,0 +1,54 @@
+import concurrent.futures
+import time
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+from pychess.engine import analyse, iter_analysis
+from pychess.engine.analysis import MoveAnalysis
+from pychess.engine.search import MATE_SCORE
+import pychess.move as move
+
+
+class TestAnalysis:
+
+    def setup_method(self):
+        self.fen = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+        self.board = Board.from_fen(self.fen)
+
+    def test_mate_in_one(self):
+        results = analyse(self.board, depth=2, workers=2)
+        assert move.to_str(results[0].move) == "a1a8"
+        assert results[0].score == MATE_SCORE - 1
+        assert results[0].pv[0] == results[0].move
+        # Every legal move is analysed, and the board is not changed
+        assert sorted(r.move for r in results) == sorted(self.board.generate_moves())
+        assert self.board.to_fen() == self.fen
+
+    def test_streaming(self):
+        seen = []
+        results = analyse(BitBoard.from_fen(self.fen), depth=1, workers=1, callback=seen.append)
+        assert len(seen) == len(results)
+        assert all(isinstance(r, MoveAnalysis) for r in seen)
+        assert [r.score for r in results] == sorted((r.score for r in seen), reverse=True)
+
+    def test_executor(self):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            first = analyse(self.board, depth=1, executor=executor)
+            second = list(iter_analysis(self.board, depth=1, executor=executor))
+        assert len(first) == len(second) == len(self.board.generate_moves())
+
+    def test_timeout(self):
+        board = BitBoard.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        results = analyse(board, depth=20, timeout=0.5, workers=2)
+        assert 0 < len(results) <= len(board.generate_moves())
+        assert all(r.depth >= 1 for r in results)
+
+    def test_slow_consumer(self):
+        # The searches completed while a result is handled are given, even when the timeout is reached meanwhile
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            list(iter_analysis(self.board, depth=1, executor=executor))
+            results = []
+            for result in iter_analysis(self.board, depth=1, timeout=1.0, executor=executor):
+                if not results:
+                    time.sleep(1.5)
+                results.append(result)
+        assert sorted(r.move for r in results) == sorted(self.board.generate_moves())
@@ -0,0 +1,35 @@
+from pychess.attacks import get_tables
+from pychess.player import COLOR_WHITE, COLOR_BLACK
+
+
+class TestAttackTables:
+
+    def setup_method(self):
+        self.tables = get_tables((8, 8))
+
+    def test_tables_are_cached(self):
+        assert get_tables((8, 8)) is self.tables
+        assert get_tables((10, 8)) is not self.tables
+
+    def test_knight(self):
+        assert set(self.tables.knight[0]) == {(1, 2), (2, 1)}
+        assert len(self.tables.knight[3 * 8 + 3]) == 8
+
+    def test_king(self):
+        assert set(self.tables.king[7]) == {(0, 6), (1, 6), (1, 7)}
+
+    def test_pawn(self):
+        assert set(self.tables.pawn[COLOR_WHITE][1 * 8 + 4]) == {(2, 3), (2, 5)}
+        assert set(self.tables.pawn[COLOR_BLACK][6 * 8 + 0]) == {(5, 1)}
+
+    def test_rays(self):
+        # Rook on a1
+        assert set(self.tables.rook_rays[0]) == {tuple((r, 0) for r in range(1, 8)), tuple((0, c) for c in range(1, 8))}
+        # Bishop on c1
+        assert set(self.tables.bishop_rays[2]) == {((1, 1), (2, 0)), ((1, 3), (2, 4), (3, 5), (4, 6), (5, 7))}
+        assert len(self.tables.queen_rays[3 * 8 + 3]) == 8
+
+    def test_shape(self):
+        tables = get_tables((10, 12))
+        assert len(tables.knight) == 120
+        assert len(tables.rook_rays[0][0]) in (9, 11)
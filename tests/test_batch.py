@@ -0,0 +1,69 @@
+import pytest
+from pychess.bitboard import BitBoard
+from pychess.engine import evaluation
+
+np = pytest.importorskip("numpy")
+batch = pytest.importorskip("pychess.engine.batch")
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 0 1",
+    "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+]
+
+
+class TestBatch:
+
+    def test_tensor(self):
+        tensor = batch.fens_to_tensor(FENS)
+        assert tensor.shape == (4, 12, 8, 8)
+        assert tensor.dtype == np.uint8
+        # White pawns on the 2nd rank, black king on e8
+        assert tensor[0, 0, 1].tolist() == [1] * 8
+        assert tensor[0, 11, 7, 4] == 1
+        assert tensor.sum(axis=(1, 2, 3)).tolist() == [32, 32, 10, 12]
+
+    def test_packed(self):
+        packed = batch.fens_to_tensor(FENS, packed=True)
+        assert packed.shape == (4, 12, 8)
+        assert packed[0, 0, 1] == 0xFF
+        assert (batch.tensor_to_planes(packed) == batch.fens_to_planes(FENS)).all()
+        assert (batch.tensor_to_planes(batch.fens_to_tensor(FENS)) == batch.fens_to_planes(FENS)).all()
+
+    def test_invalid(self):
+        for fen in ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w - - 0 1", "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1",
+                    "rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"):
+            with pytest.raises(ValueError):
+                batch.fens_to_planes(FENS[:1] + [fen])
+
+    def test_same_as_pst(self):
+        scores = batch.evaluate(FENS, with_mobility=False)
+        assert scores.tolist() == [evaluation.pst(BitBoard.from_fen(fen)) for fen in FENS]
+
+    def test_mobility(self):
+        planes = batch.fens_to_planes(FENS)
+        # The rooks : 8 squares for white, 9 for black
+        assert batch.mobility(planes)[0] == 0
+        assert batch.mobility(planes)[2] == (8 - 9) * batch.MOBILITY_WEIGHTS[batch.ROOK]
+
+    def test_inputs(self):
+        turns = batch.fens_to_turns(FENS)
+        assert turns.tolist() == [False, False, True, True]
+        expected = batch.evaluate(FENS).tolist()
+        assert batch.evaluate(batch.fens_to_tensor(FENS), turns).tolist() == expected
+        assert batch.evaluate(batch.fens_to_tensor(FENS, packed=True), turns).tolist() == expected
+        assert batch.evaluate(batch.fens_to_planes(FENS), turns).tolist() == expected
+
+    def test_placement_only(self):
+        placements = [fen.split(" ")[0] for fen in FENS]
+        assert batch.fens_to_turns(placements).tolist() == [False] * 4
+        assert batch.evaluate(placements).tolist() == batch.evaluate(batch.fens_to_planes(FENS)).tolist()
+
+    def test_empty(self):
+        assert batch.fens_to_planes([]).shape == (0, 64)
+        assert batch.fens_to_tensor([]).shape == (0, 12, 8, 8)
+        assert batch.fens_to_tensor([], packed=True).shape == (0, 12, 8)
+        assert batch.fens_to_turns([]).shape == (0,)
+        assert batch.evaluate([]).tolist() == []
+        assert batch.evaluate(batch.fens_to_tensor([]), batch.fens_to_turns([])).tolist() == []
@@ -0,0 +1,82 @@
+import pytest
+from pychess.bitboard import BitBoard
+from pychess.board import Board
+import pychess.move as move
+
+
+class TestBitBoard:
+
+    def test_invalid_fen_raises_exception(self):
+        with pytest.raises(ValueError):
+            BitBoard.from_fen("rnjeijzjeir")
+
+        with pytest.raises(ValueError):
+            BitBoard.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNRP w KQkq - 0 1")
+
+    def test_fen(self):
+        for fen in ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                    "rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b Kq e3 0 3",
+                    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 5 40"):
+            assert BitBoard.from_fen(fen).to_fen() == fen
+
+    def test_get_cell(self):
+        board = BitBoard.from_fen("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+        assert board.get_cell(0, 4) == "K"
+        assert board.get_cell(7, 3) == "q"
+        assert board.get_cell(3, 4) == "P"
+        assert board.get_cell(1, 4) is None
+        assert board.en_passant == (2, 4)
+
+    def test_same_moves_as_board(self):
+        fen = "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1"
+        assert sorted(BitBoard.from_fen(fen).generate_moves()) == sorted(Board.from_fen(fen).generate_moves())
+
+    def test_push_pop(self):
+        fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        board = BitBoard.from_fen(fen)
+
+        board.push(board.get_move(0, 4, 0, 6))
+        assert board.to_fen() == "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R4RK1 b kq - 1 1"
+        board.push(board.get_move(3, 1, 2, 2))
+        assert board.get_cell(2, 2) == "p"
+        board.pop()
+        board.pop()
+        assert board.to_fen() == fen
+
+    def test_promotion(self):
+        board = BitBoard.from_fen("8/P6k/8/8/8/8/8/K7 w - - 0 1")
+        board.push(move.encode(6 * 8, 7 * 8, 0, 2))
+        assert board.get_cell(7, 0) == "N"
+        board.pop()
+        assert board.get_cell(6, 0) == "P"
+
+    def test_zobrist(self):
+        fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        board = BitBoard.from_fen(fen)
+        assert board.zobrist == Board.from_fen(fen).zobrist
+        key = board.zobrist
+        for m in board.generate_moves():
+            board.push(m)
+            assert board.zobrist == Board.from_fen(board.to_fen()).zobrist
+            board.pop()
+            assert board.zobrist == key
+
+    def test_see(self):
+        board = BitBoard.from_fen("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1")
+        assert board.see(board.get_move(0, 4, 4, 4)) == 1
+        board = BitBoard.from_fen("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1")
+        assert board.see(board.get_move(2, 3, 4, 4)) == -2
+        assert board.see(board.get_move(2, 3, 4, 4)) == Board.from_fen(board.to_fen()).see(board.get_move(2, 3, 4, 4))
+
+    def test_check(self):
+        board = BitBoard.from_fen("4k3/8/8/8/8/8/8/4R1K1 b - - 0 1")
+        assert board.is_check()
+        assert not board.is_check(1 - board.turn)
+
+    def test_perft(self):
+        board = BitBoard.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        assert board.perft(1) == 48
+        assert board.perft(2) == 2039
+        assert board.perft(3) == 97862
+        assert BitBoard.from_fen("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1").perft(4) == 43238
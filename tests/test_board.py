@@ -1,7 +1,10 @@
+import gc
+import weakref
 import pytest
 from pychess.board import Board
 from pychess.pieces import *
 from pychess.player import Player
+import pychess.move as move
 
 
 class TestBoardFen:
@@ -181,6 +184,29 @@ class TestBoard:
         self.board.add_piece(Rook(self.black), 0, 1)
         assert self.board.is_check(self.white)
 
+    def test_square_attacked(self):
+        board = Board.from_fen("4k3/8/2n5/8/1b3p2/8/8/R3K3 w - - 0 1")
+        assert board.is_square_attacked(3 * 8 + 1, COLOR_BLACK)  # b4 is attacked by the knight
+        assert board.is_square_attacked(2 * 8 + 4, COLOR_BLACK)  # e3 is attacked by the pawn
+        assert not board.is_square_attacked(2 * 8 + 5, COLOR_BLACK)  # f3 is in front of the pawn
+        assert board.is_square_attacked(1 * 8 + 3, COLOR_BLACK)  # d2 is attacked by the bishop
+        assert board.is_square_attacked(7 * 8 + 0, COLOR_WHITE)  # a8 is attacked by the rook
+        assert board.is_square_attacked(6 * 8 + 5, COLOR_BLACK)  # f7 is attacked by the king
+        assert not board.is_square_attacked(0 * 8 + 5, COLOR_BLACK)  # f1
+
+        # The rook is blocked by the king
+        assert not board.is_square_attacked(0 * 8 + 6, COLOR_WHITE)
+
+    def test_see(self):
+        board = Board.from_fen("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1")
+        assert board.see(board.get_move(0, 4, 4, 4)) == 1
+        # The knight takes a pawn defended twice, and the rook and the queen behind it are not enough
+        board = Board.from_fen("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1")
+        assert board.see(board.get_move(2, 3, 4, 4)) == -2
+        # En passant
+        board = Board.from_fen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")
+        assert board.see(board.get_move(4, 4, 5, 3)) == 1
+
     def test_checkmate(self):
         # Black checkmates White with 2 rooks
         board = Board()
@@ -235,6 +261,372 @@ class TestBoard:
         assert board.en_passant is None, "en_passant should be set to None after a take with en passant"
 
 
+class TestBoardPerft:
+
+    def test_perft_initial_position(self):
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        assert board.perft(0) == 1
+        assert board.perft(1) == 20
+        assert board.perft(2) == 400
+
+    def test_perft_castling_and_pins(self):
+        board = Board.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        assert board.perft(1) == 48
+
+    def test_perft_promotions(self):
+        board = Board.from_fen("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1")
+        assert board.perft(1) == 6
+        assert board.perft(2) == 264
+
+    def test_perft_does_not_change_position(self):
+        fen = "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"
+        board = Board.from_fen(fen)
+        assert board.perft(1) == 14
+        assert board.perft(2) == 191
+        assert board.to_fen() == fen
+
+    def test_divide(self):
+        board = Board.from_fen("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1")
+        assert board.divide(1) == {"e2e3": 1, "e2e4": 1, "e1d1": 1, "e1f1": 1, "e1d2": 1, "e1f2": 1}
+        assert sum(board.divide(2).values()) == board.perft(2)
+
+        with pytest.raises(ValueError):
+            board.divide(0)
+
+
+class TestBoardGenerateMoves:
+
+    def test_generate_moves(self):
+        board = Board.from_fen("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1")
+        moves = board.generate_moves()
+        assert {move.to_str(m) for m in moves} == {"e2e3", "e2e4", "e1d1", "e1f1", "e1d2", "e1f2"}
+
+    def test_generate_moves_reuses_list(self):
+        board = Board.from_fen("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1")
+        moves = [1, 2, 3]
+        assert board.generate_moves(moves) is moves
+        assert len(moves) == 6
+
+    def test_generate_moves_color(self):
+        board = Board.from_fen("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1")
+        assert {move.to_str(m) for m in board.generate_moves(color=COLOR_BLACK)} == {"e8d8", "e8f8", "e8d7", "e8e7", "e8f7"}
+
+    def test_generate_moves_flags(self):
+        board = Board.from_fen("r3k3/1P6/8/3pP3/8/8/8/R3K2R w KQq d6 0 1")
+        moves = {move.to_str(m): m for m in board.generate_moves()}
+        assert move.flags(moves["e5d6"]) == move.FLAG_CAPTURE | move.FLAG_EN_PASSANT
+        assert move.flags(moves["e1g1"]) == move.FLAG_CASTLING
+        assert move.flags(moves["e1c1"]) == move.FLAG_CASTLING
+        assert move.promotion(moves["b7b8n"]) == KNIGHT
+        assert move.flags(moves["b7a8q"]) == move.FLAG_CAPTURE
+
+    def test_generate_moves_check(self):
+        # Only the moves removing the check are legal
+        board = Board.from_fen("4k3/8/8/8/8/8/8/R2rK3 w Q - 0 1")
+        assert {move.to_str(m) for m in board.generate_moves()} == {"e1d1", "e1e2", "e1f2", "a1d1"}
+
+    def test_generate_moves_block_check(self):
+        # The bishop on b4 checks the king, the knight and the rook can block or take it
+        board = Board.from_fen("4k3/8/8/3N4/1b6/8/8/2R1K3 w - - 0 1")
+        moves = {move.to_str(m) for m in board.generate_moves()}
+        assert moves == {"e1d1", "e1e2", "e1f1", "e1f2", "c1c3", "d5b4", "d5c3"}
+
+    def test_generate_moves_double_check(self):
+        # Only the king can move
+        board = Board.from_fen("4k3/8/8/8/1b6/8/8/R3K1r1 w - - 0 1")
+        assert {move.to_str(m) for m in board.generate_moves()} == {"e1e2", "e1f2"}
+
+    def test_generate_moves_pin(self):
+        # The rook on e4 can only move along the e file, the bishop on d2 is pinned by the bishop on b4
+        board = Board.from_fen("4r2k/8/8/8/1b2R3/8/3B4/4K3 w - - 0 1")
+        moves = {move.to_str(m) for m in board.generate_moves()}
+        assert {m for m in moves if m.startswith("e4")} == {"e4e2", "e4e3", "e4e5", "e4e6", "e4e7", "e4e8"}
+        assert {m for m in moves if m.startswith("d2")} == {"d2c3", "d2b4"}
+
+
+class TestBoardPushPop:
+
+    def test_push_pop(self):
+        fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        board = Board.from_fen(fen)
+        board.push(board.get_move(1, 4, 3, 4))  # e4
+        assert board.to_fen() == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+        board.push(board.get_move(7, 6, 5, 5))  # Nf6
+        assert board.to_fen() == "rnbqkb1r/pppppppp/5n2/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2"
+
+        assert board.pop() == board.get_move(7, 6, 5, 5)
+        assert board.pop() == board.get_move(1, 4, 3, 4)
+        assert board.to_fen() == fen
+
+    def test_push_pop_capture(self):
+        fen = "4k3/8/8/3p4/4P3/8/8/4K3 w - - 3 10"
+        board = Board.from_fen(fen)
+        pawn = board.get_cell(4, 3)
+        board.push(board.get_move(3, 4, 4, 3))  # exd5
+        assert board.to_fen() == "4k3/8/8/3P4/8/8/8/4K3 b - - 0 10"
+        assert board.white.eaten == [pawn]
+        assert pawn.row is None and pawn.col is None
+
+        board.pop()
+        assert board.to_fen() == fen
+        assert board.white.eaten == []
+        assert board.get_cell(4, 3) == pawn and pawn.row == 4 and pawn.col == 3
+
+    def test_push_pop_en_passant(self):
+        fen = "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1"
+        board = Board.from_fen(fen)
+        board.push(board.get_move(4, 4, 5, 3))  # exd6
+        assert board.to_fen() == "4k3/8/3P4/8/8/8/8/4K3 b - - 0 1"
+        board.pop()
+        assert board.to_fen() == fen
+
+    def test_push_pop_castling(self):
+        fen = "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"
+        board = Board.from_fen(fen)
+        board.push(board.get_move(0, 4, 0, 6))  # White king side
+        board.push(board.get_move(7, 4, 7, 2))  # Black queen side
+        assert board.to_fen() == "2kr3r/8/8/8/8/8/8/R4RK1 w - - 2 2"
+        board.pop()
+        board.pop()
+        assert board.to_fen() == fen
+
+    def test_push_pop_promotion(self):
+        fen = "4k3/1P6/8/8/8/8/8/4K3 w - - 0 1"
+        board = Board.from_fen(fen)
+        pawn = board.get_cell(6, 1)
+        board.push(board.get_move(6, 1, 7, 1))
+        assert board.to_fen() == "1Q2k3/8/8/8/8/8/8/4K3 b - - 0 1"
+        board.pop()
+        board.push(board.get_move(6, 1, 7, 1, Knight))
+        assert board.to_fen() == "1N2k3/8/8/8/8/8/8/4K3 b - - 0 1"
+        board.pop()
+        assert board.to_fen() == fen
+        assert board.get_cell(6, 1) == pawn
+        assert len(board.white.pieces) == 2
+
+    def test_same_state_as_piece_moves(self):
+        # The clocks are the same whether the moves are pushed or played by the pieces
+        start = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        pushed = Board.from_fen(start)
+        played = Board.from_fen(start)
+        for start_row, start_col, dest_row, dest_col in ((1, 4, 3, 4), (7, 6, 5, 5), (0, 6, 2, 5), (5, 5, 3, 4),
+                                                         (0, 1, 2, 2), (6, 3, 5, 3)):
+            pushed.push(pushed.get_move(start_row, start_col, dest_row, dest_col))
+            played.get_cell(start_row, start_col).move(dest_row, dest_col)
+            played.next_turn()
+            assert played.to_fen() == pushed.to_fen()
+            assert played.__state_hash__() == pushed.__state_hash__()
+        assert pushed.to_fen() == "rnbqkb1r/ppp1pppp/3p4/8/4n3/2N2N2/PPPP1PPP/R1BQKB1R w KQkq - 0 4"
+
+    def test_illegal_en_passant(self):
+        # Taking en passant would remove both pawns between the rook and the king
+        board = Board.from_fen("8/8/8/KPp4r/8/8/8/7k w - c6 0 1")
+        assert board.is_illegal_move(board.white, 4, 1, 5, 2)
+        assert not board.get_cell(4, 1).can_move(5, 2)
+
+
+class TestBoardZobrist:
+
+    def test_zobrist_stable(self):
+        # The keys must not change between processes or versions, as they can be stored
+        assert Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1").zobrist == 16303529923290134023
+
+    def test_zobrist_push_pop(self):
+        fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        board = Board.from_fen(fen)
+        key = board.zobrist
+        for m in board.generate_moves():
+            board.push(m)
+            assert board.zobrist == Board.from_fen(board.to_fen()).zobrist
+            assert board.zobrist != key
+            board.pop()
+            assert board.zobrist == key
+
+    def test_zobrist_transposition(self):
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        key = board.zobrist
+        for m in ((0, 6, 2, 5), (7, 6, 5, 5), (2, 5, 0, 6), (5, 5, 7, 6)):
+            board.push(board.get_move(*m))
+        assert board.zobrist == key
+
+        board.push(board.get_move(0, 7, 0, 6))
+        board.push(board.get_move(7, 7, 7, 6))
+        board.push(board.get_move(0, 6, 0, 7))
+        board.push(board.get_move(7, 6, 7, 7))
+        # Same pieces, but the rooks have lost their castling rights
+        assert board.zobrist != key
+
+    def test_zobrist_en_passant(self):
+        # The en passant square only changes the key when a pawn can take
+        assert Board.from_fen("4k3/8/8/8/4P3/8/8/4K3 b - e3 0 1").zobrist == Board.from_fen("4k3/8/8/8/4P3/8/8/4K3 b - - 0 1").zobrist
+        assert Board.from_fen("4k3/8/8/8/3pP3/8/8/4K3 b - e3 0 1").zobrist != Board.from_fen("4k3/8/8/8/3pP3/8/8/4K3 b - - 0 1").zobrist
+
+    def test_zobrist_piece_move(self):
+        board = Board.from_fen("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+        pawn = board.get_cell(6, 1)
+        pawn.move(7, 1)
+        pawn.promote(Rook)
+        board.turn = COLOR_BLACK
+        assert board.zobrist == Board.from_fen("1R2k3/8/8/8/8/8/8/4K3 b - - 0 1").zobrist
+
+
+class TestBoardEvents:
+
+    def setup_method(self):
+        self.board = Board.from_fen("4k3/3p4/8/8/8/8/4P3/4K3 w - - 3 1")
+        self.other = Board.from_fen("4k3/3p4/8/8/8/8/4P3/4K3 w - - 3 1")
+
+    def test_scoped(self):
+        # A move is only seen by the board of the piece
+        self.board.get_cell(1, 4).move(3, 4)
+        assert self.board.en_passant == (2, 4)
+        assert self.other.en_passant is None
+        assert self.other.halfmove_clock == 3
+
+    def test_sender(self):
+        moves = []
+        pawn = self.board.get_cell(1, 4)
+
+        def on_move(sender, **kwargs):
+            moves.append(kwargs["dest"])
+        self.board.events.piece_move.connect(on_move, sender=pawn)
+        self.board.get_cell(0, 4).move(0, 3)
+        pawn.move(2, 4)
+        self.other.get_cell(1, 4).move(3, 4)
+        assert moves == [(2, 4)]
+
+    def test_taken(self):
+        taken = []
+
+        def on_taken(sender, **kwargs):
+            taken.append((sender, kwargs["attacker"]))
+        board = Board.from_fen("4k3/8/8/8/8/2p5/8/1N2K3 w - - 5 1")
+        board.events.piece_taken.connect(on_taken)
+        pawn = board.get_cell(2, 2)
+        knight = board.get_cell(0, 1)
+        knight.move(2, 2)
+        assert taken == [(pawn, knight)]
+        assert board.halfmove_clock == 0
+
+    def test_sent_after_update(self):
+        # The receivers see the board once the piece moved, and the piece taken off the board
+        board = Board.from_fen("4k3/8/8/8/8/2p5/8/1N2K3 w - - 5 1")
+        pawn = board.get_cell(2, 2)
+        knight = board.get_cell(0, 1)
+        seen = []
+
+        def on_move(sender, start, dest):
+            seen.append(("move", board.get_cell(*start), board.get_cell(*dest), (sender.row, sender.col)))
+
+        def on_taken(sender, attacker):
+            seen.append(("taken", sender.row, sender.col, pawn in board.piece_lists[pawn.color][pawn.TYPE]))
+        board.events.piece_move.connect(on_move)
+        board.events.piece_taken.connect(on_taken)
+        knight.move(2, 2)
+        assert seen == [("taken", None, None, False), ("move", None, knight, (2, 2))]
+
+    def test_garbage_collected(self):
+        ref = weakref.ref(self.other)
+        self.other = None
+        gc.collect()
+        assert ref() is None
+        self.board.get_cell(1, 4).move(3, 4)
+        assert self.board.en_passant == (2, 4)
+
+
+class TestBoardMailbox:
+
+    def test_is_valid(self):
+        board = Board(shape=(6, 10))
+        assert board.is_valid(5, 9)
+        assert board.is_valid(0, 7)
+        assert not board.is_valid(6, 0)
+        assert not board.is_valid(0, 10)
+        assert not board.is_valid(-1, 3)
+
+    def test_off_board(self):
+        board = Board(shape=(6, 10))
+        # The knight jumps from the corners land on OFF_BOARD squares
+        for row, col in ((0, 0), (5, 9), (0, 9), (5, 0)):
+            index = board.mailbox_index(row, col)
+            assert board.mailbox[index] is None
+            for dr, dc in ((1, 2), (2, 1), (-1, -2), (-2, -1), (1, -2), (-1, 2), (2, -1), (-2, 1)):
+                if not board.is_valid(row + dr, col + dc):
+                    assert board.mailbox[index + dr * board.mailbox_stride + dc] is OFF_BOARD
+
+    def test_push_pop(self):
+        board = Board.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        for m in board.generate_moves():
+            board.push(m)
+            for reply in board.generate_moves():
+                board.push(reply)
+                for row in range(8):
+                    for col in range(8):
+                        assert board.mailbox[board.mailbox_index(row, col)] is board.ranks[row][col]
+                board.pop()
+            board.pop()
+        assert all(board.mailbox[board.mailbox_index(row, col)] is board.ranks[row][col] for row in range(8) for col in range(8))
+
+    def test_path_clear(self):
+        board = Board.from_fen("4k3/8/8/8/8/8/8/R1N1K3 w - - 0 1")
+        assert board.is_path_clear(0, 0, 7, 0)
+        assert board.is_path_clear(0, 0, 7, 7)
+        assert board.is_path_clear(0, 0, 0, 2)
+        assert not board.is_path_clear(0, 0, 0, 3)
+        rook = board.get_cell(0, 0)
+        assert rook.can_move(0, 1)
+        assert not rook.can_move(0, 3)
+        assert set(rook.get_possible_moves()) == {(0, 1)} | {(row, 0) for row in range(1, 8)}
+
+
+class TestBoardPieceLists:
+
+    def assert_lists(self, board):
+        on_board = [piece for rank in board.ranks for piece in rank if piece is not None]
+        listed = [piece for color in (COLOR_WHITE, COLOR_BLACK) for piece_list in board.piece_lists[color] for piece in piece_list]
+        assert len(listed) == len(on_board) and set(listed) == set(on_board)
+        for color in (COLOR_WHITE, COLOR_BLACK):
+            for piece_type, piece_list in enumerate(board.piece_lists[color]):
+                assert all(piece.TYPE == piece_type and piece.color == color for piece in piece_list)
+
+    def test_push_pop(self):
+        board = Board.from_fen("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1")
+        self.assert_lists(board)
+        for m in board.generate_moves():
+            board.push(m)
+            self.assert_lists(board)
+            for reply in board.generate_moves():
+                board.push(reply)
+                self.assert_lists(board)
+                board.pop()
+            board.pop()
+        self.assert_lists(board)
+
+    def test_capture_promotion(self):
+        board = Board.from_fen("r3k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+        board.push(board.get_move(6, 1, 7, 0, Queen))
+        assert board.piece_lists[COLOR_BLACK][ROOK] == []
+        assert board.piece_lists[COLOR_WHITE][PAWN] == []
+        assert len(board.piece_lists[COLOR_WHITE][QUEEN]) == 1
+        assert board.material(COLOR_WHITE) == Queen.VALUE
+        board.pop()
+        assert len(board.piece_lists[COLOR_BLACK][ROOK]) == 1
+        assert board.material(COLOR_WHITE) == Pawn.VALUE
+        self.assert_lists(board)
+
+    def test_piece_move(self):
+        board = Board.from_fen("4k3/1P6/8/8/8/2p5/8/1N2K3 w - - 0 1")
+        board.get_cell(0, 1).move(2, 2)
+        assert board.piece_lists[COLOR_BLACK][PAWN] == []
+        pawn = board.get_cell(6, 1)
+        pawn.move(7, 1)
+        pawn.promote(Rook)
+        assert board.piece_lists[COLOR_WHITE][ROOK] == [pawn]
+        self.assert_lists(board)
+        board.remove_piece(7, 1)
+        self.assert_lists(board)
+
+
 class TestBoardDisplay:
     # Todo: test display methods
     pass
@@ -0,0 +1,80 @@
+import pytest
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+from pychess.database import DatabaseBuilder, PositionDatabase
+from pychess.replay import START_FEN
+import pychess.san as san
+
+GAMES = """[Event "1"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+
+[Event "2"]
+[Result "1/2-1/2"]
+
+1. e4 c5 2. Nf3 1/2-1/2
+
+[Event "3"]
+[Result "0-1"]
+
+1. d4 d5 0-1
+
+"""
+
+
+class TestDatabase:
+
+    def setup_method(self):
+        self.builder = DatabaseBuilder()
+
+    def build(self, tmp_path):
+        path = str(tmp_path / "positions.db")
+        self.builder.write(path)
+        return PositionDatabase(path)
+
+    def test_pgn(self, tmp_path):
+        pgn = tmp_path / "games.pgn"
+        pgn.write_text(GAMES)
+        stats = self.builder.add_pgn(str(pgn), workers=1)
+        assert stats.games == 3
+        with self.build(tmp_path) as db:
+            # The positions before each move, the starting one being in the 3 games and the one after 1. e4 in 2 games
+            assert len(db) == 7 + 3 + 2 - 3
+            start = db.lookup(Board.from_fen(START_FEN))
+            assert (start.games, start.white_wins, start.draws, start.black_wins) == (3, 1, 1, 1)
+            board = BitBoard.from_fen(START_FEN)
+            assert start.best_move == san.parse(board, "e4")
+            assert start.best_move_games == 2
+            assert start.to_board().to_fen() == START_FEN
+
+            san.push(board, "e4")
+            stats = db.lookup(board)
+            assert stats.games == 2
+            assert stats.best_move in (san.parse(board, "e5"), san.parse(board, "c5"))
+            assert board in db
+
+            san.push(board, "a5")
+            assert db.lookup(board) is None
+            assert board not in db
+            assert sorted(stats.key for stats in db) == [stats.key for stats in db]
+
+    def test_fens(self, tmp_path):
+        fen = "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"
+        self.builder.add_fens([fen + " 1-0\n", "\n", fen.replace("0 1", "12 40")])
+        with self.build(tmp_path) as db:
+            assert len(db) == 1
+            stats = db.lookup(BitBoard.from_fen(fen))
+            assert (stats.games, stats.white_wins, stats.best_move) == (2, 1, 0)
+            assert db.get(stats.key ^ 1) is None
+
+    def test_empty(self, tmp_path):
+        with self.build(tmp_path) as db:
+            assert len(db) == 0
+            assert db.lookup(Board()) is None
+
+    def test_invalid(self, tmp_path):
+        path = tmp_path / "invalid.db"
+        path.write_bytes(b"x" * 100)
+        with pytest.raises(ValueError):
+            PositionDatabase(str(path))
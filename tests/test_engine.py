@@ -0,0 +1,90 @@
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+from pychess.engine import Engine, evaluation
+from pychess.engine.search import MATE_SCORE
+import pychess.move as move
+
+
+class TestEngine:
+
+    def setup_method(self):
+        self.engine = Engine()
+
+    def test_material(self):
+        board = Board.from_fen("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+        assert evaluation.material(board) == 500
+        board = Board.from_fen("4k3/8/8/8/8/8/8/R3K3 b - - 0 1")
+        assert evaluation.material(board) == -500
+
+    def test_mate_in_one(self):
+        for cls in (Board, BitBoard):
+            board = cls.from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+            result = self.engine.search(board, depth=3)
+            assert move.to_str(result.move) == "a1a8"
+            assert result.score == MATE_SCORE - 1
+            assert result.is_mate
+
+    def test_mate_in_two(self):
+        board = Board.from_fen("k7/8/2K5/8/8/8/8/7R w - - 0 1")
+        result = self.engine.search(board, depth=4)
+        assert result.score == MATE_SCORE - 3
+        assert len(result.pv) == 3
+
+    def test_win_material(self):
+        # The queen is not defended
+        board = Board.from_fen("4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1")
+        result = self.engine.search(board, depth=2)
+        assert move.to_str(result.move) == "d2d5"
+        assert result.pv[0] == result.move
+
+    def test_quiescence(self):
+        # Taking the pawn loses the queen, which is only seen after the end of the depth searched
+        self.engine = Engine(evaluate=evaluation.material)
+        board = Board.from_fen("4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1")
+        result = self.engine.search(board, depth=1)
+        assert move.to_str(result.move) != "d1d5"
+        assert result.score == 700
+
+        # The pawn is not defended
+        board = Board.from_fen("4k3/8/8/3p4/8/8/8/3RK3 w - - 0 1")
+        result = self.engine.search(board, depth=1)
+        assert move.to_str(result.move) == "d1d5"
+        assert result.score == 500
+
+    def test_board_unchanged(self):
+        fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        board = Board.from_fen(fen)
+        self.engine.search(board, depth=2)
+        assert board.to_fen() == fen
+        self.engine.search(board, nodes=300)
+        assert board.to_fen() == fen
+
+    def test_node_limit(self):
+        board = Board.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        result = self.engine.search(board, nodes=3000)
+        assert result.move is not None
+        assert result.depth >= 1
+        assert result.nodes <= 3000
+
+    def test_depths(self):
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        depths = []
+        result = self.engine.search(board, depth=3, callback=lambda r: depths.append(r.depth))
+        assert depths == [1, 2, 3]
+        assert result.depth == 3
+        assert result.nps > 0
+
+    def test_no_legal_move(self):
+        result = self.engine.search(Board.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"), depth=2)
+        assert result.move is None
+        assert result.score == 0
+        result = self.engine.search(Board.from_fen("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1"), depth=2)
+        assert result.move is None
+        assert result.score == -MATE_SCORE
+
+    def test_transposition_table(self):
+        fen = "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"
+        without = Engine(hash_size=0).search(BitBoard.from_fen(fen), depth=3)
+        result = Engine(hash_size=1).search(BitBoard.from_fen(fen), depth=3)
+        assert result.score == without.score
+        assert result.nodes < without.nodes
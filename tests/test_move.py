@@ -0,0 +1,36 @@
+import pychess.move as move
+from pychess.pieces import QUEEN, KNIGHT
+
+
+class TestMove:
+
+    def test_encode_decode(self):
+        m = move.encode(12, 28, move.FLAG_DOUBLE_PUSH)
+        assert move.start_square(m) == 12
+        assert move.dest_square(m) == 28
+        assert move.flags(m) == move.FLAG_DOUBLE_PUSH
+        assert move.promotion(m) == 0
+        assert not move.is_capture(m)
+
+    def test_encode_decode_promotion(self):
+        m = move.encode(49, 56, move.FLAG_CAPTURE, QUEEN)
+        assert move.start_square(m) == 49
+        assert move.dest_square(m) == 56
+        assert move.is_capture(m)
+        assert move.promotion(m) == QUEEN
+
+    def test_large_board(self):
+        m = move.encode(4000, 4095, move.FLAG_CASTLING, KNIGHT)
+        assert move.start_square(m) == 4000
+        assert move.dest_square(m) == 4095
+        assert move.flags(m) == move.FLAG_CASTLING
+        assert move.promotion(m) == KNIGHT
+
+    def test_to_str(self):
+        assert move.to_str(move.encode(12, 28)) == "e2e4"
+        assert move.to_str(move.encode(52, 60, 0, QUEEN)) == "e7e8q"
+        assert move.to_str(move.encode(11, 21), files=10) == "b2b3"
+
+    def test_square_name(self):
+        assert move.square_name(0) == "a1"
+        assert move.square_name(63) == "h8"
@@ -0,0 +1,55 @@
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+from pychess.engine import Engine
+from pychess.engine.ordering import MoveOrdering, mvv_lva
+import pychess.move as move
+
+
+class TestMoveOrdering:
+
+    def setup_method(self):
+        # The white queen can take a defended rook, the knight an undefended pawn and the pawn a knight
+        self.board = Board.from_fen("4k3/1p6/2r2n2/1p2P3/8/N7/8/2Q1K3 w - - 0 1")
+        self.ordering = MoveOrdering(8)
+        self.ordering.new_search(self.board)
+
+    def order(self, hash_move=0, ply=0):
+        moves = self.board.generate_moves()
+        self.ordering.order(self.board, moves, ply, hash_move)
+        return [move.to_str(m) for m in moves]
+
+    def test_mvv_lva(self):
+        assert mvv_lva(self.board, self.board.get_move(0, 2, 5, 2)) == 5 * 16 - 9
+        assert mvv_lva(self.board, self.board.get_move(4, 4, 5, 5)) == 3 * 16 - 1
+        assert mvv_lva(self.board, self.board.get_move(2, 0, 4, 1)) == 1 * 16 - 3
+
+    def test_captures_first(self):
+        moves = self.order()
+        assert moves[:2] == ["e5f6", "a3b5"]
+        # Taking the defended rook with the queen loses material
+        assert moves[-1] == "c1c6"
+
+    def test_hash_move_first(self):
+        hash_move = self.board.get_move(0, 4, 0, 5)
+        assert self.order(hash_move)[0] == "e1f1"
+
+    def test_killers(self):
+        killer = self.board.get_move(0, 4, 1, 4)
+        self.ordering.cutoff(self.board, killer, 3, 2)
+        assert self.order(ply=2)[2] == "e1e2"
+        # The killers are only used at the same ply, but the history is kept
+        assert self.order(ply=1)[2] == "e1e2"
+        self.ordering.new_search(self.board)
+        assert self.ordering.killers[2] == [0, 0]
+
+    def test_captures_not_killers(self):
+        self.ordering.cutoff(self.board, self.board.get_move(4, 4, 5, 5), 3, 2)
+        assert self.ordering.killers[2] == [0, 0]
+
+    def test_fewer_nodes(self):
+        fen = "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"
+        without = Engine(ordering=False).search(BitBoard.from_fen(fen), depth=3)
+        result = Engine().search(BitBoard.from_fen(fen), depth=3)
+        assert result.score == without.score
+        assert result.nodes < without.nodes
+        assert result.cutoff_rate > without.cutoff_rate
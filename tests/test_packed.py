@@ -0,0 +1,63 @@
+import pytest
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+import pychess.packed as packed
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b Kq e3 0 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 12 40",
+    "4k3/8/8/8/8/8/8/4K3 b - - 99 300",
+]
+
+
+class TestPacked:
+
+    def test_size(self):
+        for fen in FENS:
+            assert len(BitBoard.from_fen(fen).to_bytes()) == packed.RECORD_SIZE
+
+    def test_bitboard(self):
+        for fen in FENS:
+            board = BitBoard.from_fen(fen)
+            decoded = BitBoard.from_bytes(board.to_bytes())
+            assert decoded.to_fen() == fen
+            assert decoded.zobrist == board.zobrist
+            assert decoded.midgame_score == board.midgame_score
+
+    def test_board(self):
+        for fen in FENS:
+            board = Board.from_fen(fen)
+            data = board.to_bytes()
+            assert data == BitBoard.from_fen(fen).to_bytes()
+            assert Board.from_bytes(data).to_fen() == fen
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            packed.unpack(b"\0" * 31)
+        with pytest.raises(ValueError):
+            Board(shape=(10, 8)).to_bytes()
+        with pytest.raises(ValueError):
+            packed.pack([1] * 33 + [0] * 31, 0, 0, None, 0, 1)
+
+    def test_capped_counters(self):
+        # The counters too large for their field are saturated
+        for backend in (Board, BitBoard):
+            board = backend.from_fen("4k3/8/8/8/8/8/8/4K3 w - - 300 70000")
+            assert backend.from_bytes(board.to_bytes()).to_fen() == "4k3/8/8/8/8/8/8/4K3 w - - 255 65535"
+
+    def test_decode_array(self):
+        np = pytest.importorskip("numpy")
+        batch = pytest.importorskip("pychess.engine.batch")
+        buffer = b"".join(BitBoard.from_fen(fen).to_bytes() for fen in FENS)
+        arrays = packed.decode_array(buffer)
+        for i, fen in enumerate(FENS):
+            codes, castling, turn, ep_square, halfmove_clock, fullmove_nb = packed.unpack(buffer[i * 32:(i + 1) * 32])
+            assert arrays["codes"][i].tolist() == codes
+            assert arrays["castling"][i] == castling
+            assert arrays["turn"][i] == turn
+            assert arrays["ep_square"][i] == (packed.NO_EN_PASSANT if ep_square is None else ep_square)
+            assert arrays["halfmove_clock"][i] == halfmove_clock
+            assert arrays["fullmove_nb"][i] == fullmove_nb
+        assert np.array_equal(arrays["planes"], batch.fens_to_planes(FENS))
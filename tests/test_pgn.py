@@ -0,0 +1,93 @@
+import io
+import mmap
+from pychess.pgn import read_games, Game
+
+PGN = """[Event "Test 1"]
+[White "Alice"]
+[Black "Bob"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 {A comment
+[on two lines]} Nc6 (2... d6 3. d4) 3. Bb5 $1 a6?! 4. Ba4 1-0
+
+[Event "Test 2"]
+[White "Carol \\"C\\""]
+[Black "Dan"]
+[Result "1/2-1/2"]
+
+1.d4 d5 ; The rest of the line is a comment
+2.c4 1/2-1/2
+[Event "Test 3"]
+[White "Eve"]
+
+1. e4 *
+"""
+
+
+class TestPGN:
+
+    def test_read(self):
+        games = list(read_games(io.StringIO(PGN)))
+        assert len(games) == 3
+        assert games[0].headers == {"Event": "Test 1", "White": "Alice", "Black": "Bob", "Result": "1-0"}
+        assert games[0].moves == ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "Ba4"]
+        assert games[0].result == "1-0"
+        assert games[1].headers["White"] == 'Carol "C"'
+        assert games[1].moves == ["d4", "d5", "c4"]
+        # No Result tag : the result is read in the movetext
+        assert games[2].result == "*"
+        assert games[2].moves == ["e4"]
+
+    def test_lazy_moves(self):
+        game = next(read_games(io.StringIO(PGN)))
+        assert game._moves is None
+        assert len(game.moves) == 7
+        assert game._moves is not None
+
+    def test_filter(self):
+        seen = []
+
+        def white_alice(headers):
+            seen.append(headers["Event"])
+            return headers.get("White") == "Alice"
+
+        games = list(read_games(io.StringIO(PGN), header_filter=white_alice))
+        assert [game.headers["Event"] for game in games] == ["Test 1"]
+        assert seen == ["Test 1", "Test 2", "Test 3"]
+
+    def test_binary_and_mmap(self, tmp_path):
+        data = PGN.encode("utf-8")
+        assert [g.moves for g in read_games(io.BytesIO(data))] == [g.moves for g in read_games(io.StringIO(PGN))]
+        path = tmp_path / "games.pgn"
+        path.write_bytes(data)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            games = list(read_games(mm))
+        assert [game.headers["Event"] for game in games] == ["Test 1", "Test 2", "Test 3"]
+
+    def test_streaming(self):
+        # The games are given before the end of the file is read
+        f = io.StringIO(PGN * 1000)
+        games = read_games(f)
+        next(games)
+        assert f.tell() < len(PGN)
+
+    def test_headers_only(self):
+        games = list(read_games(io.StringIO('[Event "A"]\n[Event "B"]\n\n1. e4 *\n')))
+        assert [game.headers for game in games] == [{"Event": "A"}, {"Event": "B"}]
+        assert games[0].moves == []
+        assert isinstance(games[1], Game)
+
+    def test_stray_brace_in_comments(self):
+        # The comments do not nest, and a "{" in a ";" comment does not open a comment
+        pgn = ('[Event "1"]\n\n1. e4 { see {x } e5 1-0\n\n'
+               '[Event "2"]\n\n1. d4 {\n[not a tag]} d5 0-1\n\n'
+               '[Event "3"]\n\n1. c4 ; odd { here\ne5 *\n\n'
+               '[Event "4"]\n\n1. Nf3 *\n')
+        games = list(read_games(io.StringIO(pgn)))
+        assert [game.headers["Event"] for game in games] == ["1", "2", "3", "4"]
+        assert [game.moves for game in games] == [["e4", "e5"], ["d4", "d5"], ["c4", "e5"], ["Nf3"]]
+
+    def test_en_passant_annotation(self):
+        game = next(read_games(io.StringIO('[Event "A"]\n\n1. e4 d5 2. e5 f5 3. exf6 e.p. gxf6 4. d4 e.p.! *\n')))
+        assert game.moves == ["e4", "d5", "e5", "f5", "exf6", "gxf6", "d4"]
+        assert game.result == "*"
@@ -0,0 +1,29 @@
+from pychess.board import Board
+
+
+class TestPlayerMoves:
+
+    def test_can_move(self):
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        assert board.white.can_move()
+        assert board.black.can_move()
+
+    def test_cannot_move(self):
+        # White is pat, black is checkmated
+        board = Board.from_fen("8/8/8/8/8/1q6/2k5/K7 w - - 0 1")
+        assert not board.white.can_move()
+        board = Board.from_fen("k6R/8/1K6/8/8/8/8/8 b - - 0 1")
+        assert not board.black.can_move()
+
+    def test_possible_moves(self):
+        board = Board.from_fen("4k3/P7/8/8/8/8/8/4K2R w K - 0 1")
+        poss = board.white.possible_moves()
+        assert set(poss.keys()) == set(board.white.pieces)
+        assert poss[board.get_cell(6, 0)] == [(7, 0)]
+        assert set(poss[board.white.king]) == {(0, 3), (1, 3), (1, 4), (1, 5), (0, 5), (0, 6)}
+
+    def test_possible_moves_ignores_taken_pieces(self):
+        board = Board.from_fen("4k3/8/8/8/8/8/3p4/4K3 w - - 0 1")
+        pawn = board.get_cell(1, 3)
+        board.push(board.get_move(0, 4, 1, 3))
+        assert board.black.possible_moves()[pawn] == []
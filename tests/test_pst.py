@@ -0,0 +1,88 @@
+import json
+import pytest
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+from pychess.engine import evaluation
+import pychess.pieces as pieces
+import pychess.pst as pst
+
+
+def full_scores(board):
+    """Compute the piece-square scores of a board from all its squares"""
+    tables = board.pst
+    midgame = endgame = phase = 0
+    for square in range(64):
+        piece_type = board.type_at(square)
+        if piece_type:
+            san = board.get_cell(square // 8, square % 8)
+            color = (0 if san.isupper() else 1) if isinstance(san, str) else san.color
+            midgame += tables.midgame[color][piece_type][square]
+            endgame += tables.endgame[color][piece_type][square]
+            phase += tables.phase[piece_type]
+    return midgame, endgame, phase
+
+
+class TestPieceSquareTables:
+
+    def setup_method(self):
+        self.tables = pst.get_tables((8, 8))
+
+    def test_symmetry(self):
+        # e2 for white is e7 for black
+        assert self.tables.midgame[0][pst.PAWN][12] == -self.tables.midgame[1][pst.PAWN][52]
+        assert self.tables.endgame[0][pst.KING][0] == -self.tables.endgame[1][pst.KING][56]
+        assert self.tables.max_phase == 24
+
+    def test_start_position(self):
+        for cls in (Board, BitBoard):
+            board = cls.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+            assert (board.midgame_score, board.endgame_score, board.phase) == (0, 0, 24)
+            assert evaluation.pst(board) == 0
+
+    def test_taper(self):
+        assert self.tables.taper(100, 50, 24) == 100
+        assert self.tables.taper(100, 50, 0) == 50
+        assert self.tables.taper(100, 50, 12) == 75
+
+    @pytest.mark.parametrize("cls", (Board, BitBoard))
+    @pytest.mark.parametrize("fen", (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    ))
+    def test_incremental(self, cls, fen):
+        board = cls.from_fen(fen)
+        start = full_scores(board)
+        for m in board.generate_moves():
+            board.push(m)
+            assert (board.midgame_score, board.endgame_score, board.phase) == full_scores(board)
+            for reply in board.generate_moves():
+                board.push(reply)
+                assert (board.midgame_score, board.endgame_score, board.phase) == full_scores(board)
+                board.pop()
+            board.pop()
+        assert (board.midgame_score, board.endgame_score, board.phase) == start
+
+    def test_piece_moves(self):
+        # The moves played with the pieces (captures, promotions) update the scores through set_cell
+        board = Board.from_fen("2n1k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+        pawn = board.get_cell(6, 1)
+        pawn.move(7, 2)
+        assert board.get_cell(7, 2) is pawn
+        assert (board.midgame_score, board.endgame_score, board.phase) == full_scores(board)
+        pawn.promote(pieces.Queen)
+        assert (board.midgame_score, board.endgame_score, board.phase) == full_scores(board)
+        assert board.phase == 4
+
+    def test_load(self, tmp_path):
+        with open(pst.DEFAULT_PATH) as f:
+            data = json.load(f)
+        data["midgame"]["values"]["knight"] = 1000
+        path = tmp_path / "pst.json"
+        path.write_text(json.dumps(data))
+        tables = pst.load(path)
+        board = Board.from_fen("4k3/8/8/8/8/8/8/1N2K3 w - - 0 1")
+        before = board.midgame_score
+        board.set_pst(tables)
+        assert board.midgame_score == before + 1000 - 320
+        assert board.pst is tables
@@ -0,0 +1,74 @@
+import concurrent.futures
+from pychess.replay import replay, split_pgn, to_bytes, START_FEN
+from pychess.bitboard import BitBoard
+import pychess.move as move
+
+GAME = """[Event "Game {}"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+
+"""
+
+INVALID = """[Event "Invalid"]
+[Result "0-1"]
+
+1. e4 e5 2. Ke3 0-1
+
+"""
+
+
+class TestReplay:
+
+    def setup_method(self):
+        self.records = []
+
+    def write(self, tmp_path, text):
+        path = tmp_path / "games.pgn"
+        path.write_text(text)
+        return str(path)
+
+    def test_split(self, tmp_path):
+        text = "".join(GAME.format(i) for i in range(50))
+        path = self.write(tmp_path, text)
+        ranges = split_pgn(path, chunk_size=500)
+        assert len(ranges) > 1
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == len(text)
+        for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+            assert end == next_start
+        for start, _ in ranges:
+            assert text[start] == "["
+
+    def test_replay(self, tmp_path):
+        path = self.write(tmp_path, "".join(GAME.format(i) for i in range(20)) + INVALID)
+        stats = replay(path, self.records.extend, workers=1, chunk_size=300)
+        assert stats.games == 21
+        assert stats.errors == 1
+        # 7 moves in each game, and 2 moves before the invalid one
+        assert stats.positions == len(self.records) == 20 * 7 + 2
+        fen, m, result = self.records[0]
+        assert fen == START_FEN
+        assert move.to_str(m) in ("e2e4", "e7e5")
+        assert sorted(set(r for _, _, r in self.records)) == ["0-1", "1-0"]
+        assert stats.games_per_second > 0
+        assert "21 games" in str(stats)
+
+    def test_executor(self, tmp_path):
+        path = self.write(tmp_path, "".join(GAME.format(i) for i in range(5)))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            stats = replay(path, self.records.extend, executor=executor, chunk_size=100)
+        assert stats.games == 5
+        assert stats.workers == 2
+        assert len(self.records) == 35
+
+    def test_bytes(self, tmp_path):
+        path = self.write(tmp_path, GAME.format(0))
+        replay(path, self.records.extend, workers=1, encode=to_bytes)
+        assert len(self.records) == 7
+        assert BitBoard.from_bytes(self.records[0][0]).to_fen() == START_FEN
+
+    def test_empty(self, tmp_path):
+        path = self.write(tmp_path, "")
+        assert split_pgn(path) == []
+        assert replay(path, self.records.extend, workers=1).games == 0
@@ -0,0 +1,67 @@
+import pytest
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+from pychess import san
+import pychess.move as move
+
+
+@pytest.mark.parametrize("cls", (Board, BitBoard))
+class TestSAN:
+
+    def test_parse(self, cls):
+        board = cls.from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+        assert move.to_str(san.parse(board, "Nxg6")) == "e5g6"
+        assert move.to_str(san.parse(board, "O-O-O")) == "e1c1"
+        assert move.to_str(san.parse(board, "0-0")) == "e1g1"
+        assert move.to_str(san.parse(board, "a4")) == "a2a4"
+        assert move.to_str(san.parse(board, "dxe6!?")) == "d5e6"
+        # Only the knight on e5 can go to d3
+        assert move.to_str(san.parse(board, "Nd3")) == "e5d3"
+
+    def test_disambiguation(self, cls):
+        board = cls.from_fen("r3k3/8/8/8/8/8/1N2KN2/R6R w - - 0 1")
+        assert move.to_str(san.parse(board, "Nbd3")) == "b2d3"
+        assert move.to_str(san.parse(board, "Rhf1")) == "h1f1"
+        with pytest.raises(ValueError):
+            san.parse(board, "Nd3")
+        assert san.render(board, board.get_move(1, 1, 2, 3)) == "Nbd3"
+        assert san.render(board, board.get_move(0, 7, 0, 5)) == "Rhf1"
+
+    def test_pinned_not_ambiguous(self, cls):
+        # The knight on e2 is pinned, so Nc3 is not ambiguous
+        board = cls.from_fen("4r1k1/8/8/8/8/8/4N3/1N2K3 w - - 0 1")
+        assert san.render(board, board.get_move(0, 1, 2, 2)) == "Nc3"
+        assert move.to_str(san.parse(board, "Nc3")) == "b1c3"
+
+    def test_en_passant_and_promotion(self, cls):
+        board = cls.from_fen("4k3/1P6/8/3pP3/8/8/8/4K3 w - d6 0 1")
+        m = san.parse(board, "exd6 e.p.")
+        assert m >> move.FLAGS_SHIFT & move.FLAG_EN_PASSANT
+        assert san.render(board, m) == "exd6"
+        m = san.parse(board, "b8=Q+")
+        assert move.to_str(m) == "b7b8q"
+        assert san.render(board, m) == "b8=Q+"
+        assert move.to_str(san.parse(board, "b8N")) == "b7b8n"
+        with pytest.raises(ValueError):
+            san.parse(board, "b8")
+
+    def test_checkmate(self, cls):
+        board = cls.from_fen("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1")
+        assert san.render(board, board.get_move(0, 0, 7, 0)) == "Ra8#"
+
+    def test_invalid(self, cls):
+        board = cls.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        for text in ("e5", "Nf4", "Ke2", "O-O", "exd3", "Zz9", "Nf3x", "e9"):
+            with pytest.raises(ValueError):
+                san.parse(board, text)
+
+    def test_round_trip(self, cls):
+        board = cls.from_fen("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1")
+        for m in board.generate_moves():
+            assert san.parse(board, san.render(board, m)) == m
+
+    def test_push(self, cls):
+        board = cls.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        for text in ("e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "O-O"):
+            san.push(board, text)
+        assert board.to_fen() == "r1bqkbnr/1ppp1ppp/p1n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 1 4"
@@ -0,0 +1,28 @@
+from pychess.board import Board
+from pychess.bitboard import BitBoard
+from pychess.engine import Engine, parallel_search
+import pychess.move as move
+
+
+class TestParallelSearch:
+
+    def test_mate_in_one(self):
+        result = parallel_search("6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", workers=2, depth=3, hash_size=1)
+        assert move.to_str(result.move) == "a1a8"
+        assert result.is_mate
+
+    def test_same_result(self):
+        fen = "4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1"
+        board = Board.from_fen(fen)
+        result = parallel_search(board, workers=2, depth=3, hash_size=1)
+        expected = Engine().search(BitBoard.from_fen(fen), depth=3)
+        assert result.score == expected.score
+        assert result.depth == 3
+        assert result.nodes > 0
+        # The board is not sent to the workers, and is not changed
+        assert board.to_fen() == fen
+
+    def test_time_limit(self):
+        result = parallel_search("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", workers=2, time=0.5, hash_size=1)
+        assert result.move is not None
+        assert result.time < 5
@@ -0,0 +1,101 @@
+import pytest
+from multiprocessing import shared_memory
+from pychess.engine.tt import TranspositionTable, table_size, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+
+
+class TestTranspositionTable:
+
+    def setup_method(self):
+        self.tt = TranspositionTable(1)
+
+    def test_size(self):
+        assert self.tt.size == 1024 * 1024
+        assert self.tt.nb_entries == 65536
+        assert TranspositionTable(3).size == 2 * 1024 * 1024
+
+    def test_store_probe(self):
+        assert self.tt.probe(12345) is None
+        self.tt.store(12345, 0x1234, -250, 6, BOUND_LOWER)
+        assert self.tt.probe(12345) == (0x1234, -250, 6, BOUND_LOWER)
+        assert self.tt.probe(12345 + self.tt.nb_entries) is None
+        assert self.tt.hits == 1
+        assert self.tt.probes == 3
+
+    def test_full_key(self):
+        key = (1 << 64) - 1
+        self.tt.store(key, 0, 99990, 63, BOUND_EXACT)
+        assert self.tt.probe(key) == (0, 99990, 63, BOUND_EXACT)
+
+    def test_depth_preferred(self):
+        # Same bucket, different keys
+        key_1 = 5
+        key_2 = 5 + (1 << 40)
+        key_3 = 5 + (2 << 40)
+        self.tt.store(key_1, 1, 10, 8, BOUND_EXACT)
+        self.tt.store(key_2, 2, 20, 2, BOUND_EXACT)
+        assert self.tt.probe(key_1) is not None
+        assert self.tt.probe(key_2) is not None
+
+        # The shallow entry is replaced, the deep one is kept
+        self.tt.store(key_3, 3, 30, 3, BOUND_UPPER)
+        assert self.tt.probe(key_1) == (1, 10, 8, BOUND_EXACT)
+        assert self.tt.probe(key_2) is None
+        assert self.tt.probe(key_3) == (3, 30, 3, BOUND_UPPER)
+
+        # A deeper entry takes the place of the deep one, which is moved to the second entry
+        self.tt.store(key_2, 2, 20, 9, BOUND_EXACT)
+        assert self.tt.probe(key_2) == (2, 20, 9, BOUND_EXACT)
+        assert self.tt.probe(key_1) == (1, 10, 8, BOUND_EXACT)
+        assert self.tt.probe(key_3) is None
+
+    def test_new_search_replaces(self):
+        key_1 = 5
+        key_2 = 5 + (1 << 40)
+        self.tt.store(key_1, 1, 10, 8, BOUND_EXACT)
+        self.tt.new_search()
+        self.tt.store(key_2, 2, 20, 1, BOUND_EXACT)
+        assert self.tt.probe(key_2) == (2, 20, 1, BOUND_EXACT)
+        assert self.tt.probe(key_1) == (1, 10, 8, BOUND_EXACT)
+
+    def test_keep_move(self):
+        self.tt.store(42, 0x777, 10, 3, BOUND_EXACT)
+        self.tt.store(42, 0, -10, 4, BOUND_UPPER)
+        assert self.tt.probe(42) == (0x777, -10, 4, BOUND_UPPER)
+
+    def test_bounded(self):
+        for key in range(0, 10 * self.tt.nb_entries, 7):
+            self.tt.store(key * 0x9E3779B97F4A7C15 & ((1 << 64) - 1), 1, 0, 1, BOUND_EXACT)
+        assert self.tt.size == 1024 * 1024
+        assert self.tt.hashfull() == 1000
+
+    def test_clear(self):
+        self.tt.store(42, 1, 10, 3, BOUND_EXACT)
+        self.tt.clear()
+        assert self.tt.probe(42) is None
+
+    def test_buffer(self):
+        size = table_size(1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            shm.buf[:size] = bytes(size)
+            tt_1 = TranspositionTable(buffer=shm.buf[:size])
+            tt_2 = TranspositionTable(buffer=shm.buf[:size])
+            tt_1.store(42, 1, 10, 3, BOUND_EXACT)
+            assert tt_2.probe(42) == (1, 10, 3, BOUND_EXACT)
+            tt_1.close()
+            tt_2.close()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_buffer_size(self):
+        assert table_size(1) == 1024 * 1024
+        assert table_size(1.5) == 1024 * 1024
+        with pytest.raises(ValueError):
+            TranspositionTable(buffer=bytearray(3 * 32))
+
+    def test_torn_entry(self):
+        self.tt.store(42, 1, 10, 3, BOUND_EXACT)
+        # Another process changed the data, but not the key yet
+        self.tt.table[42 * 4 + 1] ^= 1 << 40
+        assert self.tt.probe(42) is None